@@ -0,0 +1,103 @@
+"""
+Benchmark do mapa de calor semanal (utils/heatmap.py).
+Execute: python benchmarks/bench_heatmap.py [quantidade_de_reservas]
+
+Mede o cálculo vetorizado isolado e o caminho completo da rota
+(consulta ao banco SQLite em memória + montagem dos arrays + cálculo).
+"""
+import os
+import sys
+import time
+from datetime import date, datetime, timezone
+
+import numpy as np
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import Reservation, ReservationStatus, ReservationType
+from utils.heatmap import fetch_reservation_minutes, period_bounds, weekly_occupancy
+
+
+def generate_reservations(count: int, from_date: date, days: int, laboratories: int):
+    """Gera reservas aleatórias de 30 minutos a 4 horas dentro do período."""
+    rng = np.random.default_rng(42)
+    origin = np.datetime64(from_date.isoformat(), "m")
+    starts = origin + rng.integers(0, days * 24 * 60, count).astype("timedelta64[m]")
+    ends = starts + rng.integers(30, 240, count).astype("timedelta64[m]")
+    laboratory_ids = rng.integers(1, laboratories + 1, count)
+    return laboratory_ids, starts, ends
+
+
+def populate_database(laboratory_ids, starts, ends):
+    """Grava as reservas geradas em um banco SQLite em memória."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    now = datetime.now(timezone.utc)
+    to_datetime = lambda value: value.astype(datetime).replace(tzinfo=timezone.utc)
+    rows = [
+        {
+            "user_id": 1,
+            "laboratory_id": int(laboratory_id),
+            "reservation_type": ReservationType.room,
+            "start_time": to_datetime(start),
+            "end_time": to_datetime(end),
+            "title": "Reserva",
+            "is_confidential": False,
+            "status": ReservationStatus.approved,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for laboratory_id, start, end in zip(laboratory_ids, starts, ends)
+    ]
+    with Session(engine) as session:
+        session.execute(insert(Reservation), rows)
+        session.commit()
+    return engine
+
+
+def measure(function, repeats: int = 5) -> list[float]:
+    """Executa a função algumas vezes e retorna os tempos em segundos."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    from_date = date(2024, 1, 1)
+    to_date = date(2024, 12, 31)
+    days = (to_date - from_date).days + 1
+
+    laboratory_ids, starts, ends = generate_reservations(count, from_date, days, laboratories=10)
+
+    timings = measure(lambda: weekly_occupancy(laboratory_ids, starts, ends, from_date, to_date))
+
+    print(f"Reservas: {count:,} | Laboratórios: 10 | Dias: {days}")
+    print(f"Cálculo         | Melhor: {timings[0] * 1000:.1f} ms | Mediana: {timings[2] * 1000:.1f} ms")
+
+    engine = populate_database(laboratory_ids, starts, ends)
+    range_start, range_end = period_bounds(from_date, to_date)
+
+    def endpoint_path():
+        with Session(engine) as session:
+            columns = fetch_reservation_minutes(session, [Reservation], range_start, range_end)
+        weekly_occupancy(*columns, from_date, to_date)
+
+    timings = measure(endpoint_path)
+    print(f"Banco + cálculo | Melhor: {timings[0] * 1000:.1f} ms | Mediana: {timings[2] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
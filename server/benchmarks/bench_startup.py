@@ -0,0 +1,81 @@
+"""
+Benchmark do tempo de inicialização da aplicação.
+
+Cada rodada inicia um interpretador novo e mede:
+- importação: tempo do `import main` (FastAPI, SQLModel, routers...);
+- primeira resposta: do início do interpretador até a resposta de /health,
+  passando pelo lifespan (aquecimento incluído).
+Ao final lista os módulos que mais pesam na importação (python -X importtime).
+
+Execute: python benchmarks/bench_startup.py [rodadas]
+Com DATABASE definido no ambiente, o lifespan também abre conexões do pool.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROBE = """
+import json, time, warnings
+warnings.simplefilter("ignore")
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/health").status_code == 200
+    responded = time.perf_counter()
+print(json.dumps({"import": imported - started, "first_response": responded - started}))
+"""
+
+
+def run_probe() -> dict:
+    """Executa uma rodada em um interpretador novo."""
+    launched = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=SERVER_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    # Inclui a inicialização do próprio interpretador
+    result["process"] = time.perf_counter() - launched
+    return result
+
+
+def slowest_imports(limit: int = 10) -> list[tuple[str, float]]:
+    """Módulos importados diretamente pelo main, ordenados pelo tempo acumulado."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR, capture_output=True, text=True, check=True
+    ).stderr
+
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nível 1 de indentação: importações feitas pelo próprio main
+        if name.startswith("   ") and not name.startswith("    ") and cumulative.strip().isdigit():
+            modules.append((name.strip(), int(cumulative) / 1_000_000))
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [run_probe() for _ in range(rounds)]
+
+    for key, label in [("import", "import main"), ("first_response", "primeira resposta"), ("process", "processo completo")]:
+        values = [result[key] * 1000 for result in results]
+        print(f"{label:>18}: mediana {statistics.median(values):7.1f} ms  (mín {min(values):.1f} ms)")
+
+    print("\nMódulos mais lentos importados pelo main:")
+    for name, seconds in slowest_imports():
+        print(f"  {name:<30} {seconds * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,41 @@
+import asyncio
+import hashlib
+import itertools
 import os
+import threading
+import time
 from typing import Generator
 from urllib.parse import quote_plus, urlparse, urlunparse
 
 from dotenv import load_dotenv
+from fastapi import Depends, Request, Response
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session, SQLModel, create_engine
 
 load_dotenv()
 
 SUPABASE = os.getenv("DATABASE")
 
+# Réplicas de leitura opcionais (URLs separadas por vírgula)
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICAS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_HEALTH_INTERVAL_SECONDS = int(os.getenv("REPLICA_HEALTH_INTERVAL_SECONDS", "15"))
+# Após uma escrita, as leituras do mesmo cliente vão ao primário por este tempo
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+PRIMARY_COOKIE = "read_primary"
+
+# INSERT com ON CONFLICT de cada banco suportado
+CONFLICT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Atraso de replicação em segundos (0 quando não há WAL pendente de aplicação)
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
 
 def encode_password_in_url(url: str) -> str:
     """
@@ -50,9 +77,123 @@ else:
     engine = None
 
 
+class ReplicaPool:
+    """
+    Réplicas de leitura escolhidas em round-robin.
+    Uma verificação periódica retira da rotação as réplicas inacessíveis ou
+    com atraso de replicação acima de REPLICA_MAX_LAG_SECONDS.
+    """
+
+    def __init__(self, engines: list, max_lag: float = REPLICA_MAX_LAG_SECONDS):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.healthy = list(engines)
+        self.lags: dict[str, float | None] = {}
+        self.counter = itertools.count()
+        # Clientes (hash do token) que escreveram recentemente, por worker
+        self.recent_writers: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def choose(self):
+        """Próxima réplica saudável, ou None se todas estiverem fora."""
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self.counter) % len(healthy)]
+
+    def measure_lag(self, replica) -> float:
+        """Atraso de replicação da réplica, em segundos."""
+        with replica.connect() as connection:
+            lag = connection.execute(REPLICA_LAG_QUERY).scalar()
+        return float(lag or 0)
+
+    def check_health(self) -> list:
+        """Mede o atraso de cada réplica e atualiza a rotação."""
+        healthy = []
+        for replica in self.engines:
+            try:
+                lag = self.measure_lag(replica)
+            except Exception as e:
+                print(f"⚠️  Réplica {replica.url.host} indisponível: {e}")
+                lag = None
+            self.lags[replica.url.render_as_string(hide_password=True)] = lag
+            if lag is not None and lag <= self.max_lag:
+                healthy.append(replica)
+        self.healthy = healthy
+        return healthy
+
+    def mark_write(self, client_key: str) -> None:
+        """Registra que o cliente acabou de escrever."""
+        now = time.monotonic()
+        with self.lock:
+            self.recent_writers[client_key] = now + READ_YOUR_WRITES_SECONDS
+            # Descarta registros vencidos
+            expired = [key for key, until in self.recent_writers.items() if until < now]
+            for key in expired:
+                del self.recent_writers[key]
+
+    def wrote_recently(self, client_key: str | None) -> bool:
+        if client_key is None:
+            return False
+        until = self.recent_writers.get(client_key)
+        return until is not None and until >= time.monotonic()
+
+
+if SUPABASE and REPLICA_URLS:
+    replicas = ReplicaPool([
+        create_engine(encode_password_in_url(url), echo=True, pool_pre_ping=True)
+        for url in REPLICA_URLS
+    ])
+else:
+    replicas = None
+
+
+ALEMBIC_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+def get_schema_head() -> str:
+    """Revisão mais recente entre as migrações do projeto (lida do disco, sem banco)."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(Config(ALEMBIC_CONFIG)).get_current_head()
+
+
+def check_schema_version(bind=None) -> bool:
+    """
+    Confere se o banco está na última migração com uma única consulta,
+    em vez de inspecionar tabela por tabela.
+
+    Returns:
+        True se o schema está atualizado; caso contrário imprime um aviso
+    """
+    bind = bind or engine
+    if not bind:
+        raise ValueError("Engine não foi inicializado. Verifique a configuração do DATABASE no .env")
+
+    head = get_schema_head()
+    try:
+        with bind.connect() as connection:
+            current = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        current = None
+
+    if current == head:
+        print(f"✓ Schema do banco na versão {head}")
+        return True
+
+    print(
+        f"\n⚠️  Schema do banco na versão {current or 'desconhecida'}, esperada {head}.\n"
+        f"   Execute: alembic upgrade head\n"
+        f"   (bancos criados pelo create_all são marcados com a 0001 automaticamente)\n"
+    )
+    return False
+
+
 def create_db_and_tables():
     """
-    Cria o banco de dados e todas as suas tabelas no Supabase
+    Cria o banco de dados e todas as suas tabelas no Supabase.
+    Usado pelo seed; em produção o schema é mantido pelas migrações (alembic).
     """
     if not SUPABASE:
         error_msg = (
@@ -96,3 +237,70 @@ def get_session() -> Generator[Session, None, None]:
         )
     with Session(engine) as session:
         yield session
+
+
+def client_key(request: Request) -> str | None:
+    """Identifica o cliente pelo token de acesso (hash, para não guardar o token)."""
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+
+def prefers_primary(request: Request) -> bool:
+    """
+    Indica se as leituras deste cliente devem ir ao primário (read-your-writes).
+    O cookie cobre os outros workers; o registro local cobre clientes sem cookies.
+    """
+    if request.cookies.get(PRIMARY_COOKIE):
+        return True
+    return replicas is not None and replicas.wrote_recently(client_key(request))
+
+
+def mark_recent_write(request: Request, response: Response) -> None:
+    """Fixa as próximas leituras do cliente no primário após uma escrita."""
+    if replicas is None or request.method in SAFE_METHODS or response.status_code >= 400:
+        return
+    key = client_key(request)
+    if key is not None:
+        replicas.mark_write(key)
+    response.set_cookie(
+        PRIMARY_COOKIE, "1", max_age=READ_YOUR_WRITES_SECONDS, httponly=True, samesite="lax"
+    )
+
+
+def get_read_session(
+    request: Request,
+    session: Session = Depends(get_session)
+) -> Generator[Session, None, None]:
+    """
+    Sessão para leituras que toleram o atraso de replicação (listagens).
+    Usa uma réplica saudável quando configurada; sem réplicas, logo após uma
+    escrita do cliente ou com todas fora da rotação, usa o primário.
+    Verificações de conflito e escritas continuam em `get_session`.
+    """
+    replica = None
+    if replicas is not None and not prefers_primary(request):
+        replica = replicas.choose()
+
+    if replica is None:
+        yield session
+        return
+
+    with Session(replica) as replica_session:
+        yield replica_session
+
+
+def reads_from_replica(session: Session) -> bool:
+    """Indica se a sessão lê de uma réplica (dados podem estar atrasados)."""
+    return replicas is not None and session.get_bind() in replicas.engines
+
+
+async def replica_health_loop(pool: ReplicaPool) -> None:
+    """Tarefa de fundo que verifica saúde e atraso das réplicas."""
+    while True:
+        try:
+            await asyncio.to_thread(pool.check_health)
+        except Exception as e:
+            print(f"⚠️  Falha na verificação das réplicas: {e}")
+        await asyncio.sleep(REPLICA_HEALTH_INTERVAL_SECONDS)
@@ -5,31 +5,88 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session, select
 from database import get_session
 from models import User, Role
 from schemas import TokenData
+from utils.cache import USERS, cache
 from utils.jwt import SECRET_KEY, ALGORITHM
+from utils.revocation import is_revoked
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
+def get_cached_user(email: str, session: Session) -> User | None:
+    """
+    Busca um usuário pelo email usando o cache do worker.
+    A instância em cache é associada à sessão sem nova consulta (merge sem load),
+    então alterações no usuário continuam sendo persistidas normalmente.
+    """
+    data = cache.get(USERS, email)
+    if data is not None:
+        user = User(**data)
+        make_transient_to_detached(user)
+        return session.merge(user, load=False)
+    
+    generation = cache.generation(USERS)
+    statement = select(User).where(User.email == email)
+    user = session.exec(statement).first()
+    
+    if user is not None:
+        cache.set(USERS, email, user.model_dump(), generation)
+    
+    return user
+
+
+async def get_token_payload(
+    token: Annotated[str, Depends(oauth2_scheme)]
+) -> dict:
+    """
+    Decodifica o token JWT do header Authorization.
+    
+    Args:
+        token: Token JWT extraído do header Authorization
+        
+    Returns:
+        dict: Claims do token (sub, exp, iat, jti)
+        
+    Raises:
+        HTTPException: Se o token for inválido ou não tiver o e-mail
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Não foi possível validar as credenciais",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    
+    if payload.get("sub") is None:
+        raise credentials_exception
+    
+    return payload
+
+
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
+    payload: Annotated[dict, Depends(get_token_payload)],
     session: Annotated[Session, Depends(get_session)]
 ) -> User:
     """
     Extrai e valida o usuário atual a partir do token JWT.
     
     Args:
-        token: Token JWT extraído do header Authorization
+        payload: Claims do token JWT
         session: Sessão do banco de dados
         
     Returns:
         User: Usuário autenticado
         
     Raises:
-        HTTPException: Se o token for inválido ou o usuário não existir
+        HTTPException: Se o token for inválido ou revogado, ou o usuário não existir
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,17 +94,13 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
+    # O filtro de Bloom evita a consulta no caso comum (token não revogado)
+    if is_revoked(session, payload):
         raise credentials_exception
     
-    statement = select(User).where(User.email == token_data.email)
-    user = session.exec(statement).first()
+    token_data = TokenData(email=payload["sub"])
+    
+    user = get_cached_user(token_data.email, session)
     
     if user is None:
         raise credentials_exception
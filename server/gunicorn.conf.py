@@ -0,0 +1,116 @@
+"""
+Configuração do Gunicorn para produção.
+
+O Gunicorn gerencia vários workers Uvicorn, um por núcleo disponível:
+- a aplicação é carregada no processo mestre antes do fork (preload), então
+  os módulos importados são compartilhados entre os workers via copy-on-write;
+- por causa do preload, `kill -HUP` apenas recria os workers a partir do
+  mestre, ainda com o código antigo. Para publicar código novo sem derrubar
+  conexões, faça a troca de binário:
+    1. `kill -USR2 <pid do mestre>`: sobe um novo mestre (e workers) com o
+       código atual, ao lado do antigo;
+    2. `kill -WINCH <pid do mestre antigo>`: os workers antigos terminam as
+       requisições em andamento e saem;
+    3. `kill -QUIT <pid do mestre antigo>`: encerra o mestre antigo
+       (ou `kill -HUP` nele, para voltar à versão anterior);
+- cada worker é reciclado após um número de requisições, limitando o
+  crescimento de memória.
+
+Uso: gunicorn main:app -c gunicorn.conf.py
+"""
+import math
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cota de CPU do container: cgroup v2 e, em hosts antigos, cgroup v1
+CGROUP_CPU_QUOTAS = (
+    ("/sys/fs/cgroup/cpu.max", None),
+    ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us"),
+)
+
+
+def available_cpus() -> int:
+    """
+    Núcleos que o processo pode de fato usar: os da afinidade, limitados pela
+    cota do cgroup. cpu_count() informa os núcleos do host, não os do container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # macOS/Windows não têm sched_getaffinity
+        cpus = os.cpu_count() or 1
+
+    for quota_path, period_path in CGROUP_CPU_QUOTAS:
+        try:
+            with open(quota_path) as f:
+                values = f.read().split()
+            if period_path:
+                with open(period_path) as f:
+                    values.append(f.read().strip())
+            quota, period = values[0], values[-1]
+            # "max" (v2) ou -1 (v1): sem cota
+            if quota != "max" and int(quota) > 0:
+                cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+            break
+        except (OSError, ValueError, IndexError):
+            continue
+
+    return cpus
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# WEB_CONCURRENCY é a convenção do Render/Heroku para o número de workers.
+# O padrão é um worker por núcleo disponível, sem o fator 2N+1 pensado para
+# workers síncronos: cada worker Uvicorn já atende muitas requisições
+# concorrentes, e cada um abre seu pool de conexões (5 + 10 de overflow), as
+# conexões de aquecimento, a do LISTEN e as tarefas de fundo, o que esgotaria
+# o limite de conexões do Supabase em um host grande
+workers = int(os.getenv("WEB_CONCURRENCY", str(available_cpus())))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+preload_app = True
+
+# Reciclagem de workers; o jitter evita que todos reiniciem ao mesmo tempo
+max_requests = int(os.getenv("MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "100"))
+
+# Tempo para concluir requisições em andamento no reload/encerramento
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = 5
+
+# Proxies confiáveis: só deles o X-Forwarded-For é aceito como IP do cliente
+# (usado no rate limit). Não há padrão: com um valor errado, ou todos os
+# clientes caem no balde do IP do proxy (o site inteiro divide um limite), ou
+# qualquer cliente escolhe o próprio IP e escapa do limite.
+# - Render: as requisições chegam pelo proxy da plataforma, a partir da rede
+#   privada 10.0.0.0/8 e com endereços que mudam; a porta do serviço não é
+#   exposta diretamente, então lá use FORWARDED_ALLOW_IPS="*".
+# - Proxy na mesma máquina (ex.: nginx) ou nenhum proxy: FORWARDED_ALLOW_IPS=127.0.0.1
+#   (clientes externos não conseguem alterar o próprio IP pelo cabeçalho).
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS")
+if not forwarded_allow_ips:
+    raise RuntimeError(
+        "Defina FORWARDED_ALLOW_IPS com o(s) IP(s) do proxy reverso "
+        "(no Render: FORWARDED_ALLOW_IPS=\"*\"; veja gunicorn.conf.py)"
+    )
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """
+    Descarta as conexões herdadas do mestre: com preload o engine é criado
+    antes do fork, e um socket compartilhado entre processos corrompe o protocolo.
+    """
+    from database import engine, replicas
+
+    if engine:
+        engine.dispose(close=False)
+    for replica in replicas.engines if replicas else ():
+        replica.dispose(close=False)
@@ -1,30 +1,55 @@
 """
 Aplicação principal FastAPI para gerenciamento de horários do laboratório.
 """
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import create_db_and_tables
+from database import (
+    check_schema_version, engine, mark_recent_write, replica_health_loop, replicas
+)
 from routers.auth import router as auth_router
 from routers.users import router as users_router
 from routers.laboratories import router as laboratories_router
 from routers.computers import router as computers_router
 from routers.access import router as access_router
 from routers.reservations import router as reservations_router
+from routers.reports import router as reports_router
+from utils.archive import archive_loop
+from utils.cache import invalidation_loop
+from utils.revocation import revocation_loop
+from utils.stats import stats_reconcile_loop
+from utils.warmup import deferred_startup, warmup
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação."""
-    # Startup: cria tabelas no banco
-    try:
-        create_db_and_tables()
-    except Exception as e:
-        print(f"\n⚠️  Aviso: Não foi possível criar/verificar tabelas: {e}")
-        print("   A aplicação continuará, mas algumas funcionalidades podem não funcionar.\n")
+    # Startup: abre conexões do pool antes de servir; a verificação do schema
+    # (as tabelas são criadas pelas migrações) e o OpenAPI ficam para depois
+    await warmup(engine)
+    checks = [check_schema_version] if engine else []
+    background_tasks = [asyncio.create_task(deferred_startup(app, *checks))]
+    
+    # Arquivamento periódico de reservas antigas
+    # e reconciliação diária dos agregados de ocupação: todos os workers
+    # agendam, mas cada ciclo roda em um único processo (advisory lock) e só
+    # quando o intervalo desde a última execução passou (scheduled_job_run)
+    if engine:
+        background_tasks.append(asyncio.create_task(archive_loop(engine)))
+        background_tasks.append(asyncio.create_task(stats_reconcile_loop(engine)))
+        # Invalidações de cache publicadas pelos outros workers
+        background_tasks.append(asyncio.create_task(invalidation_loop(engine)))
+        # Filtro de tokens revogados consultado a cada requisição autenticada
+        background_tasks.append(asyncio.create_task(revocation_loop(engine)))
+    # Saúde e atraso das réplicas de leitura
+    if replicas:
+        background_tasks.append(asyncio.create_task(replica_health_loop(replicas)))
     yield
-    # Shutdown: adicione aqui qualquer limpeza necessária
+    # Shutdown: encerra as tarefas de fundo
+    for task in background_tasks:
+        task.cancel()
 
 
 app = FastAPI(
@@ -40,8 +65,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeçalhos de resposta lidos pelo front-end (paginação e limite de requisições)
+    expose_headers=["X-Next-Cursor", "Retry-After", "ETag", "X-Rejected-Reservations"],
 )
 
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Após uma escrita, as leituras do cliente vão ao primário por alguns segundos."""
+    response = await call_next(request)
+    mark_recent_write(request, response)
+    return response
+
+
 # Incluir routers
 app.include_router(auth_router)
 app.include_router(users_router)
@@ -49,6 +85,7 @@ app.include_router(laboratories_router)
 app.include_router(computers_router)
 app.include_router(access_router)
 app.include_router(reservations_router)
+app.include_router(reports_router)
 
 
 @app.api_route(
@@ -70,7 +107,8 @@ def read_root():
             "laboratories": "/laboratories",
             "computers": "/computers",
             "access": "/access",
-            "reservations": "/reservations"
+            "reservations": "/reservations",
+            "reports": "/reports"
         }
     }
 
@@ -0,0 +1,80 @@
+"""
+Ambiente das migrações Alembic.
+
+A URL vem da variável DATABASE (a mesma da aplicação) ou de
+`alembic -x url=...`, útil para gerar migrações contra um banco local.
+
+Bancos criados pelo create_all, antes das migrações, não têm a tabela
+alembic_version. Ao encontrar as tabelas do schema inicial sem versão, o
+banco é marcado com a 0001 antes de aplicar as demais revisões.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, inspect, pool
+from sqlmodel import SQLModel
+
+import models  # noqa: F401  (registra as tabelas no metadata)
+from database import SUPABASE, encode_password_in_url
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = SQLModel.metadata
+
+# Revisão equivalente ao schema que o create_all gerava e as tabelas dele
+BASELINE_REVISION = "0001"
+BASELINE_TABLES = {
+    "user", "registrationrequest", "laboratory", "computer",
+    "userlaboratoryaccess", "accessrequest", "reservation",
+}
+
+
+def get_url() -> str:
+    url = context.get_x_argument(as_dictionary=True).get("url") or SUPABASE
+    if not url:
+        raise ValueError("Defina DATABASE no .env ou use: alembic -x url=<connection string> ...")
+    return encode_password_in_url(url)
+
+
+def is_unversioned_baseline(connection) -> bool:
+    """Indica se o banco tem o schema inicial completo, mas nenhuma versão registrada."""
+    tables = set(inspect(connection).get_table_names())
+    return "alembic_version" not in tables and BASELINE_TABLES <= tables
+
+
+def run_migrations_offline() -> None:
+    """Gera o SQL das migrações sem conectar ao banco (alembic upgrade --sql)."""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Aplica as migrações conectado ao banco."""
+    connectable = create_engine(get_url(), poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        if is_unversioned_baseline(connection):
+            print(f"Banco criado sem migrações: marcando a revisão {BASELINE_REVISION}")
+            context.get_context().stamp(context.script, BASELINE_REVISION)
+            connection.commit()
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,160 @@
+"""Schema inicial
+
+Exatamente o schema que o create_all gerava antes das migrações (as 7
+tabelas originais e seus índices). Bancos criados dessa forma são marcados
+com esta revisão em vez de executá-la (automaticamente pelo migrations/env.py
+ou com `alembic stamp 0001`).
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 00:11:50.949839
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    op.create_table('laboratory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('updated_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_laboratory_name'), 'laboratory', ['name'], unique=True)
+    op.create_table('registrationrequest',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('project_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('password', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('is_processed', sa.Boolean(), nullable=False),
+    sa.Column('submitted_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_registrationrequest_email'), 'registrationrequest', ['email'], unique=True)
+    op.create_index(op.f('ix_registrationrequest_project_name'), 'registrationrequest', ['project_name'], unique=False)
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('hashed_password', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('role', sa.Enum('aluno', 'professor', 'admin', name='role'), nullable=False),
+    sa.Column('project_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_email'), 'user', ['email'], unique=True)
+    op.create_index(op.f('ix_user_project_name'), 'user', ['project_name'], unique=False)
+    op.create_table('accessrequest',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('laboratory_id', sa.Integer(), nullable=False),
+    sa.Column('reason', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    sa.Column('is_processed', sa.Boolean(), nullable=False),
+    sa.Column('is_approved', sa.Boolean(), nullable=False),
+    sa.Column('submitted_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('processed_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=True),
+    sa.Column('processed_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['laboratory_id'], ['laboratory.id'], ),
+    sa.ForeignKeyConstraint(['processed_by'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_accessrequest_is_processed'), 'accessrequest', ['is_processed'], unique=False)
+    op.create_index(op.f('ix_accessrequest_laboratory_id'), 'accessrequest', ['laboratory_id'], unique=False)
+    op.create_index(op.f('ix_accessrequest_user_id'), 'accessrequest', ['user_id'], unique=False)
+    op.create_table('computer',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('laboratory_id', sa.Integer(), nullable=False),
+    sa.Column('specifications', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('updated_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['laboratory_id'], ['laboratory.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_computer_name'), 'computer', ['name'], unique=False)
+    op.create_table('userlaboratoryaccess',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('laboratory_id', sa.Integer(), nullable=False),
+    sa.Column('granted_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('granted_by', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['granted_by'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['laboratory_id'], ['laboratory.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('reservation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('laboratory_id', sa.Integer(), nullable=False),
+    sa.Column('computer_id', sa.Integer(), nullable=True),
+    sa.Column('reservation_type', sa.Enum('room', 'computer', name='reservationtype'), nullable=False),
+    sa.Column('start_time', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('end_time', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=200), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=True),
+    sa.Column('is_confidential', sa.Boolean(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'approved', 'rejected', 'cancelled', name='reservationstatus'), nullable=False),
+    sa.Column('reviewed_by', sa.Integer(), nullable=True),
+    sa.Column('reviewed_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=True),
+    sa.Column('rejection_reason', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    sa.Column('created_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('updated_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['computer_id'], ['computer.id'], ),
+    sa.ForeignKeyConstraint(['laboratory_id'], ['laboratory.id'], ),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservation_end_time'), 'reservation', ['end_time'], unique=False)
+    op.create_index(op.f('ix_reservation_laboratory_id'), 'reservation', ['laboratory_id'], unique=False)
+    op.create_index(op.f('ix_reservation_start_time'), 'reservation', ['start_time'], unique=False)
+    op.create_index(op.f('ix_reservation_status'), 'reservation', ['status'], unique=False)
+    op.create_index(op.f('ix_reservation_user_id'), 'reservation', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    op.drop_index(op.f('ix_reservation_user_id'), table_name='reservation')
+    op.drop_index(op.f('ix_reservation_status'), table_name='reservation')
+    op.drop_index(op.f('ix_reservation_start_time'), table_name='reservation')
+    op.drop_index(op.f('ix_reservation_laboratory_id'), table_name='reservation')
+    op.drop_index(op.f('ix_reservation_end_time'), table_name='reservation')
+    op.drop_table('reservation')
+    op.drop_table('userlaboratoryaccess')
+    op.drop_index(op.f('ix_computer_name'), table_name='computer')
+    op.drop_table('computer')
+    op.drop_index(op.f('ix_accessrequest_user_id'), table_name='accessrequest')
+    op.drop_index(op.f('ix_accessrequest_laboratory_id'), table_name='accessrequest')
+    op.drop_index(op.f('ix_accessrequest_is_processed'), table_name='accessrequest')
+    op.drop_table('accessrequest')
+    op.drop_index(op.f('ix_user_project_name'), table_name='user')
+    op.drop_index(op.f('ix_user_email'), table_name='user')
+    op.drop_table('user')
+    op.drop_index(op.f('ix_registrationrequest_project_name'), table_name='registrationrequest')
+    op.drop_index(op.f('ix_registrationrequest_email'), table_name='registrationrequest')
+    op.drop_table('registrationrequest')
+    op.drop_index(op.f('ix_laboratory_name'), table_name='laboratory')
+    op.drop_table('laboratory')
+
+    # Tipos ENUM criados junto com as tabelas (PostgreSQL)
+    for name in ('reservationstatus', 'reservationtype', 'role'):
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
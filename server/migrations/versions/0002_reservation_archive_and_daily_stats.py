@@ -0,0 +1,77 @@
+"""Arquivo de reservas e agregados diários de ocupação
+
+Tabelas criadas depois do schema inicial: reservation_archive (reservas
+antigas movidas pelo arquivamento) e reservation_daily_stats (ocupação por
+dia, hora, laboratório e computador). Os tipos ENUM de reserva já existem
+desde a 0001 e são apenas reutilizados.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:11:50.949839
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    op.create_table('reservation_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('laboratory_id', sa.Integer(), nullable=False),
+    sa.Column('computer_id', sa.Integer(), nullable=True),
+    sa.Column('reservation_type', postgresql.ENUM('room', 'computer', name='reservationtype', create_type=False), nullable=False),
+    sa.Column('start_time', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('end_time', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('is_confidential', sa.Boolean(), nullable=False),
+    sa.Column('status', postgresql.ENUM('pending', 'approved', 'rejected', 'cancelled', name='reservationstatus', create_type=False), nullable=False),
+    sa.Column('reviewed_by', sa.Integer(), nullable=True),
+    sa.Column('reviewed_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=True),
+    sa.Column('rejection_reason', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('updated_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('archived_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservation_archive_laboratory_id'), 'reservation_archive', ['laboratory_id'], unique=False)
+    op.create_index(op.f('ix_reservation_archive_start_time'), 'reservation_archive', ['start_time'], unique=False)
+    op.create_index(op.f('ix_reservation_archive_user_id'), 'reservation_archive', ['user_id'], unique=False)
+    op.create_table('reservation_daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('hour', sa.Integer(), nullable=False),
+    sa.Column('laboratory_id', sa.Integer(), nullable=False),
+    sa.Column('computer_id', sa.Integer(), nullable=True),
+    sa.Column('booked_minutes', sa.Integer(), nullable=False),
+    sa.Column('approved_count', sa.Integer(), nullable=False),
+    sa.Column('rejected_count', sa.Integer(), nullable=False),
+    sa.Column('cancelled_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservation_daily_stats_day'), 'reservation_daily_stats', ['day'], unique=False)
+    op.create_index('ix_reservation_daily_stats_lab_day', 'reservation_daily_stats', ['laboratory_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    op.drop_index('ix_reservation_daily_stats_lab_day', table_name='reservation_daily_stats')
+    op.drop_index(op.f('ix_reservation_daily_stats_day'), table_name='reservation_daily_stats')
+    op.drop_table('reservation_daily_stats')
+    op.drop_index(op.f('ix_reservation_archive_user_id'), table_name='reservation_archive')
+    op.drop_index(op.f('ix_reservation_archive_start_time'), table_name='reservation_archive')
+    op.drop_index(op.f('ix_reservation_archive_laboratory_id'), table_name='reservation_archive')
+    op.drop_table('reservation_archive')
@@ -0,0 +1,50 @@
+"""Índices compostos das consultas frequentes
+
+- conflitos de horário: reservas aprovadas do laboratório no intervalo;
+- reserva pendente do usuário (RNF04);
+- verificação de acesso e solicitações pendentes (usuário, laboratório);
+- última alteração por laboratório/usuário (ETag dos calendários).
+
+No PostgreSQL os índices são criados com CONCURRENTLY, sem bloquear escritas.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:12:01.015771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_reservation_lab_status_start_end', 'reservation', ['laboratory_id', 'status', 'start_time', 'end_time']),
+    ('ix_reservation_user_status', 'reservation', ['user_id', 'status']),
+    ('ix_reservation_lab_updated', 'reservation', ['laboratory_id', 'updated_at']),
+    ('ix_reservation_user_updated', 'reservation', ['user_id', 'updated_at']),
+    ('ix_userlaboratoryaccess_user_lab', 'userlaboratoryaccess', ['user_id', 'laboratory_id']),
+    ('ix_accessrequest_user_lab_processed', 'accessrequest', ['user_id', 'laboratory_id', 'is_processed']),
+]
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,39 @@
+"""Tabela do limitador de requisições compartilhado
+
+Usada apenas com RATE_LIMIT_BACKEND=postgres. No PostgreSQL a tabela é
+UNLOGGED: os baldes são descartáveis e não precisam passar pelo WAL.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    prefixes = ['UNLOGGED'] if op.get_bind().dialect.name == 'postgresql' else []
+    op.create_table('rate_limit_bucket',
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('key'),
+    prefixes=prefixes
+    )
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    op.drop_table('rate_limit_bucket')
@@ -0,0 +1,39 @@
+"""Tokens de acesso revogados
+
+Escrita no logout e na desativação de usuários; o índice em expires_at
+atende a limpeza periódica dos registros vencidos.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 01:48:09.630275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    op.create_table('revoked_token',
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(length=320), nullable=False),
+    sa.Column('revoked_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.Column('expires_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_revoked_token_expires_at'), 'revoked_token', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    op.drop_index(op.f('ix_revoked_token_expires_at'), table_name='revoked_token')
+    op.drop_table('revoked_token')
@@ -0,0 +1,66 @@
+"""Hash da senha nas solicitações de cadastro
+
+A senha em texto deixa de ser armazenada: as solicitações pendentes têm a
+senha hasheada aqui e a coluna `password` é removida.
+
+O downgrade não recupera as senhas em texto: a coluna volta preenchida com o
+hash, e solicitações pendentes criadas depois desta migração precisam ser
+reenviadas se a versão anterior for restaurada.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 02:31:57.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from utils.hash_password import hash_password
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+registration = sa.table(
+    'registrationrequest',
+    sa.column('id', sa.Integer()),
+    sa.column('password', sa.String()),
+    sa.column('hashed_password', sa.String()),
+    sa.column('is_processed', sa.Boolean()),
+)
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    op.add_column('registrationrequest', sa.Column('hashed_password', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+    bind = op.get_bind()
+    pending = bind.execute(
+        sa.select(registration.c.id, registration.c.password)
+        .where(registration.c.is_processed == sa.false())
+    ).all()
+    for request_id, password in pending:
+        bind.execute(
+            registration.update()
+            .where(registration.c.id == request_id)
+            .values(hashed_password=hash_password(password))
+        )
+
+    op.drop_column('registrationrequest', 'password')
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    op.add_column('registrationrequest', sa.Column('password', sa.VARCHAR(), nullable=False, server_default=''))
+    op.execute(
+        registration.update()
+        .where(registration.c.hashed_password.is_not(None))
+        .values(password=registration.c.hashed_password)
+    )
+    op.drop_column('registrationrequest', 'hashed_password')
@@ -0,0 +1,43 @@
+"""Índices da busca de usuários
+
+- (project_name, email): filtro por projeto com paginação por e-mail;
+  substitui o índice simples em project_name;
+- email com text_pattern_ops: busca por prefixo (LIKE 'abc%') no PostgreSQL,
+  independente da collation do banco.
+
+No PostgreSQL os índices são criados com CONCURRENTLY, sem bloquear escritas.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 03:12:44.281530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_project_name_email', 'user', ['project_name', 'email'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_user_email_pattern', 'user', ['email'], unique=False, postgresql_ops={'email': 'text_pattern_ops'}, postgresql_concurrently=True)
+        op.drop_index('ix_user_project_name', table_name='user', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_project_name', 'user', ['project_name'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_user_email_pattern', table_name='user', postgresql_concurrently=True)
+        op.drop_index('ix_user_project_name_email', table_name='user', postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""Acesso único por (usuário, laboratório)
+
+Substitui o índice ix_userlaboratoryaccess_user_lab por um índice único,
+exigido pelo INSERT ... ON CONFLICT DO NOTHING das concessões em lote.
+Acessos duplicados existentes são removidos antes (fica o mais antigo).
+
+No PostgreSQL o índice é criado com CONCURRENTLY, sem bloquear escritas.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 03:56:20.517364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    op.execute(
+        "DELETE FROM userlaboratoryaccess WHERE id NOT IN ("
+        "SELECT MIN(id) FROM userlaboratoryaccess GROUP BY user_id, laboratory_id)"
+    )
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        op.create_index('uq_userlaboratoryaccess_user_lab', 'userlaboratoryaccess', ['user_id', 'laboratory_id'], unique=True, postgresql_concurrently=True)
+        op.drop_index('ix_userlaboratoryaccess_user_lab', table_name='userlaboratoryaccess', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_userlaboratoryaccess_user_lab', 'userlaboratoryaccess', ['user_id', 'laboratory_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('uq_userlaboratoryaccess_user_lab', table_name='userlaboratoryaccess', postgresql_concurrently=True)
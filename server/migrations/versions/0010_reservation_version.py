@@ -0,0 +1,36 @@
+"""Versão das reservas para controle de concorrência otimista
+
+A coluna version é incrementada a cada alteração da reserva e exposta como
+ETag; as rotas de alteração só gravam se a versão não mudou desde a leitura.
+O valor padrão no servidor preenche as reservas existentes sem reescrita
+de linhas no PostgreSQL.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 05:12:37.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    op.add_column('reservation', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('reservation_archive', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Reverte a migração."""
+    op.drop_column('reservation_archive', 'version')
+    op.drop_column('reservation', 'version')
@@ -0,0 +1,39 @@
+"""Fila de análise de reservas pendentes
+
+Registra qual administrador pegou cada reserva pendente para análise e até
+quando (claimed_by, claimed_until), para que vários administradores
+processem a fila em paralelo sem disputar as mesmas reservas.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 05:48:09.731526
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    with op.batch_alter_table('reservation') as batch_op:
+        batch_op.add_column(sa.Column('claimed_by', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('claimed_until', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=True))
+        batch_op.create_foreign_key('fk_reservation_claimed_by_user', 'user', ['claimed_by'], ['id'])
+
+
+def downgrade() -> None:
+    """Reverte a migração."""
+    with op.batch_alter_table('reservation') as batch_op:
+        batch_op.drop_constraint('fk_reservation_claimed_by_user', type_='foreignkey')
+        batch_op.drop_column('claimed_until')
+        batch_op.drop_column('claimed_by')
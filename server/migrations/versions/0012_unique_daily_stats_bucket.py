@@ -0,0 +1,65 @@
+"""Agregado diário único por balde
+
+Cria o índice único uq_reservation_daily_stats_bucket em
+(day, hour, laboratory_id, COALESCE(computer_id, 0)), alvo do
+INSERT ... ON CONFLICT DO UPDATE que incrementa os agregados. O COALESCE
+faz os agregados de sala (computer_id nulo) também colidirem.
+
+Agregados duplicados existentes são somados no de menor id antes.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 07:21:54.602318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, Sequence[str], None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ('booked_minutes', 'approved_count', 'rejected_count', 'cancelled_count')
+
+SAME_BUCKET = (
+    "other.day = reservation_daily_stats.day "
+    "AND other.hour = reservation_daily_stats.hour "
+    "AND other.laboratory_id = reservation_daily_stats.laboratory_id "
+    "AND coalesce(other.computer_id, 0) = coalesce(reservation_daily_stats.computer_id, 0)"
+)
+
+KEEPERS = (
+    "SELECT min(id) FROM reservation_daily_stats "
+    "GROUP BY day, hour, laboratory_id, coalesce(computer_id, 0)"
+)
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    totals = ", ".join(
+        f"{column} = (SELECT sum(other.{column}) FROM reservation_daily_stats AS other WHERE {SAME_BUCKET})"
+        for column in COUNTERS
+    )
+    op.execute(
+        f"UPDATE reservation_daily_stats SET {totals} "
+        f"WHERE id IN ({KEEPERS} HAVING count(*) > 1)"
+    )
+    op.execute(f"DELETE FROM reservation_daily_stats WHERE id NOT IN ({KEEPERS})")
+
+    op.create_index(
+        'uq_reservation_daily_stats_bucket',
+        'reservation_daily_stats',
+        ['day', 'hour', 'laboratory_id', sa.text('coalesce(computer_id, 0)')],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Reverte a migração."""
+    op.drop_index('uq_reservation_daily_stats_bucket', table_name='reservation_daily_stats')
@@ -0,0 +1,36 @@
+"""Última execução das tarefas periódicas
+
+Consultada sob o advisory lock de cada tarefa: um worker recém-iniciado só
+executa o ciclo se o intervalo desde a última execução já passou.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 02:05:41.274903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, Sequence[str], None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Aplica a migração."""
+    op.create_table('scheduled_job_run',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('last_run_at', sqlmodel.sql.sqltypes.UTCDateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Desfaz a migração."""
+    op.drop_table('scheduled_job_run')
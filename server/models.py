@@ -1,6 +1,7 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum
 from typing import Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -23,6 +24,12 @@ class ReservationType(str, Enum):
 
 
 class User(SQLModel, table=True):
+    __table_args__ = (
+        # Filtro por projeto com paginação ordenada por e-mail
+        Index("ix_user_project_name_email", "project_name", "email"),
+        # Busca por prefixo do e-mail (LIKE 'abc%'); no PostgreSQL exige text_pattern_ops
+        Index("ix_user_email_pattern", "email", postgresql_ops={"email": "text_pattern_ops"}),
+    )
     model_config = {
         "title": "Usuário",
         "description": (
@@ -48,7 +55,6 @@ class User(SQLModel, table=True):
         description="Perfil do usuário no sistema",
     )
     project_name: str = Field(
-        index=True,
         description="Nome do projeto ao qual o usuário está vinculado",
     )
     is_active: bool = Field(
@@ -80,9 +86,9 @@ class RegistrationRequest(SQLModel, table=True):
         index=True,
         description="Nome do projeto ao qual o usuário deseja se vincular",
     )
-    password: str = Field(
-        description="Senha em texto plano enviada na solicitação (será hasheada)",
-        min_length=8,
+    hashed_password: Optional[str] = Field(
+        default=None,
+        description="Hash da senha, gravado em segundo plano logo após o envio (a senha em texto nunca é armazenada)",
     )
     is_processed: bool = Field(
         default=False,
@@ -179,6 +185,10 @@ class Computer(SQLModel, table=True):
 
 class UserLaboratoryAccess(SQLModel, table=True):
     """Relacionamento entre usuários e laboratórios que eles podem acessar"""
+    __table_args__ = (
+        # Verificação de acesso (usuário, laboratório); único para o ON CONFLICT das concessões em lote
+        Index("uq_userlaboratoryaccess_user_lab", "user_id", "laboratory_id", unique=True),
+    )
     model_config = {
         "title": "Acesso de Usuário a Laboratório",
         "description": "Define quais laboratórios um usuário pode acessar"
@@ -209,6 +219,10 @@ class UserLaboratoryAccess(SQLModel, table=True):
 
 class AccessRequest(SQLModel, table=True):
     """Solicitação de acesso a laboratório"""
+    __table_args__ = (
+        # Solicitação pendente do usuário para o laboratório
+        Index("ix_accessrequest_user_lab_processed", "user_id", "laboratory_id", "is_processed"),
+    )
     model_config = {
         "title": "Solicitação de Acesso",
         "description": "Solicitação de um usuário para ter acesso a um laboratório"
@@ -260,6 +274,15 @@ class AccessRequest(SQLModel, table=True):
 
 class Reservation(SQLModel, table=True):
     """Representa uma reserva de sala ou computador"""
+    __table_args__ = (
+        # Verificação de conflitos: reservas aprovadas do laboratório no intervalo
+        Index("ix_reservation_lab_status_start_end", "laboratory_id", "status", "start_time", "end_time"),
+        # Reserva pendente do usuário (RNF04)
+        Index("ix_reservation_user_status", "user_id", "status"),
+        # Última alteração por laboratório/usuário (ETag dos calendários)
+        Index("ix_reservation_lab_updated", "laboratory_id", "updated_at"),
+        Index("ix_reservation_user_updated", "user_id", "updated_at"),
+    )
     model_config = {
         "title": "Reserva",
         "description": "Representa uma solicitação de reserva de espaço ou equipamento"
@@ -337,3 +360,254 @@ class Reservation(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         description="Data da última atualização"
     )
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": "1"},
+        description="Versão da reserva, incrementada a cada alteração (ETag)"
+    )
+    claimed_by: Optional[int] = Field(
+        default=None,
+        foreign_key="user.id",
+        description="ID do administrador que reservou a solicitação para análise"
+    )
+    claimed_until: Optional[datetime] = Field(
+        default=None,
+        description="Fim do prazo de análise; depois dele a solicitação volta à fila"
+    )
+
+
+class ReservationArchive(SQLModel, table=True):
+    """Reservas encerradas há mais tempo que o horizonte de arquivamento"""
+    __tablename__ = "reservation_archive"
+    model_config = {
+        "title": "Reserva Arquivada",
+        "description": "Cópia histórica de uma reserva removida da tabela principal"
+    }
+    
+    id: int = Field(
+        primary_key=True,
+        description="Identificador original da reserva"
+    )
+    user_id: int = Field(
+        index=True,
+        description="ID do usuário que criou a reserva"
+    )
+    laboratory_id: int = Field(
+        index=True,
+        description="ID do laboratório reservado"
+    )
+    computer_id: Optional[int] = Field(
+        default=None,
+        description="ID do computador reservado (se aplicável)"
+    )
+    reservation_type: ReservationType = Field(
+        description="Tipo de reserva (sala completa ou computador)"
+    )
+    start_time: datetime = Field(
+        index=True,
+        description="Data e hora de início da reserva"
+    )
+    end_time: datetime = Field(
+        description="Data e hora de término da reserva"
+    )
+    title: str = Field(
+        description="Título/descrição da atividade"
+    )
+    description: Optional[str] = Field(
+        default=None,
+        description="Descrição detalhada da atividade"
+    )
+    is_confidential: bool = Field(
+        default=False,
+        description="Indica se a atividade é confidencial"
+    )
+    status: ReservationStatus = Field(
+        description="Status final da reserva"
+    )
+    reviewed_by: Optional[int] = Field(
+        default=None,
+        description="ID do administrador que revisou a reserva"
+    )
+    reviewed_at: Optional[datetime] = Field(
+        default=None,
+        description="Data e hora da revisão"
+    )
+    rejection_reason: Optional[str] = Field(
+        default=None,
+        description="Motivo da rejeição (se aplicável)"
+    )
+    created_at: datetime = Field(
+        description="Data de criação da reserva"
+    )
+    updated_at: datetime = Field(
+        description="Data da última atualização"
+    )
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": "1"},
+        description="Versão da reserva no momento do arquivamento"
+    )
+    archived_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Data em que a reserva foi arquivada"
+    )
+
+
+class ReservationDailyStats(SQLModel, table=True):
+    """Agregado de ocupação por dia, hora, laboratório e computador"""
+    __tablename__ = "reservation_daily_stats"
+    __table_args__ = (
+        Index("ix_reservation_daily_stats_lab_day", "laboratory_id", "day"),
+        # Um agregado por balde; COALESCE porque NULLs (reservas de sala) não colidem
+        Index(
+            "uq_reservation_daily_stats_bucket",
+            "day", "hour", "laboratory_id", text("coalesce(computer_id, 0)"),
+            unique=True
+        ),
+    )
+    model_config = {
+        "title": "Estatística Diária de Reservas",
+        "description": "Minutos reservados e contagem de decisões por hora (UTC)"
+    }
+    
+    id: Optional[int] = Field(
+        default=None,
+        primary_key=True,
+        description="Identificador único"
+    )
+    day: date = Field(
+        index=True,
+        description="Dia (UTC) ao qual o agregado se refere"
+    )
+    hour: int = Field(
+        ge=0,
+        le=23,
+        description="Hora do dia (UTC), de 0 a 23"
+    )
+    laboratory_id: int = Field(
+        description="ID do laboratório"
+    )
+    computer_id: Optional[int] = Field(
+        default=None,
+        description="ID do computador (nulo para reservas de sala)"
+    )
+    booked_minutes: int = Field(
+        default=0,
+        description="Minutos ocupados por reservas aprovadas"
+    )
+    approved_count: int = Field(
+        default=0,
+        description="Reservas aprovadas que começam nesta hora"
+    )
+    rejected_count: int = Field(
+        default=0,
+        description="Reservas rejeitadas que começam nesta hora"
+    )
+    cancelled_count: int = Field(
+        default=0,
+        description="Reservas canceladas que começam nesta hora"
+    )
+
+
+class RateLimitBucket(SQLModel, table=True):
+    """Balde de tokens do limitador de requisições (backend compartilhado)"""
+    __tablename__ = "rate_limit_bucket"
+    model_config = {
+        "title": "Balde de Limite de Requisições",
+        "description": "Tokens disponíveis por chave (rota + IP ou usuário)"
+    }
+    
+    key: str = Field(
+        primary_key=True,
+        max_length=255,
+        description="Escopo e identidade limitada (ex.: login:ip:10.0.0.1)"
+    )
+    tokens: float = Field(
+        description="Tokens disponíveis na última atualização"
+    )
+    updated_at: float = Field(
+        description="Instante da última atualização (epoch, em segundos)"
+    )
+
+
+class RefreshToken(SQLModel, table=True):
+    """Token de renovação de sessão (armazenado apenas como HMAC)"""
+    __tablename__ = "refresh_token"
+    model_config = {
+        "title": "Token de Renovação",
+        "description": "Permite obter novos tokens de acesso sem repetir o login"
+    }
+    
+    id: Optional[int] = Field(
+        default=None,
+        primary_key=True,
+        description="Identificador único"
+    )
+    token_hash: str = Field(
+        index=True,
+        unique=True,
+        max_length=64,
+        description="HMAC-SHA256 do token (o token em si nunca é armazenado)"
+    )
+    user_id: int = Field(
+        foreign_key="user.id",
+        index=True,
+        description="ID do usuário dono do token"
+    )
+    expires_at: datetime = Field(
+        description="Data de expiração (UTC)"
+    )
+    revoked_at: Optional[datetime] = Field(
+        default=None,
+        description="Data da revogação (rotação ou logout)"
+    )
+    replaced_by_id: Optional[int] = Field(
+        default=None,
+        foreign_key="refresh_token.id",
+        description="Token emitido na rotação (reapresentar este token indica cópia)"
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Data de emissão (UTC)"
+    )
+
+
+class RevokedToken(SQLModel, table=True):
+    """Token de acesso revogado antes de expirar"""
+    __tablename__ = "revoked_token"
+    model_config = {
+        "title": "Token Revogado",
+        "description": "Tokens de acesso revogados (logout) ou de usuários desativados"
+    }
+    
+    key: str = Field(
+        primary_key=True,
+        max_length=320,
+        description="jti do token ou \"sub:<e-mail>\" para todos os tokens emitidos até a revogação"
+    )
+    revoked_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Data da revogação (UTC)"
+    )
+    expires_at: datetime = Field(
+        index=True,
+        description="Depois desta data os tokens revogados já expiraram e o registro pode ser removido"
+    )
+
+
+class ScheduledJobRun(SQLModel, table=True):
+    """Última execução de uma tarefa periódica, compartilhada entre os processos"""
+    __tablename__ = "scheduled_job_run"
+    model_config = {
+        "title": "Execução de Tarefa Periódica",
+        "description": "Evita que a reciclagem dos workers repita tarefas que ainda não venceram"
+    }
+    
+    name: str = Field(
+        primary_key=True,
+        max_length=50,
+        description="Nome da tarefa (ex.: archive, stats_reconcile)"
+    )
+    last_run_at: datetime = Field(
+        description="Início da última execução concluída (UTC)"
+    )
@@ -2,15 +2,21 @@
 Rotas para gerenciamento de acessos de usuários a laboratórios.
 """
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy import delete, exists, insert, literal
 from sqlmodel import Session, select
-from database import get_session
+from database import CONFLICT_INSERTS, get_session
 from dependencies import get_current_admin, get_current_user
 from models import User, Laboratory, UserLaboratoryAccess, AccessRequest
 from schemas import (
-    UserLaboratoryAccessCreate, UserLaboratoryAccessResponse,
-    AccessRequestCreate, AccessRequestResponse, AccessRequestProcess
+    UserLaboratoryAccessCreate, UserLaboratoryAccessResponse, UserLaboratoryAccessExpanded,
+    UserLaboratoryAccessBulk, UserLaboratoryAccessBulkResult,
+    UserSummary, LaboratorySummary,
+    AccessRequestCreate, AccessRequestResponse, AccessRequestProcess,
+    ImportReport, ImportRowError
 )
+from utils.bulk_import import iter_batches, iter_records, resolve_format, validate_batch
+from utils.cache import ACCESS, publish_invalidation
 from datetime import datetime, timezone
 
 router = APIRouter(
@@ -68,66 +74,309 @@ async def grant_laboratory_access(
     )
     
     session.add(db_access)
+    publish_invalidation(session, ACCESS, access.user_id)
     session.commit()
     session.refresh(db_access)
     
     return db_access
 
 
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    summary="Importar acessos",
+    description="Concede acessos em lote a partir de um arquivo CSV ou NDJSON (apenas administradores)"
+)
+async def import_laboratory_access(
+    session: Annotated[Session, Depends(get_session)],
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    file: UploadFile = File(description="Arquivo com as colunas user_id, laboratory_id"),
+    file_format: str | None = Query(None, alias="format", description="csv ou ndjson (padrão: pela extensão)")
+):
+    """
+    Concede acessos em lote.
+    Linhas inválidas, com usuário/laboratório inexistente ou acesso já
+    concedido são relatadas; as demais são gravadas em uma única transação.
+    """
+    file_format = resolve_format(file, file_format)
+    report = ImportReport()
+    seen = set()
+    
+    for batch in iter_batches(iter_records(file, file_format)):
+        valid = validate_batch(batch, UserLaboratoryAccessCreate, report)
+        
+        user_ids = {access.user_id for _, access in valid}
+        laboratory_ids = {access.laboratory_id for _, access in valid}
+        
+        # Consultas IN por lote em vez de uma consulta por linha
+        existing_users = set(
+            session.exec(select(User.id).where(User.id.in_(user_ids))).all()
+        ) if user_ids else set()
+        existing_laboratories = set(
+            session.exec(select(Laboratory.id).where(Laboratory.id.in_(laboratory_ids))).all()
+        ) if laboratory_ids else set()
+        existing_accesses = set(
+            session.exec(
+                select(UserLaboratoryAccess.user_id, UserLaboratoryAccess.laboratory_id).where(
+                    UserLaboratoryAccess.user_id.in_(user_ids),
+                    UserLaboratoryAccess.laboratory_id.in_(laboratory_ids)
+                )
+            ).all()
+        ) if user_ids else set()
+        
+        rows = []
+        for row, access in valid:
+            key = (access.user_id, access.laboratory_id)
+            if access.user_id not in existing_users:
+                error = "Usuário não encontrado"
+            elif access.laboratory_id not in existing_laboratories:
+                error = "Laboratório não encontrado"
+            elif key in existing_accesses or key in seen:
+                error = "Usuário já possui acesso a este laboratório"
+            else:
+                seen.add(key)
+                rows.append(UserLaboratoryAccess(
+                    user_id=access.user_id,
+                    laboratory_id=access.laboratory_id,
+                    granted_by=current_admin.id
+                ).model_dump(exclude={"id"}))
+                continue
+            report.errors.append(ImportRowError(row=row, error=error))
+        
+        # INSERT com múltiplas linhas
+        if rows:
+            session.execute(insert(UserLaboratoryAccess), rows)
+            report.created += len(rows)
+    
+    if report.created:
+        publish_invalidation(session, ACCESS)
+    session.commit()
+    report.errors.sort(key=lambda error: error.row)
+    
+    return report
+
+
+def bulk_target(bulk: UserLaboratoryAccessBulk):
+    """Condição sobre User que seleciona os usuários alvo (lista informada ou projeto inteiro)."""
+    if bulk.user_ids is not None:
+        return User.id.in_(bulk.user_ids)
+    return User.project_name == bulk.project_name
+
+
+def require_laboratory(session: Session, laboratory_id: int) -> None:
+    """Garante que o laboratório existe."""
+    if session.get(Laboratory, laboratory_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Laboratório não encontrado"
+        )
+
+
+@router.post(
+    "/bulk",
+    response_model=UserLaboratoryAccessBulkResult,
+    summary="Conceder acessos em lote",
+    description="Concede acesso a um laboratório para uma lista de usuários ou um projeto inteiro (apenas administradores)"
+)
+async def grant_laboratory_access_bulk(
+    bulk: UserLaboratoryAccessBulk,
+    session: Annotated[Session, Depends(get_session)],
+    current_admin: Annotated[User, Depends(get_current_admin)]
+):
+    """
+    Concede acessos em lote com um único INSERT ... SELECT.
+    O SELECT exclui quem já tem acesso (anti-join com NOT EXISTS) e o
+    ON CONFLICT DO NOTHING cobre concessões simultâneas. IDs inexistentes
+    são ignorados.
+    """
+    require_laboratory(session, bulk.laboratory_id)
+    
+    granted_at_type = UserLaboratoryAccess.__table__.c.granted_at.type
+    missing = (
+        select(
+            User.id,
+            literal(bulk.laboratory_id),
+            literal(current_admin.id),
+            literal(datetime.now(timezone.utc), granted_at_type),
+        )
+        .where(bulk_target(bulk))
+        .where(~exists().where(
+            UserLaboratoryAccess.user_id == User.id,
+            UserLaboratoryAccess.laboratory_id == bulk.laboratory_id
+        ))
+    )
+    
+    dialect = session.get_bind().dialect.name
+    statement = CONFLICT_INSERTS.get(dialect, insert)(UserLaboratoryAccess).from_select(
+        ["user_id", "laboratory_id", "granted_by", "granted_at"], missing
+    )
+    if dialect in CONFLICT_INSERTS:
+        statement = statement.on_conflict_do_nothing(index_elements=["user_id", "laboratory_id"])
+    
+    user_ids = sorted(session.execute(statement.returning(UserLaboratoryAccess.user_id)).scalars().all())
+    
+    if user_ids:
+        publish_invalidation(session, ACCESS)
+    session.commit()
+    
+    return UserLaboratoryAccessBulkResult(
+        laboratory_id=bulk.laboratory_id, affected=len(user_ids), user_ids=user_ids
+    )
+
+
+@router.post(
+    "/bulk/revoke",
+    response_model=UserLaboratoryAccessBulkResult,
+    summary="Revogar acessos em lote",
+    description="Revoga o acesso a um laboratório de uma lista de usuários ou de um projeto inteiro (apenas administradores)"
+)
+async def revoke_laboratory_access_bulk(
+    bulk: UserLaboratoryAccessBulk,
+    session: Annotated[Session, Depends(get_session)],
+    current_admin: Annotated[User, Depends(get_current_admin)]
+):
+    """Revoga acessos em lote com um único DELETE."""
+    require_laboratory(session, bulk.laboratory_id)
+    
+    statement = (
+        delete(UserLaboratoryAccess)
+        .where(
+            UserLaboratoryAccess.laboratory_id == bulk.laboratory_id,
+            UserLaboratoryAccess.user_id.in_(select(User.id).where(bulk_target(bulk)))
+        )
+        .returning(UserLaboratoryAccess.user_id)
+    )
+    user_ids = sorted(session.execute(statement).scalars().all())
+    
+    if user_ids:
+        publish_invalidation(session, ACCESS)
+    session.commit()
+    
+    return UserLaboratoryAccessBulkResult(
+        laboratory_id=bulk.laboratory_id, affected=len(user_ids), user_ids=user_ids
+    )
+
+
+EXPAND_DESCRIPTION = "Dados embutidos, separados por vírgula: user, laboratory"
+EXPAND_OPTIONS = ("user", "laboratory")
+
+
+def parse_expand(expand: str | None) -> set[str]:
+    """Valida o parâmetro `expand`."""
+    if expand is None:
+        return set()
+
+    requested = {option.strip() for option in expand.split(",") if option.strip()}
+    unknown = requested - set(EXPAND_OPTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Expansão inválida: {', '.join(sorted(unknown))}. Permitidas: {', '.join(EXPAND_OPTIONS)}"
+        )
+    return requested
+
+
+def list_accesses(session: Session, owner, owner_id: int, expand: set[str]) -> list[dict] | None:
+    """
+    Lista os acessos de um usuário ou laboratório (`owner`) em uma única consulta.
+
+    A consulta parte do dono com LEFT JOIN nos acessos, então também responde
+    se ele existe; usuário e laboratório pedidos em `expand` entram por JOIN
+    na mesma consulta.
+
+    Returns:
+        Acessos como dicionários (com os resumos pedidos) ou None se o dono não existir
+    """
+    owner_column = (
+        UserLaboratoryAccess.user_id if owner is User else UserLaboratoryAccess.laboratory_id
+    )
+    groups = {"access": (UserLaboratoryAccess, list(UserLaboratoryAccessResponse.model_fields))}
+    if "user" in expand:
+        groups["user"] = (User, list(UserSummary.model_fields))
+    if "laboratory" in expand:
+        groups["laboratory"] = (Laboratory, list(LaboratorySummary.model_fields))
+
+    columns = [
+        getattr(model, name).label(f"{group}_{name}")
+        for group, (model, names) in groups.items()
+        for name in names
+    ]
+    statement = (
+        select(owner.id.label("owner_id"), *columns)
+        .select_from(owner)
+        .outerjoin(UserLaboratoryAccess, owner_column == owner.id)
+    )
+    # O dono já está no FROM; só o outro lado precisa de JOIN
+    if "user" in expand and owner is not User:
+        statement = statement.outerjoin(User, User.id == UserLaboratoryAccess.user_id)
+    if "laboratory" in expand and owner is not Laboratory:
+        statement = statement.outerjoin(Laboratory, Laboratory.id == UserLaboratoryAccess.laboratory_id)
+    statement = statement.where(owner.id == owner_id).order_by(UserLaboratoryAccess.id)
+
+    rows = session.execute(statement).all()
+    if not rows:
+        return None
+
+    accesses = []
+    for row in rows:
+        mapping = row._mapping
+        # Dono sem acessos: uma linha com as colunas do acesso nulas
+        if mapping["access_id"] is None:
+            continue
+        access = {name: mapping[f"access_{name}"] for name in groups["access"][1]}
+        for group, (_, names) in groups.items():
+            if group != "access":
+                access[group] = {name: mapping[f"{group}_{name}"] for name in names}
+        accesses.append(access)
+    return accesses
+
+
 @router.get(
     "/user/{user_id}",
-    response_model=list[UserLaboratoryAccessResponse],
+    response_model=list[UserLaboratoryAccessExpanded],
+    response_model_exclude_unset=True,
     summary="Listar acessos de um usuário",
     description="Lista todos os laboratórios que um usuário pode acessar"
 )
 async def list_user_access(
     user_id: int,
     session: Annotated[Session, Depends(get_session)],
-    current_admin: Annotated[User, Depends(get_current_admin)]
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    expand: str | None = Query(None, description=EXPAND_DESCRIPTION)
 ):
     """Lista todos os acessos de um usuário específico."""
-    # Verifica se o usuário existe
-    user = session.get(User, user_id)
-    if not user:
+    accesses = list_accesses(session, User, user_id, parse_expand(expand))
+    if accesses is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
     
-    statement = select(UserLaboratoryAccess).where(
-        UserLaboratoryAccess.user_id == user_id
-    )
-    accesses = session.exec(statement).all()
-    
-    return accesses
+    return [UserLaboratoryAccessExpanded(**access) for access in accesses]
 
 
 @router.get(
     "/laboratory/{laboratory_id}",
-    response_model=list[UserLaboratoryAccessResponse],
+    response_model=list[UserLaboratoryAccessExpanded],
+    response_model_exclude_unset=True,
     summary="Listar usuários com acesso a laboratório",
     description="Lista todos os usuários que têm acesso a um laboratório"
 )
 async def list_laboratory_access(
     laboratory_id: int,
     session: Annotated[Session, Depends(get_session)],
-    current_admin: Annotated[User, Depends(get_current_admin)]
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    expand: str | None = Query(None, description=EXPAND_DESCRIPTION)
 ):
     """Lista todos os usuários com acesso a um laboratório específico."""
-    # Verifica se o laboratório existe
-    laboratory = session.get(Laboratory, laboratory_id)
-    if not laboratory:
+    accesses = list_accesses(session, Laboratory, laboratory_id, parse_expand(expand))
+    if accesses is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Laboratório não encontrado"
         )
     
-    statement = select(UserLaboratoryAccess).where(
-        UserLaboratoryAccess.laboratory_id == laboratory_id
-    )
-    accesses = session.exec(statement).all()
-    
-    return accesses
+    return [UserLaboratoryAccessExpanded(**access) for access in accesses]
 
 
 @router.delete(
@@ -151,6 +400,7 @@ async def revoke_laboratory_access(
         )
     
     session.delete(db_access)
+    publish_invalidation(session, ACCESS, db_access.user_id)
     session.commit()
     
     return None
@@ -266,6 +516,7 @@ async def process_access_request(
             granted_by=current_admin.id
         )
         session.add(access)
+        publish_invalidation(session, ACCESS, db_request.user_id)
     
     session.add(db_request)
     session.commit()
@@ -2,29 +2,79 @@
 Rotas de autenticação: login, registro, logout, etc.
 """
 
+from datetime import datetime, timedelta, timezone
 from typing import Annotated, List
 
 from database import get_session
-from dependencies import get_current_user, get_current_admin
-from fastapi import APIRouter, Depends, HTTPException, status
+from dependencies import get_current_user, get_current_admin, get_token_payload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from models import RegistrationRequest, Role, User
 from schemas import (
     LoginRequest,
+    LogoutRequest,
+    RefreshRequest,
+    RegistrationBatchApprove,
+    RegistrationBatchResult,
     RegistrationRequestApprove,
     RegistrationRequestCreate,
     RegistrationRequestResponse,
     Token,
     UserResponse,
 )
+from sqlalchemy import insert, update
 from sqlmodel import Session, select
 from utils.hash_password import hash_password, verify_password
 from utils.jwt import create_access_token
+from utils.rate_limit import check_rate_limit, rate_limit
+from utils.revocation import revoke_access_token
+from utils.refresh_token import (
+    issue_refresh_token,
+    revoke_refresh_token,
+    revoke_user_tokens,
+    rotate_refresh_token,
+)
 
 router = APIRouter(
     prefix="/auth",
     tags=["Autenticação"],
 )
 
+# Prazo para o hash da senha ser gravado em segundo plano; depois dele a
+# solicitação sem hash pode ser reenviada pelo usuário
+REGISTRATION_HASH_TIMEOUT = timedelta(minutes=2)
+REGISTRATION_HASH_LOST_DETAIL = (
+    "A senha desta solicitação não foi processada. "
+    "O usuário deve enviar a solicitação de cadastro novamente."
+)
+
+
+def hash_registration_password(bind, request_id: int, password: str) -> None:
+    """
+    Grava o hash da senha de uma solicitação de cadastro.
+    Executada em segundo plano, depois da resposta, com uma sessão própria.
+    """
+    hashed_password = hash_password(password)
+    with Session(bind) as session:
+        session.execute(
+            update(RegistrationRequest)
+            .where(RegistrationRequest.id == request_id)
+            .values(hashed_password=hashed_password)
+        )
+        session.commit()
+
+
+def registration_hash_lost(registration_request: RegistrationRequest) -> bool:
+    """
+    Indica se o hash da senha de uma solicitação pendente não foi gravado
+    dentro do prazo, ou seja, se a tarefa de fundo se perdeu.
+    """
+    if registration_request.hashed_password is not None:
+        return False
+    submitted_at = registration_request.submitted_at
+    if submitted_at.tzinfo is None:
+        submitted_at = submitted_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - submitted_at > REGISTRATION_HASH_TIMEOUT
+
 
 @router.post(
     "/request-registration",
@@ -34,13 +84,17 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED,
 )
 def request_registration(
-    request_data: RegistrationRequestCreate, session: Session = Depends(get_session)
+    request_data: RegistrationRequestCreate,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
 ):
     """
     Cria uma solicitação de cadastro para ser analisada por um administrador.
+    A senha é hasheada em segundo plano; o texto nunca é gravado no banco.
 
     Params:
         request_data: Dados da solicitação de cadastro
+        background_tasks: Tarefas executadas após a resposta
         session: Sessão do banco de dados
 
     Returns:
@@ -66,32 +120,47 @@ def request_registration(
     )
     existing_request = session.exec(statement).first()
 
-    if existing_request:
+    if existing_request and not registration_hash_lost(existing_request):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Já existe uma solicitação pendente para este e-mail",
         )
 
-    # Cria a solicitação
-    registration_request = RegistrationRequest(
-        email=request_data.email,
-        password=request_data.password,  # Será hasheada quando aprovada
-        project_name=request_data.project_name,
-        is_processed=False,
-    )
+    if existing_request:
+        # O hash da solicitação anterior se perdeu (worker reiniciado antes da
+        # tarefa de fundo): a nova solicitação a substitui
+        registration_request = existing_request
+        registration_request.project_name = request_data.project_name
+        registration_request.submitted_at = datetime.now(timezone.utc)
+    else:
+        # Cria a solicitação
+        registration_request = RegistrationRequest(
+            email=request_data.email,
+            project_name=request_data.project_name,
+            is_processed=False,
+        )
 
     session.add(registration_request)
     session.commit()
     session.refresh(registration_request)
 
+    # O bcrypt roda fora do caminho da requisição
+    background_tasks.add_task(
+        hash_registration_password,
+        session.get_bind(),
+        registration_request.id,
+        request_data.password,
+    )
+
     return registration_request
 
 
 @router.post(
     "/login",
     summary="Fazer login",
-    description="Autentica um usuário e retorna um token JWT",
+    description="Autentica um usuário e retorna um token JWT e um token de renovação",
     response_model=Token,
+    dependencies=[Depends(rate_limit("login"))],
 )
 def login(login_data: LoginRequest, session: Session = Depends(get_session)):
     """
@@ -102,11 +171,14 @@ def login(login_data: LoginRequest, session: Session = Depends(get_session)):
         session: Sessão do banco de dados
 
     Returns:
-        Token de acesso JWT
+        Token de acesso JWT e token de renovação
 
     Raises:
-        HTTPException: Se as credenciais forem inválidas
+        HTTPException: Se as credenciais forem inválidas ou o limite de tentativas for excedido
     """
+    # Limite por conta, antes da consulta ao banco e do bcrypt
+    check_rate_limit("login_account", login_data.email.lower())
+
     # Busca o usuário pelo e-mail
     statement = select(User).where(User.email == login_data.email)
     user = session.exec(statement).first()
@@ -125,32 +197,88 @@ def login(login_data: LoginRequest, session: Session = Depends(get_session)):
             status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo"
         )
 
-    # Cria o token de acesso
+    # Cria o token de acesso e o de renovação
+    access_token = create_access_token(data={"sub": user.email})
+    refresh_token, _ = issue_refresh_token(session, user.id)
+    session.commit()
+
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+@router.post(
+    "/refresh",
+    summary="Renovar sessão",
+    description="Troca um token de renovação por um novo token de acesso (o token usado é revogado)",
+    response_model=Token,
+)
+def refresh(refresh_data: RefreshRequest, session: Session = Depends(get_session)):
+    """
+    Renova a sessão sem repetir o login (sem bcrypt).
+
+    Params:
+        refresh_data: Token de renovação
+        session: Sessão do banco de dados
+
+    Returns:
+        Novo token de acesso e novo token de renovação
+
+    Raises:
+        HTTPException: Se o token for inválido, expirado, já usado ou o usuário estiver inativo
+    """
+    rotated = rotate_refresh_token(session, refresh_data.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de renovação inválido ou expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Para usuário inativo nenhum token novo é emitido
+    user, refresh_token = rotated
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo"
+        )
+
     access_token = create_access_token(data={"sub": user.email})
 
-    return Token(access_token=access_token, token_type="bearer")
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
 
 
 @router.post(
     "/logout",
     summary="Fazer logout",
-    description="Invalida o token do usuário autenticado",
+    description="Revoga o token de acesso e os tokens de renovação do usuário autenticado",
     status_code=status.HTTP_200_OK,
 )
-def logout(current_user: Annotated[User, Depends(get_current_user)]):
+def logout(
+    current_user: Annotated[User, Depends(get_current_user)],
+    payload: Annotated[dict, Depends(get_token_payload)],
+    session: Annotated[Session, Depends(get_session)],
+    logout_data: LogoutRequest | None = None,
+):
     """
     Realiza o logout do usuário.
 
     Params:
         current_user: Usuário autenticado
+        payload: Claims do token de acesso usado na requisição
+        session: Sessão do banco de dados
+        logout_data: Token de renovação da sessão atual (sem ele, todas as sessões são encerradas)
 
     Returns:
         Mensagem de confirmação
     """
+    if logout_data and logout_data.refresh_token:
+        revoke_refresh_token(session, logout_data.refresh_token, current_user.id)
+    else:
+        revoke_user_tokens(session, current_user.id)
+    revoke_access_token(session, payload)
+    session.commit()
 
     return {
         "message": "Logout realizado com sucesso",
-        "detail": "O token deve ser removido do armazenamento local no cliente",
+        "detail": "O token de acesso foi revogado e deve ser removido do armazenamento local no cliente",
     }
 
 
@@ -182,6 +310,101 @@ def list_registration_requests(
     return requests
 
 
+@router.post(
+    "/registration-requests/approve-batch",
+    summary="Aprovar solicitações de cadastro em lote (RF07)",
+    description="Aprova várias solicitações de cadastro em uma única transação (apenas administradores)",
+    response_model=List[RegistrationBatchResult],
+)
+def approve_registration_requests_batch(
+    batch: RegistrationBatchApprove,
+    session: Session = Depends(get_session),
+    current_user: Annotated[User, Depends(get_current_admin)] = None,
+):
+    """
+    Aprova solicitações de cadastro em lote.
+    Apenas administradores podem executar esta ação.
+
+    As solicitações e os e-mails já cadastrados são buscados com uma consulta
+    IN cada; os usuários são criados com um INSERT de múltiplas linhas e as
+    solicitações marcadas como processadas na mesma transação. Itens inválidos
+    são relatados individualmente e não impedem os demais.
+
+    Params:
+        batch: IDs das solicitações e perfis dos usuários
+        session: Sessão do banco de dados
+        current_user: Usuário autenticado (deve ser administrador)
+
+    Returns:
+        Resultado de cada item, na ordem recebida
+    """
+    ids = {item.id for item in batch.items}
+    requests = {
+        request.id: request
+        for request in session.exec(
+            select(RegistrationRequest)
+            .where(RegistrationRequest.id.in_(ids))
+            .execution_options(populate_existing=True)
+        ).all()
+    }
+    emails = {request.email for request in requests.values()}
+    existing_emails = set(
+        session.exec(select(User.email).where(User.email.in_(emails))).all()
+    ) if emails else set()
+
+    results = []
+    rows = []
+    positions = {}
+    processed_ids = []
+    seen = set()
+    for item in batch.items:
+        request = requests.get(item.id)
+        error = None
+        if item.id in seen:
+            error = "Solicitação repetida no lote"
+        elif request is None:
+            error = "Solicitação não encontrada"
+        elif request.is_processed:
+            error = "Esta solicitação já foi processada"
+        elif item.role not in Role.__members__:
+            error = "Role inválido. Deve ser 'aluno' ou 'professor'"
+        elif request.email in existing_emails:
+            # Como na aprovação individual, a solicitação é encerrada
+            error = "E-mail já cadastrado no sistema"
+            processed_ids.append(request.id)
+        elif registration_hash_lost(request):
+            error = REGISTRATION_HASH_LOST_DETAIL
+        elif request.hashed_password is None:
+            error = "A senha desta solicitação ainda está sendo processada. Tente novamente em instantes."
+        else:
+            processed_ids.append(request.id)
+            positions[request.email] = len(results)
+            rows.append(User(
+                email=request.email,
+                hashed_password=request.hashed_password,
+                role=Role(item.role),
+                project_name=request.project_name,
+                is_active=True,
+            ).model_dump(exclude={"id"}))
+        seen.add(item.id)
+        results.append(RegistrationBatchResult(id=item.id, approved=error is None, error=error))
+
+    # INSERT com múltiplas linhas, devolvendo os usuários criados
+    if rows:
+        for user in session.scalars(insert(User).returning(User), rows).all():
+            results[positions[user.email]].user = UserResponse.model_validate(user)
+
+    if processed_ids:
+        session.execute(
+            update(RegistrationRequest)
+            .where(RegistrationRequest.id.in_(processed_ids))
+            .values(is_processed=True)
+        )
+    session.commit()
+
+    return results
+
+
 @router.post(
     "/registration-requests/{request_id}/approve",
     summary="Aprovar solicitação de cadastro (RF07)",
@@ -211,8 +434,10 @@ def approve_registration_request(
     Raises:
         HTTPException: Se a solicitação não for encontrada, já foi processada ou o role for inválido
     """
-    # Busca a solicitação
-    registration_request = session.get(RegistrationRequest, request_id)
+    # Busca a solicitação (recarregada: o hash da senha é gravado por outra sessão)
+    registration_request = session.get(
+        RegistrationRequest, request_id, populate_existing=True
+    )
 
     if not registration_request:
         raise HTTPException(
@@ -225,6 +450,17 @@ def approve_registration_request(
             detail="Esta solicitação já foi processada",
         )
 
+    if registration_hash_lost(registration_request):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=REGISTRATION_HASH_LOST_DETAIL,
+        )
+    if registration_request.hashed_password is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A senha desta solicitação ainda está sendo processada. Tente novamente em instantes.",
+        )
+
     # Valida o role
     try:
         role = Role(approval_data.role)
@@ -248,10 +484,10 @@ def approve_registration_request(
             detail="E-mail já cadastrado no sistema",
         )
 
-    # Cria o usuário com senha hasheada
+    # Cria o usuário com o hash calculado no envio da solicitação
     db_user = User(
         email=registration_request.email,
-        hashed_password=hash_password(registration_request.password),
+        hashed_password=registration_request.hashed_password,
         role=role,
         project_name=registration_request.project_name,
         is_active=True,
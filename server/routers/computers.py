@@ -3,12 +3,20 @@ Rotas para gerenciamento de computadores.
 """
 from datetime import datetime, timezone
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy import insert
 from sqlmodel import Session, select
-from database import get_session
+from database import get_read_session, get_session, reads_from_replica
 from dependencies import get_current_user, get_current_admin
 from models import Computer, Laboratory, User
-from schemas import ComputerCreate, ComputerUpdate, ComputerResponse
+from schemas import (
+    ComputerCreate, ComputerUpdate, ComputerResponse, ImportReport, ImportRowError
+)
+from utils.bulk_import import iter_batches, iter_records, resolve_format, validate_batch
+from utils.cache import COMPUTERS, cache, publish_invalidation
+from utils.fieldsets import (
+    FIELDS_DESCRIPTION, model_columns, project_fields, select_fields, sparse_response
+)
 
 router = APIRouter(
     prefix="/computers",
@@ -57,12 +65,79 @@ async def create_computer(
     )
     
     session.add(db_computer)
+    publish_invalidation(session, COMPUTERS)
     session.commit()
     session.refresh(db_computer)
     
     return db_computer
 
 
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    summary="Importar computadores",
+    description="Cadastra computadores em lote a partir de um arquivo CSV ou NDJSON (apenas administradores)"
+)
+async def import_computers(
+    session: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_admin)],
+    file: UploadFile = File(description="Arquivo com as colunas name, laboratory_id, specifications"),
+    file_format: str | None = Query(None, alias="format", description="csv ou ndjson (padrão: pela extensão)")
+):
+    """
+    Importa computadores em lote.
+    Linhas inválidas, com laboratório inexistente ou com nome repetido no
+    laboratório são relatadas; as demais são gravadas em uma única transação.
+    """
+    file_format = resolve_format(file, file_format)
+    report = ImportReport()
+    seen = set()
+    
+    for batch in iter_batches(iter_records(file, file_format)):
+        valid = validate_batch(batch, ComputerCreate, report)
+        
+        laboratory_ids = {computer.laboratory_id for _, computer in valid}
+        names = {computer.name for _, computer in valid}
+        
+        # Uma consulta IN por lote para laboratórios e outra para nomes já usados
+        existing_laboratories = set(
+            session.exec(select(Laboratory.id).where(Laboratory.id.in_(laboratory_ids))).all()
+        ) if laboratory_ids else set()
+        existing_computers = set(
+            session.exec(
+                select(Computer.name, Computer.laboratory_id).where(
+                    Computer.laboratory_id.in_(laboratory_ids),
+                    Computer.name.in_(names)
+                )
+            ).all()
+        ) if names else set()
+        
+        rows = []
+        for row, computer in valid:
+            key = (computer.name, computer.laboratory_id)
+            if computer.laboratory_id not in existing_laboratories:
+                error = "Laboratório não encontrado"
+            elif key in existing_computers or key in seen:
+                error = f"Computador '{computer.name}' já existe neste laboratório"
+            else:
+                seen.add(key)
+                rows.append(Computer(**computer.model_dump()).model_dump(exclude={"id"}))
+                continue
+            report.errors.append(ImportRowError(row=row, error=error))
+        
+        # INSERT com múltiplas linhas
+        if rows:
+            session.execute(insert(Computer), rows)
+            report.created += len(rows)
+    
+    if report.created:
+        publish_invalidation(session, COMPUTERS)
+    session.commit()
+    report.errors.sort(key=lambda error: error.row)
+    
+    return report
+
+
 @router.get(
     "/",
     response_model=list[ComputerResponse],
@@ -70,21 +145,37 @@ async def create_computer(
     description="Lista todos os computadores cadastrados"
 )
 async def list_computers(
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[Session, Depends(get_read_session)],
     current_user: Annotated[User, Depends(get_current_user)],
     laboratory_id: int | None = None,
-    include_inactive: bool = False
+    include_inactive: bool = False,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """Lista computadores, opcionalmente filtrados por laboratório."""
-    statement = select(Computer)
+    names = select_fields(fields, ComputerResponse)
+    
+    # O catálogo completo fica no cache do worker; `fields` só recorta a resposta
+    cache_key = f"list:{laboratory_id}:{include_inactive}"
+    computers = cache.get(COMPUTERS, cache_key)
     
-    if laboratory_id is not None:
-        statement = statement.where(Computer.laboratory_id == laboratory_id)
+    if computers is None:
+        generation = cache.generation(COMPUTERS)
+        statement = select(*model_columns(Computer, list(ComputerResponse.model_fields)))
+        
+        if laboratory_id is not None:
+            statement = statement.where(Computer.laboratory_id == laboratory_id)
+        
+        if not include_inactive:
+            statement = statement.where(Computer.is_active == True)
+        
+        computers = [dict(row._mapping) for row in session.execute(statement).all()]
+        # Leituras de réplica podem estar atrasadas e não alimentam o cache
+        if not reads_from_replica(session):
+            cache.set(COMPUTERS, cache_key, computers, generation)
     
-    if not include_inactive:
-        statement = statement.where(Computer.is_active == True)
+    if fields is not None:
+        return sparse_response(project_fields(computers, names))
     
-    computers = session.exec(statement).all()
     return computers
 
 
@@ -155,6 +246,7 @@ async def update_computer(
     db_computer.updated_at = datetime.now(timezone.utc)
     
     session.add(db_computer)
+    publish_invalidation(session, COMPUTERS)
     session.commit()
     session.refresh(db_computer)
     
@@ -182,6 +274,7 @@ async def delete_computer(
         )
     
     session.delete(db_computer)
+    publish_invalidation(session, COMPUTERS)
     session.commit()
     
     return None
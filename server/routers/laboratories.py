@@ -3,12 +3,25 @@ Rotas para gerenciamento de laboratórios.
 """
 from datetime import datetime, timezone
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert
 from sqlmodel import Session, select
-from database import get_session
+from database import get_read_session, get_session, reads_from_replica
 from dependencies import get_current_user, get_current_admin
-from models import Laboratory, User
-from schemas import LaboratoryCreate, LaboratoryUpdate, LaboratoryResponse
+from models import Laboratory, Reservation, ReservationStatus, Role, User
+from schemas import (
+    LaboratoryCreate, LaboratoryUpdate, LaboratoryResponse, ImportReport, ImportRowError
+)
+from utils.bulk_import import iter_batches, iter_records, resolve_format, validate_batch
+from utils.cache import COMPUTERS, LABORATORIES, cache, publish_invalidation
+from utils.confidential import redacted_column
+from utils.fieldsets import (
+    FIELDS_DESCRIPTION, model_columns, project_fields, select_fields, sparse_response
+)
+from utils.ical import (
+    ICAL_FETCH_SIZE, build_etag, build_vevent, calendar_stream, etag_matches
+)
 
 router = APIRouter(
     prefix="/laboratories",
@@ -46,12 +59,66 @@ async def create_laboratory(
     )
     
     session.add(db_laboratory)
+    publish_invalidation(session, LABORATORIES)
     session.commit()
     session.refresh(db_laboratory)
     
     return db_laboratory
 
 
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    summary="Importar laboratórios",
+    description="Cadastra laboratórios em lote a partir de um arquivo CSV ou NDJSON (apenas administradores)"
+)
+async def import_laboratories(
+    session: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_admin)],
+    file: UploadFile = File(description="Arquivo com as colunas name, description, capacity"),
+    file_format: str | None = Query(None, alias="format", description="csv ou ndjson (padrão: pela extensão)")
+):
+    """
+    Importa laboratórios em lote.
+    Linhas inválidas ou com nome repetido são relatadas; as demais são gravadas
+    em uma única transação.
+    """
+    file_format = resolve_format(file, file_format)
+    report = ImportReport()
+    seen_names = set()
+    
+    for batch in iter_batches(iter_records(file, file_format)):
+        valid = validate_batch(batch, LaboratoryCreate, report)
+        
+        # Uma única consulta por lote para os nomes já cadastrados
+        names = {laboratory.name for _, laboratory in valid}
+        existing_names = set(
+            session.exec(select(Laboratory.name).where(Laboratory.name.in_(names))).all()
+        ) if names else set()
+        
+        rows = []
+        for row, laboratory in valid:
+            if laboratory.name in existing_names or laboratory.name in seen_names:
+                report.errors.append(ImportRowError(
+                    row=row, error=f"Laboratório com nome '{laboratory.name}' já existe"
+                ))
+                continue
+            seen_names.add(laboratory.name)
+            rows.append(Laboratory(**laboratory.model_dump()).model_dump(exclude={"id"}))
+        
+        # INSERT com múltiplas linhas
+        if rows:
+            session.execute(insert(Laboratory), rows)
+            report.created += len(rows)
+    
+    if report.created:
+        publish_invalidation(session, LABORATORIES)
+    session.commit()
+    report.errors.sort(key=lambda error: error.row)
+    
+    return report
+
+
 @router.get(
     "/",
     response_model=list[LaboratoryResponse],
@@ -59,17 +126,33 @@ async def create_laboratory(
     description="Lista todos os laboratórios cadastrados"
 )
 async def list_laboratories(
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[Session, Depends(get_read_session)],
     current_user: Annotated[User, Depends(get_current_user)],
-    include_inactive: bool = False
+    include_inactive: bool = False,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """Lista todos os laboratórios do sistema."""
-    statement = select(Laboratory)
+    names = select_fields(fields, LaboratoryResponse)
     
-    if not include_inactive:
-        statement = statement.where(Laboratory.is_active == True)
+    # O catálogo completo fica no cache do worker; `fields` só recorta a resposta
+    cache_key = f"list:{include_inactive}"
+    laboratories = cache.get(LABORATORIES, cache_key)
+    
+    if laboratories is None:
+        generation = cache.generation(LABORATORIES)
+        statement = select(*model_columns(Laboratory, list(LaboratoryResponse.model_fields)))
+        
+        if not include_inactive:
+            statement = statement.where(Laboratory.is_active == True)
+        
+        laboratories = [dict(row._mapping) for row in session.execute(statement).all()]
+        # Leituras de réplica podem estar atrasadas e não alimentam o cache
+        if not reads_from_replica(session):
+            cache.set(LABORATORIES, cache_key, laboratories, generation)
+    
+    if fields is not None:
+        return sparse_response(project_fields(laboratories, names))
     
-    laboratories = session.exec(statement).all()
     return laboratories
 
 
@@ -96,6 +179,80 @@ async def get_laboratory(
     return laboratory
 
 
+@router.get(
+    "/{laboratory_id}/calendar.ics",
+    summary="Calendário do laboratório",
+    description="Feed iCalendar com as reservas aprovadas do laboratório (suporta If-None-Match)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/calendar": {}}}, 304: {"description": "Calendário não modificado"}}
+)
+async def laboratory_calendar(
+    laboratory_id: int,
+    request: Request,
+    session: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_user)]
+):
+    """Gera o feed iCalendar das reservas aprovadas de um laboratório."""
+    laboratory = session.get(Laboratory, laboratory_id)
+    
+    if not laboratory:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Laboratório não encontrado"
+        )
+    
+    # A ETag muda quando qualquer reserva do laboratório é alterada; o
+    # observador entra na ETag porque a ocultação de confidenciais depende dele
+    latest_update, approved_count = session.exec(
+        select(
+            func.max(Reservation.updated_at),
+            func.count(Reservation.id).filter(Reservation.status == ReservationStatus.approved)
+        ).where(Reservation.laboratory_id == laboratory_id)
+    ).one()
+    viewer = "admin" if current_user.role == Role.admin else current_user.id
+    etag = build_etag(
+        "laboratory", laboratory_id, viewer, latest_update, approved_count, laboratory.updated_at
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # Cursor no servidor: as reservas são lidas em blocos enquanto o feed é enviado
+    statement = (
+        select(
+            Reservation.id,
+            Reservation.start_time,
+            Reservation.end_time,
+            redacted_column(Reservation, "title", current_user),
+            redacted_column(Reservation, "description", current_user),
+            Reservation.updated_at
+        )
+        .where(
+            Reservation.laboratory_id == laboratory_id,
+            Reservation.status == ReservationStatus.approved
+        )
+        .order_by(Reservation.start_time)
+        .execution_options(yield_per=ICAL_FETCH_SIZE)
+    )
+    rows = session.exec(statement)
+    location = laboratory.name
+    
+    events = (
+        build_vevent(
+            row.id, row.start_time, row.end_time, row.title, row.description, location, row.updated_at
+        )
+        for row in rows
+    )
+    
+    headers["Content-Disposition"] = f'inline; filename="laboratorio-{laboratory_id}.ics"'
+    return StreamingResponse(
+        calendar_stream(location, events),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers
+    )
+
+
 @router.patch(
     "/{laboratory_id}",
     response_model=LaboratoryResponse,
@@ -136,6 +293,7 @@ async def update_laboratory(
     db_laboratory.updated_at = datetime.now(timezone.utc)
     
     session.add(db_laboratory)
+    publish_invalidation(session, LABORATORIES)
     session.commit()
     session.refresh(db_laboratory)
     
@@ -163,6 +321,8 @@ async def delete_laboratory(
         )
     
     session.delete(db_laboratory)
+    publish_invalidation(session, LABORATORIES)
+    publish_invalidation(session, COMPUTERS)
     session.commit()
     
     return None
@@ -0,0 +1,182 @@
+"""
+Rotas de relatórios de utilização dos laboratórios.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func
+from sqlmodel import Session, select
+from database import get_read_session
+from dependencies import get_current_professor_or_admin
+from models import (
+    Reservation, ReservationArchive, ReservationDailyStats, User
+)
+from schemas import (
+    DailyUtilization, HourlyUtilization, UtilizationReport,
+    HeatmapResponse, LaboratoryHeatmap
+)
+from utils.archive import needs_archive
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["Reports"],
+)
+
+# Período máximo aceito pelo mapa de calor (memória proporcional a dias × laboratórios)
+HEATMAP_MAX_DAYS = 366
+
+
+def resolve_period(from_date: date | None, to_date: date | None) -> tuple[date, date]:
+    """Aplica os valores padrão do período (últimos 30 dias) e valida a ordem das datas."""
+    to_date = to_date or datetime.now(timezone.utc).date()
+    from_date = from_date or to_date - timedelta(days=30)
+    
+    if to_date < from_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A data final deve ser igual ou posterior à inicial"
+        )
+    
+    return from_date, to_date
+
+
+@router.get(
+    "/utilization",
+    response_model=UtilizationReport,
+    summary="Relatório de utilização",
+    description="Horas reservadas por laboratório/computador/dia, taxa de aprovação e horários de pico"
+)
+async def utilization_report(
+    session: Annotated[Session, Depends(get_read_session)],
+    current_user: Annotated[User, Depends(get_current_professor_or_admin)],
+    from_date: date | None = Query(None, alias="from", description="Primeiro dia do período (padrão: 30 dias atrás)"),
+    to_date: date | None = Query(None, alias="to", description="Último dia do período (padrão: hoje)"),
+    laboratory_id: int | None = Query(None, description="Filtrar por laboratório")
+):
+    """Gera o relatório de utilização lendo apenas os agregados diários."""
+    from_date, to_date = resolve_period(from_date, to_date)
+    
+    filters = [
+        ReservationDailyStats.day >= from_date,
+        ReservationDailyStats.day <= to_date
+    ]
+    if laboratory_id is not None:
+        filters.append(ReservationDailyStats.laboratory_id == laboratory_id)
+    
+    booked_minutes = func.sum(ReservationDailyStats.booked_minutes)
+    
+    # Totais do período
+    totals = session.exec(
+        select(
+            func.coalesce(booked_minutes, 0),
+            func.coalesce(func.sum(ReservationDailyStats.approved_count), 0),
+            func.coalesce(func.sum(ReservationDailyStats.rejected_count), 0),
+            func.coalesce(func.sum(ReservationDailyStats.cancelled_count), 0)
+        ).where(*filters)
+    ).one()
+    total_minutes, approved, rejected, cancelled = totals
+    
+    # Horas reservadas por dia, laboratório e computador
+    daily_rows = session.exec(
+        select(
+            ReservationDailyStats.day,
+            ReservationDailyStats.laboratory_id,
+            ReservationDailyStats.computer_id,
+            booked_minutes
+        )
+        .where(*filters)
+        .group_by(
+            ReservationDailyStats.day,
+            ReservationDailyStats.laboratory_id,
+            ReservationDailyStats.computer_id
+        )
+        .having(booked_minutes > 0)
+        .order_by(ReservationDailyStats.day, ReservationDailyStats.laboratory_id)
+    ).all()
+    
+    # Horários de pico: horas do dia com mais tempo reservado
+    hourly_rows = session.exec(
+        select(ReservationDailyStats.hour, booked_minutes)
+        .where(*filters)
+        .group_by(ReservationDailyStats.hour)
+        .having(booked_minutes > 0)
+        .order_by(booked_minutes.desc(), ReservationDailyStats.hour)
+    ).all()
+    
+    decided = approved + rejected
+    
+    return UtilizationReport(
+        from_date=from_date,
+        to_date=to_date,
+        laboratory_id=laboratory_id,
+        total_booked_hours=round(total_minutes / 60, 2),
+        approved_count=approved,
+        rejected_count=rejected,
+        cancelled_count=cancelled,
+        approval_rate=round(approved / decided, 4) if decided else None,
+        daily=[
+            DailyUtilization(
+                day=day,
+                laboratory_id=lab_id,
+                computer_id=computer_id,
+                booked_hours=round(minutes / 60, 2)
+            )
+            for day, lab_id, computer_id, minutes in daily_rows
+        ],
+        peak_hours=[
+            HourlyUtilization(hour=hour, booked_hours=round(minutes / 60, 2))
+            for hour, minutes in hourly_rows
+        ]
+    )
+
+
+@router.get(
+    "/heatmap",
+    response_model=HeatmapResponse,
+    summary="Mapa de calor semanal",
+    description="Fração de tempo ocupado por laboratório em cada hora da semana (UTC)"
+)
+async def heatmap_report(
+    session: Annotated[Session, Depends(get_read_session)],
+    current_user: Annotated[User, Depends(get_current_professor_or_admin)],
+    from_date: date | None = Query(None, alias="from", description="Primeiro dia do período (padrão: 30 dias atrás)"),
+    to_date: date | None = Query(None, alias="to", description="Último dia do período (padrão: hoje)"),
+    laboratory_id: int | None = Query(None, description="Filtrar por laboratório")
+):
+    """Calcula o mapa de calor a partir das reservas aprovadas do período."""
+    # Importado sob demanda: o numpy pesa na inicialização e só este relatório o usa
+    from utils.heatmap import fetch_reservation_minutes, period_bounds, weekly_occupancy
+    
+    from_date, to_date = resolve_period(from_date, to_date)
+    
+    if (to_date - from_date).days >= HEATMAP_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O período do mapa de calor não pode exceder {HEATMAP_MAX_DAYS} dias"
+        )
+    
+    range_start, range_end = period_bounds(from_date, to_date)
+    
+    models = [Reservation]
+    if needs_archive(range_start):
+        models.append(ReservationArchive)
+    
+    # Lê apenas as colunas necessárias, já em minutos, sem carregar objetos do ORM
+    laboratory_ids, start_minutes, end_minutes = fetch_reservation_minutes(
+        session, models, range_start, range_end, laboratory_id
+    )
+    labs, occupancy = weekly_occupancy(
+        laboratory_ids, start_minutes, end_minutes, from_date, to_date
+    )
+    
+    return HeatmapResponse(
+        from_date=from_date,
+        to_date=to_date,
+        laboratories=[
+            LaboratoryHeatmap(
+                laboratory_id=int(lab_id),
+                occupancy=occupancy[index].round(4).tolist()
+            )
+            for index, lab_id in enumerate(labs)
+        ]
+    )
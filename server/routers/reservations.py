@@ -1,20 +1,35 @@
 """
 Rotas para gerenciamento de reservas de laboratórios e computadores.
 """
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, time, timezone, timedelta
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import union_all, update
 from sqlmodel import Session, select, and_, or_
-from database import get_session
+from database import get_read_session, get_session
 from dependencies import get_current_user, get_current_admin, get_current_professor_or_admin
 from models import (
-    Reservation, ReservationStatus, ReservationType, 
+    Reservation, ReservationArchive, ReservationStatus, ReservationType, 
     User, Laboratory, Computer, UserLaboratoryAccess, Role
 )
 from schemas import (
     ReservationCreate, ReservationUpdate, ReservationResponse,
-    ReservationApprove, ReservationReject
+    ReservationApprove, ReservationReject, ReservationClaimResponse,
+    ConflictGraphNode, ConflictGraphResponse
 )
+from utils.archive import needs_archive
+from utils.cache import ACCESS, cache
+from utils.confidential import reservation_columns
+from utils.conflicts import conflict_graph
+from utils.export import (
+    EXPORT_CHUNK_SIZE, EXPORT_COLUMNS, EXPORT_FORMATS,
+    csv_stream, parquet_available, parquet_stream
+)
+from utils.fieldsets import FIELDS_DESCRIPTION, select_fields, sparse_response
+from utils.ical import etag_matches
+from utils.rate_limit import rate_limit
+from utils.stats import update_reservation_stats
 
 router = APIRouter(
     prefix="/reservations",
@@ -28,48 +43,44 @@ def check_user_has_access(user: User, laboratory_id: int, session: Session) -> b
     if user.role == Role.admin:
         return True
     
-    # Verifica se tem permissão explícita
-    statement = select(UserLaboratoryAccess).where(
-        UserLaboratoryAccess.user_id == user.id,
-        UserLaboratoryAccess.laboratory_id == laboratory_id
-    )
-    access = session.exec(statement).first()
-    return access is not None
+    # Laboratórios com permissão explícita, mantidos no cache do worker
+    laboratory_ids = cache.get(ACCESS, user.id)
+    if laboratory_ids is None:
+        generation = cache.generation(ACCESS)
+        statement = select(UserLaboratoryAccess.laboratory_id).where(
+            UserLaboratoryAccess.user_id == user.id
+        )
+        laboratory_ids = frozenset(session.exec(statement).all())
+        cache.set(ACCESS, user.id, laboratory_ids, generation)
+    
+    return laboratory_id in laboratory_ids
 
 
-def check_time_conflicts(
+def conflict_conditions(
     laboratory_id: int,
     start_time: datetime,
     end_time: datetime,
-    session: Session,
-    computer_id: int | None = None,
-    exclude_reservation_id: int | None = None
-) -> Reservation | None:
+    computer_id: int | None = None
+) -> list:
     """
-    Verifica se há conflitos de horário para uma reserva.
-    Retorna a primeira reserva conflitante encontrada ou None.
+    Condições WHERE das reservas que conflitam com o horário informado,
+    qualquer que seja o status delas.
     """
-    # Query base: reservas aprovadas no mesmo laboratório
-    statement = select(Reservation).where(
+    conditions = [
         Reservation.laboratory_id == laboratory_id,
-        Reservation.status == ReservationStatus.approved,
         # Conflito de horário: overlap de intervalos
         or_(
             and_(Reservation.start_time <= start_time, Reservation.end_time > start_time),
             and_(Reservation.start_time < end_time, Reservation.end_time >= end_time),
             and_(Reservation.start_time >= start_time, Reservation.end_time <= end_time)
         )
-    )
-    
-    # Exclui a própria reserva se for atualização
-    if exclude_reservation_id:
-        statement = statement.where(Reservation.id != exclude_reservation_id)
+    ]
     
     # Se for reserva de computador, só conflita com:
     # 1. Reservas de sala completa
     # 2. Reservas do mesmo computador
     if computer_id:
-        statement = statement.where(
+        conditions.append(
             or_(
                 Reservation.reservation_type == ReservationType.room,
                 Reservation.computer_id == computer_id
@@ -79,10 +90,166 @@ def check_time_conflicts(
         # Se for reserva de sala completa, conflita com qualquer reserva
         pass
     
+    return conditions
+
+
+def check_time_conflicts(
+    laboratory_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    session: Session,
+    computer_id: int | None = None,
+    exclude_reservation_id: int | None = None
+) -> Reservation | None:
+    """
+    Verifica se há conflitos de horário para uma reserva.
+    Retorna a primeira reserva conflitante encontrada ou None.
+    """
+    # Query base: reservas aprovadas no mesmo laboratório
+    statement = select(Reservation).where(
+        Reservation.status == ReservationStatus.approved,
+        *conflict_conditions(laboratory_id, start_time, end_time, computer_id)
+    )
+    
+    # Exclui a própria reserva se for atualização
+    if exclude_reservation_id:
+        statement = statement.where(Reservation.id != exclude_reservation_id)
+    
     conflict = session.exec(statement).first()
     return conflict
 
 
+def lock_for_approval(session: Session, reservation: Reservation) -> None:
+    """
+    Trava, em ordem de id, a reserva a aprovar e as pendentes que conflitam com ela.
+
+    Sem isso, dois administradores aprovando pendentes que conflitam entre si
+    travariam cada um a sua reserva e esperariam um pelo outro na reprovação
+    em lote (deadlock). Com a mesma ordem, o segundo espera o primeiro
+    terminar e então encontra a sua reserva já alterada (412).
+    """
+    statement = (
+        select(Reservation.id)
+        .where(
+            or_(
+                Reservation.id == reservation.id,
+                and_(
+                    Reservation.status == ReservationStatus.pending,
+                    *conflict_conditions(
+                        reservation.laboratory_id,
+                        reservation.start_time,
+                        reservation.end_time,
+                        reservation.computer_id
+                    )
+                )
+            )
+        )
+        .order_by(Reservation.id)
+        .with_for_update()
+    )
+    session.exec(statement).all()
+
+
+def reject_conflicting_pending(session: Session, approved: Reservation, admin: User) -> list[int]:
+    """
+    Reprova, em um único UPDATE, as reservas pendentes que a aprovação de
+    `approved` tornou impossíveis (mesmas regras de `check_time_conflicts`).
+    Não faz commit: as reprovações entram na transação da aprovação.
+
+    Returns:
+        IDs das reservas reprovadas
+    """
+    now = datetime.now(timezone.utc)
+    rejected = session.scalars(
+        update(Reservation)
+        .where(
+            Reservation.status == ReservationStatus.pending,
+            Reservation.id != approved.id,
+            *conflict_conditions(
+                approved.laboratory_id, approved.start_time, approved.end_time, approved.computer_id
+            )
+        )
+        .values(
+            status=ReservationStatus.rejected,
+            reviewed_by=admin.id,
+            reviewed_at=now,
+            rejection_reason=f"Reprovada automaticamente: conflito de horário com a reserva {approved.id}, aprovada.",
+            claimed_by=None,
+            claimed_until=None,
+            version=Reservation.version + 1,
+            updated_at=now
+        )
+        .returning(Reservation)
+    ).all()
+    
+    for reservation in rejected:
+        update_reservation_stats(session, reservation, old_status=ReservationStatus.pending)
+    
+    return sorted(reservation.id for reservation in rejected)
+
+
+# Fila de análise: quantas reservas pendentes cada pedido entrega e por quanto tempo
+CLAIM_SIZE = 10
+CLAIM_MAX_SIZE = 50
+CLAIM_LEASE_MINUTES = 15
+
+# Cabeçalho da aprovação com as pendentes reprovadas automaticamente
+REJECTED_RESERVATIONS_HEADER = "X-Rejected-Reservations"
+
+# Resposta das alterações feitas sobre uma versão desatualizada da reserva
+STALE_RESERVATION_DETAIL = "A reserva foi alterada por outra requisição. Recarregue-a e tente novamente."
+
+
+def reservation_etag(version: int) -> str:
+    """ETag de uma reserva: a sua versão, incrementada a cada alteração."""
+    return f'"{version}"'
+
+
+def check_if_match(if_match: str | None, reservation: Reservation) -> None:
+    """Recusa a alteração (412) se o cliente enviou If-Match de uma versão antiga."""
+    if if_match and not etag_matches(if_match, reservation_etag(reservation.version)):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=STALE_RESERVATION_DETAIL
+        )
+
+
+def save_reservation(session: Session, reservation: Reservation, **values) -> None:
+    """
+    Grava `values` na reserva com um UPDATE condicional à versão lida
+    (WHERE id = ? AND version = ?), incrementando a versão.
+
+    Se outra requisição alterou a reserva desde a leitura, nenhuma linha é
+    atualizada e a alteração é recusada (412) em vez de sobrescrever a outra.
+    O objeto em sessão recebe os novos valores; o commit fica com o chamador.
+    """
+    result = session.execute(
+        update(Reservation)
+        .where(Reservation.id == reservation.id, Reservation.version == reservation.version)
+        .values(**values, version=Reservation.version + 1, updated_at=datetime.now(timezone.utc))
+    )
+    if result.rowcount == 0:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=STALE_RESERVATION_DETAIL
+        )
+
+
+def check_claim(reservation: Reservation, admin: User) -> None:
+    """Recusa (409) a análise de uma reserva pega por outro administrador com prazo vigente."""
+    claimed_until = reservation.claimed_until
+    if reservation.claimed_by in (None, admin.id) or claimed_until is None:
+        return
+    if claimed_until.tzinfo is None:
+        claimed_until = claimed_until.replace(tzinfo=timezone.utc)
+    if claimed_until > datetime.now(timezone.utc):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Reserva em análise por outro administrador"
+        )
+
+
 def check_multiple_reservations(user_id: int, session: Session) -> bool:
     """
     Verifica se o usuário já tem uma reserva pendente (RNF04).
@@ -101,7 +268,8 @@ def check_multiple_reservations(user_id: int, session: Session) -> bool:
     response_model=ReservationResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Solicitar reserva",
-    description="Permite que professor ou aluno solicite reserva de espaço ou computador (RF01, RF17)"
+    description="Permite que professor ou aluno solicite reserva de espaço ou computador (RF01, RF17)",
+    dependencies=[Depends(rate_limit("reservations"))]
 )
 async def create_reservation(
     reservation: ReservationCreate,
@@ -229,101 +397,304 @@ async def create_reservation(
     description="Lista reservas com filtros opcionais (RF03)"
 )
 async def list_reservations(
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[Session, Depends(get_read_session)],
     current_user: Annotated[User, Depends(get_current_user)],
     laboratory_id: int | None = Query(None, description="Filtrar por laboratório"),
     status: str | None = Query(None, description="Filtrar por status (pending, approved, rejected)"),
     start_date: datetime | None = Query(None, description="Data início do período"),
     end_date: datetime | None = Query(None, description="Data fim do período"),
-    my_reservations: bool = Query(False, description="Apenas minhas reservas")
+    my_reservations: bool = Query(False, description="Apenas minhas reservas"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION)
 ):
-    """Lista reservas com filtros opcionais."""
-    statement = select(Reservation)
-    
-    # Filtro por laboratório
-    if laboratory_id:
-        statement = statement.where(Reservation.laboratory_id == laboratory_id)
+    """
+    Lista reservas com filtros opcionais.
+    Reservas arquivadas só são consultadas quando o período pedido alcança o arquivo.
+    """
+    names = select_fields(fields, ReservationResponse)
     
     # Filtro por status
+    status_enum = None
     if status:
         try:
             status_enum = ReservationStatus(status)
-            statement = statement.where(Reservation.status == status_enum)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Status inválido. Use: pending, approved, rejected"
             )
     
-    # Filtro por período
-    if start_date:
-        statement = statement.where(Reservation.start_time >= start_date)
-    if end_date:
-        statement = statement.where(Reservation.end_time <= end_date)
+    models = [Reservation]
+    if needs_archive(start_date):
+        models.append(ReservationArchive)
     
-    # Filtro: apenas minhas reservas
-    if my_reservations:
-        statement = statement.where(Reservation.user_id == current_user.id)
+    # Com o arquivo, a ordenação é feita sobre a união e exige a coluna start_time
+    selected = names
+    if len(models) > 1 and "start_time" not in names:
+        selected = names + ["start_time"]
     
-    # Ordena por data de início
-    statement = statement.order_by(Reservation.start_time)
+    statements = []
+    for model in models:
+        # Colunas do schema de resposta, com a ocultação de confidenciais no próprio SELECT
+        statement = select(*reservation_columns(model, current_user, selected))
+        
+        # Filtro por laboratório
+        if laboratory_id:
+            statement = statement.where(model.laboratory_id == laboratory_id)
+        
+        if status_enum:
+            statement = statement.where(model.status == status_enum)
+        
+        # Filtro por período
+        if start_date:
+            statement = statement.where(model.start_time >= start_date)
+        if end_date:
+            statement = statement.where(model.end_time <= end_date)
+        
+        # Filtro: apenas minhas reservas
+        if my_reservations:
+            statement = statement.where(model.user_id == current_user.id)
+        
+        statements.append(statement)
+    
+    # Ordena por data de início (mescla reservas ativas e arquivadas)
+    if len(statements) == 1:
+        statement = statements[0].order_by(Reservation.start_time)
+    else:
+        merged = union_all(*statements).subquery()
+        statement = select(*[merged.c[name] for name in names]).order_by(merged.c.start_time)
+    
+    # Linhas leves (sem identity map nem rastreamento de alterações), serializadas direto
+    reservations = session.execute(statement).all()
+    
+    if fields is not None:
+        return sparse_response(reservations)
+    
+    return reservations
+
+
+@router.get(
+    "/export",
+    summary="Exportar reservas",
+    description="Exporta o histórico de reservas em CSV ou Parquet, em streaming (apenas administradores)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/vnd.apache.parquet": {}}}}
+)
+async def export_reservations(
+    session: Annotated[Session, Depends(get_read_session)],
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    file_format: str = Query("csv", alias="format", description="csv ou parquet"),
+    from_date: date | None = Query(None, alias="from", description="Reservas que começam a partir deste dia"),
+    to_date: date | None = Query(None, alias="to", description="Reservas que começam até este dia (inclusive)")
+):
+    """
+    Exporta reservas ativas e arquivadas lendo-as de um cursor no servidor,
+    em blocos de tamanho fixo, sem carregar a tabela inteira em memória.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato inválido. Use: csv, parquet"
+        )
+    
+    if file_format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Exportação em Parquet indisponível: instale o pacote pyarrow"
+        )
+    
+    range_start = datetime.combine(from_date, time.min, tzinfo=timezone.utc) if from_date else None
+    range_end = datetime.combine(to_date + timedelta(days=1), time.min, tzinfo=timezone.utc) if to_date else None
+    
+    # Sem data inicial a exportação cobre todo o histórico, inclusive o arquivo
+    models = [Reservation]
+    if needs_archive(range_start):
+        models.append(ReservationArchive)
+    
+    statements = []
+    for model in models:
+        statement = select(*[getattr(model, name) for name in EXPORT_COLUMNS])
+        if range_start:
+            statement = statement.where(model.start_time >= range_start)
+        if range_end:
+            statement = statement.where(model.start_time < range_end)
+        statements.append(statement)
+    
+    merged = union_all(*statements).subquery()
+    statement = (
+        select(*merged.c)
+        .order_by(merged.c.start_time, merged.c.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    
+    # Blocos de EXPORT_CHUNK_SIZE linhas lidos sob demanda do cursor no servidor
+    chunks = session.execute(statement).partitions()
+    stream = csv_stream if file_format == "csv" else parquet_stream
+    
+    return StreamingResponse(
+        stream(chunks, EXPORT_COLUMNS),
+        media_type=EXPORT_FORMATS[file_format],
+        headers={"Content-Disposition": f'attachment; filename="reservas.{file_format}"'}
+    )
+
+
+@router.post(
+    "/pending/claim",
+    response_model=ReservationClaimResponse,
+    summary="Pegar reservas pendentes para análise",
+    description="Entrega ao administrador as próximas reservas pendentes que nenhum outro está analisando"
+)
+async def claim_pending_reservations(
+    session: Annotated[Session, Depends(get_session)],
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    limit: int = Query(CLAIM_SIZE, ge=1, le=CLAIM_MAX_SIZE, description="Quantidade de reservas")
+):
+    """
+    Pega as reservas pendentes mais antigas sem análise em andamento (ou já
+    pegas pelo próprio administrador, cujo prazo é renovado).
+
+    O SELECT ... FOR UPDATE SKIP LOCKED pula as linhas que outro administrador
+    está pegando no mesmo instante, então pedidos simultâneos recebem reservas
+    diferentes sem esperar uns pelos outros. O prazo (lease) devolve à fila as
+    reservas de quem não concluiu a análise.
+    """
+    now = datetime.now(timezone.utc)
+    claimed_until = now + timedelta(minutes=CLAIM_LEASE_MINUTES)
+    
+    statement = (
+        select(Reservation.id)
+        .where(
+            Reservation.status == ReservationStatus.pending,
+            or_(
+                Reservation.claimed_until.is_(None),
+                Reservation.claimed_until <= now,
+                Reservation.claimed_by == current_admin.id
+            )
+        )
+        .order_by(Reservation.created_at, Reservation.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    reservation_ids = session.exec(statement).all()
+    
+    reservations = []
+    if reservation_ids:
+        reservations = session.scalars(
+            update(Reservation)
+            .where(Reservation.id.in_(reservation_ids))
+            .values(claimed_by=current_admin.id, claimed_until=claimed_until)
+            .returning(Reservation)
+        ).all()
+    
+    # RETURNING não preserva a ordem da fila
+    reservations = sorted(reservations, key=lambda reservation: (reservation.created_at, reservation.id))
+    response = ReservationClaimResponse(
+        claimed_until=claimed_until,
+        reservations=[ReservationResponse.model_validate(reservation) for reservation in reservations]
+    )
+    session.commit()
     
-    reservations = session.exec(statement).all()
+    return response
+
+
+@router.get(
+    "/pending/conflicts",
+    response_model=ConflictGraphResponse,
+    summary="Grafo de conflitos da fila",
+    description="Agrupa as reservas pendentes que disputam o mesmo horário e sugere quais aprovar (apenas administradores)"
+)
+async def pending_conflicts(
+    session: Annotated[Session, Depends(get_read_session)],
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    laboratory_id: int | None = Query(None, description="Filtrar por laboratório"),
+    day: date | None = Query(None, description="Apenas reservas que ocupam este dia (UTC); padrão: as que ainda não terminaram")
+):
+    """
+    Monta o grafo de conflitos entre as reservas pendentes e aprovadas.
+    Uma única consulta busca as reservas; os conflitos são calculados por
+    varredura em `utils.conflicts`, sem uma consulta por par.
+    """
+    statement = select(
+        Reservation.id,
+        Reservation.user_id,
+        Reservation.laboratory_id,
+        Reservation.computer_id,
+        Reservation.reservation_type,
+        Reservation.status,
+        Reservation.start_time,
+        Reservation.end_time,
+        Reservation.title
+    ).where(
+        Reservation.status.in_([ReservationStatus.pending, ReservationStatus.approved])
+    )
     
-    # Filtra informações confidenciais para não-proprietários
-    result = []
-    for reservation in reservations:
-        # Se a reserva é confidencial e o usuário não é o dono nem admin
-        if reservation.is_confidential:
-            if reservation.user_id != current_user.id and current_user.role != Role.admin:
-                # Oculta informações sensíveis
-                reservation.title = "[Reserva Confidencial]"
-                reservation.description = None
-        result.append(reservation)
+    if laboratory_id:
+        statement = statement.where(Reservation.laboratory_id == laboratory_id)
     
-    return result
+    if day:
+        day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        statement = statement.where(
+            Reservation.start_time < day_start + timedelta(days=1),
+            Reservation.end_time > day_start
+        )
+    else:
+        statement = statement.where(Reservation.end_time > datetime.now(timezone.utc))
+    
+    reservations = session.execute(statement).all()
+    components, conflict_free_ids = conflict_graph(reservations)
+    
+    members = {member for component in components for member in component["reservation_ids"]}
+    return ConflictGraphResponse(
+        reservations=[
+            ConflictGraphNode.model_validate(reservation)
+            for reservation in reservations if reservation.id in members
+        ],
+        components=components,
+        conflict_free_ids=conflict_free_ids
+    )
 
 
 @router.get(
     "/{reservation_id}",
     response_model=ReservationResponse,
     summary="Obter reserva",
-    description="Obtém detalhes de uma reserva específica"
+    description="Obtém detalhes de uma reserva específica (a ETag é a versão da reserva)"
 )
 async def get_reservation(
     reservation_id: int,
+    response: Response,
     session: Annotated[Session, Depends(get_session)],
     current_user: Annotated[User, Depends(get_current_user)]
 ):
-    """Obtém uma reserva pelo ID."""
-    reservation = session.get(Reservation, reservation_id)
-    
-    if not reservation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Reserva não encontrada"
+    """Obtém uma reserva pelo ID, consultando o arquivo se ela não estiver ativa."""
+    for model in (Reservation, ReservationArchive):
+        statement = select(*reservation_columns(model, current_user)).where(
+            model.id == reservation_id
         )
-    
-    # Verifica permissão para ver detalhes confidenciais
-    if reservation.is_confidential:
-        if reservation.user_id != current_user.id and current_user.role != Role.admin:
-            reservation.title = "[Reserva Confidencial]"
-            reservation.description = None
-    
-    return reservation
+        reservation = session.execute(statement).first()
+        if reservation:
+            response.headers["ETag"] = reservation_etag(reservation.version)
+            return reservation
+    
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Reserva não encontrada"
+    )
 
 
 @router.patch(
     "/{reservation_id}",
     response_model=ReservationResponse,
     summary="Editar reserva",
-    description="Permite que criador ou admin edite uma reserva (RF02, RF12)"
+    description="Permite que criador ou admin edite uma reserva (RF02, RF12). Suporta If-Match",
+    dependencies=[Depends(rate_limit("reservations"))]
 )
 async def update_reservation(
     reservation_id: int,
     reservation_update: ReservationUpdate,
+    response: Response,
     session: Annotated[Session, Depends(get_session)],
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[User, Depends(get_current_user)],
+    if_match: Annotated[str | None, Header()] = None
 ):
     """Atualiza dados de uma reserva."""
     db_reservation = session.get(Reservation, reservation_id)
@@ -341,6 +712,8 @@ async def update_reservation(
             detail="Você não tem permissão para editar esta reserva"
         )
     
+    check_if_match(if_match, db_reservation)
+    
     # RNF03: Não pode editar 30 minutos antes do horário
     now = datetime.now(timezone.utc)
     start_time = db_reservation.start_time
@@ -396,15 +769,17 @@ async def update_reservation(
                 detail=f"Conflito de horário com reserva existente (ID: {conflict.id})"
             )
     
-    for key, value in update_data.items():
-        setattr(db_reservation, key, value)
+    old_start = db_reservation.start_time
+    old_end = db_reservation.end_time
     
-    db_reservation.updated_at = datetime.now(timezone.utc)
+    save_reservation(session, db_reservation, **update_data)
+    
+    update_reservation_stats(session, db_reservation, old_start=old_start, old_end=old_end)
     
-    session.add(db_reservation)
     session.commit()
     session.refresh(db_reservation)
     
+    response.headers["ETag"] = reservation_etag(db_reservation.version)
     return db_reservation
 
 
@@ -412,12 +787,14 @@ async def update_reservation(
     "/{reservation_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Cancelar reserva",
-    description="Permite que criador remova sua solicitação (RF04)"
+    description="Permite que criador remova sua solicitação (RF04). Suporta If-Match",
+    dependencies=[Depends(rate_limit("reservations"))]
 )
 async def delete_reservation(
     reservation_id: int,
     session: Annotated[Session, Depends(get_session)],
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[User, Depends(get_current_user)],
+    if_match: Annotated[str | None, Header()] = None
 ):
     """Cancela/remove uma reserva."""
     db_reservation = session.get(Reservation, reservation_id)
@@ -435,6 +812,8 @@ async def delete_reservation(
             detail="Apenas o criador da reserva pode cancelá-la"
         )
     
+    check_if_match(if_match, db_reservation)
+    
     # RNF03: Não pode cancelar 30 minutos antes do horário
     now = datetime.now(timezone.utc)
     start_time = db_reservation.start_time
@@ -448,10 +827,11 @@ async def delete_reservation(
             detail="Não é possível cancelar reserva com menos de 30 minutos antes do horário"
         )
     
-    db_reservation.status = ReservationStatus.cancelled
-    db_reservation.updated_at = datetime.now(timezone.utc)
+    old_status = db_reservation.status
+    save_reservation(session, db_reservation, status=ReservationStatus.cancelled)
+    
+    update_reservation_stats(session, db_reservation, old_status=old_status)
     
-    session.add(db_reservation)
     session.commit()
     
     return None
@@ -461,12 +841,18 @@ async def delete_reservation(
     "/{reservation_id}/approve",
     response_model=ReservationResponse,
     summary="Aprovar reserva",
-    description="Permite que administrador aprove uma reserva (RF10)"
+    description=(
+        "Permite que administrador aprove uma reserva (RF10). Suporta If-Match. "
+        "Reservas pendentes que passam a conflitar são reprovadas automaticamente "
+        "e listadas no cabeçalho X-Rejected-Reservations"
+    )
 )
 async def approve_reservation(
     reservation_id: int,
+    response: Response,
     session: Annotated[Session, Depends(get_session)],
-    current_admin: Annotated[User, Depends(get_current_admin)]
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    if_match: Annotated[str | None, Header()] = None
 ):
     """Aprova uma reserva pendente."""
     db_reservation = session.get(Reservation, reservation_id)
@@ -477,12 +863,16 @@ async def approve_reservation(
             detail="Reserva não encontrada"
         )
     
+    check_if_match(if_match, db_reservation)
+    
     if db_reservation.status != ReservationStatus.pending:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Reserva já foi processada (status: {db_reservation.status})"
         )
     
+    check_claim(db_reservation, current_admin)
+    
     # Verifica novamente se não há conflitos (pode ter surgido desde a criação)
     conflict = check_time_conflicts(
         db_reservation.laboratory_id,
@@ -499,15 +889,28 @@ async def approve_reservation(
             detail=f"Conflito de horário com reserva {conflict.id}. Não é possível aprovar."
         )
     
-    db_reservation.status = ReservationStatus.approved
-    db_reservation.reviewed_by = current_admin.id
-    db_reservation.reviewed_at = datetime.now(timezone.utc)
-    db_reservation.updated_at = datetime.now(timezone.utc)
+    lock_for_approval(session, db_reservation)
+    save_reservation(
+        session,
+        db_reservation,
+        status=ReservationStatus.approved,
+        reviewed_by=current_admin.id,
+        reviewed_at=datetime.now(timezone.utc),
+        claimed_by=None,
+        claimed_until=None
+    )
+    
+    update_reservation_stats(session, db_reservation, old_status=ReservationStatus.pending)
+    
+    # Pendentes que agora conflitam são reprovadas na mesma transação
+    rejected_ids = reject_conflicting_pending(session, db_reservation, current_admin)
     
-    session.add(db_reservation)
     session.commit()
     session.refresh(db_reservation)
     
+    response.headers["ETag"] = reservation_etag(db_reservation.version)
+    if rejected_ids:
+        response.headers[REJECTED_RESERVATIONS_HEADER] = ",".join(str(rejected_id) for rejected_id in rejected_ids)
     return db_reservation
 
 
@@ -515,13 +918,15 @@ async def approve_reservation(
     "/{reservation_id}/reject",
     response_model=ReservationResponse,
     summary="Reprovar reserva",
-    description="Permite que administrador reprove uma reserva (RF11)"
+    description="Permite que administrador reprove uma reserva (RF11). Suporta If-Match"
 )
 async def reject_reservation(
     reservation_id: int,
     rejection: ReservationReject,
+    response: Response,
     session: Annotated[Session, Depends(get_session)],
-    current_admin: Annotated[User, Depends(get_current_admin)]
+    current_admin: Annotated[User, Depends(get_current_admin)],
+    if_match: Annotated[str | None, Header()] = None
 ):
     """Reprova uma reserva pendente."""
     db_reservation = session.get(Reservation, reservation_id)
@@ -532,20 +937,31 @@ async def reject_reservation(
             detail="Reserva não encontrada"
         )
     
+    check_if_match(if_match, db_reservation)
+    
     if db_reservation.status != ReservationStatus.pending:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Reserva já foi processada (status: {db_reservation.status})"
         )
     
-    db_reservation.status = ReservationStatus.rejected
-    db_reservation.reviewed_by = current_admin.id
-    db_reservation.reviewed_at = datetime.now(timezone.utc)
-    db_reservation.rejection_reason = rejection.rejection_reason
-    db_reservation.updated_at = datetime.now(timezone.utc)
+    check_claim(db_reservation, current_admin)
+    
+    save_reservation(
+        session,
+        db_reservation,
+        status=ReservationStatus.rejected,
+        reviewed_by=current_admin.id,
+        reviewed_at=datetime.now(timezone.utc),
+        claimed_by=None,
+        claimed_until=None,
+        rejection_reason=rejection.rejection_reason
+    )
+    
+    update_reservation_stats(session, db_reservation, old_status=ReservationStatus.pending)
     
-    session.add(db_reservation)
     session.commit()
     session.refresh(db_reservation)
     
+    response.headers["ETag"] = reservation_etag(db_reservation.version)
     return db_reservation
@@ -2,14 +2,38 @@
 Rotas de gerenciamento de usuários (protegidas por autenticação).
 """
 
+import base64
 from typing import List
 
 from database import get_session
 from dependencies import get_current_user, get_current_professor_or_admin
-from fastapi import APIRouter, Depends, HTTPException, status
-from models import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from models import Laboratory, Reservation, ReservationStatus, Role, User
 from schemas import UserResponse
+from sqlalchemy import func
 from sqlmodel import Session, select
+from utils.cache import ACCESS, USERS, publish_invalidation
+from utils.fieldsets import (
+    FIELDS_DESCRIPTION,
+    model_columns,
+    project_fields,
+    select_fields,
+    sparse_response,
+)
+from utils.ical import (
+    ICAL_FETCH_SIZE,
+    build_etag,
+    build_vevent,
+    calendar_stream,
+    etag_matches,
+)
+from utils.revocation import revoke_subject
+
+# Paginação da listagem de usuários
+USERS_PAGE_SIZE = 50
+USERS_MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 router = APIRouter(
     prefix="/users",
@@ -17,32 +41,196 @@ router = APIRouter(
 )
 
 
+def encode_cursor(email: str) -> str:
+    """Cursor opaco da paginação: o e-mail do último usuário da página."""
+    return base64.urlsafe_b64encode(email.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Recupera o e-mail do cursor recebido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido"
+        )
+
+
 @router.get(
     "/",
-    summary="Listar todos os usuários",
-    description="Retorna a lista com todos os usuários (apenas professores)",
+    summary="Listar usuários",
+    description=(
+        "Busca usuários com filtros e paginação por cursor (apenas professores). "
+        f"O cursor da próxima página vem no cabeçalho {NEXT_CURSOR_HEADER}"
+    ),
     response_model=List[UserResponse],
 )
 def read_users(
+    response: Response,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_professor_or_admin),  # Apenas professores
+    q: str | None = Query(None, min_length=1, description="Início do e-mail"),
+    role: str | None = Query(None, description="Filtrar por perfil (aluno, professor, admin)"),
+    project_name: str | None = Query(None, description="Filtrar por projeto"),
+    is_active: bool | None = Query(None, description="Filtrar por situação"),
+    cursor: str | None = Query(None, description="Cursor recebido na página anterior"),
+    limit: int = Query(USERS_PAGE_SIZE, ge=1, le=USERS_MAX_PAGE_SIZE, description="Usuários por página"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
 ):
     """
-    Lista todos os usuários do sistema.
+    Lista os usuários do sistema, ordenados por e-mail.
     Apenas professores podem acessar esta rota.
 
+    A paginação é por chave (e-mail > cursor), então cada página custa o
+    mesmo que a primeira. A busca por prefixo e o filtro por projeto usam os
+    índices ix_user_email_pattern e ix_user_project_name_email.
+
     Args:
+        response: Resposta (para o cabeçalho do próximo cursor)
         session: Sessão do banco de dados
         current_user: Usuário autenticado (deve ser professor)
+        q: Prefixo do e-mail
+        role: Perfil
+        project_name: Projeto
+        is_active: Situação do usuário
+        cursor: Cursor da página anterior
+        limit: Tamanho da página
+        fields: Campos a retornar, separados por vírgula (padrão: todos)
 
     Returns:
-        Lista de usuários
+        Página de usuários
+
+    Raises:
+        HTTPException: Se o perfil ou o cursor forem inválidos
     """
-    statement = select(User)
-    results = session.exec(statement).all()
+    names = select_fields(fields, UserResponse)
+    # O e-mail é a chave da paginação, mesmo que não seja pedido
+    selected = names if "email" in names else names + ["email"]
+    statement = select(*model_columns(User, selected))
+
+    if q:
+        statement = statement.where(User.email.startswith(q, autoescape=True))
+    if role:
+        try:
+            statement = statement.where(User.role == Role(role))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Role inválido. Use: aluno, professor, admin",
+            )
+    if project_name:
+        statement = statement.where(User.project_name == project_name)
+    if is_active is not None:
+        statement = statement.where(User.is_active == is_active)
+    if cursor:
+        statement = statement.where(User.email > decode_cursor(cursor))
+
+    # Uma linha a mais indica se existe próxima página
+    results = session.execute(statement.order_by(User.email).limit(limit + 1)).all()
+    headers = {}
+    if len(results) > limit:
+        results = results[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(results[-1].email)
+
+    if fields is not None:
+        sparse = sparse_response(project_fields([row._mapping for row in results], names))
+        sparse.headers.update(headers)
+        return sparse
+
+    response.headers.update(headers)
     return results
 
 
+@router.get(
+    "/me/calendar.ics",
+    summary="Meu calendário",
+    description="Feed iCalendar com as reservas aprovadas do usuário autenticado (suporta If-None-Match)",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/calendar": {}}},
+        304: {"description": "Calendário não modificado"},
+    },
+)
+def my_calendar(
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Gera o feed iCalendar das reservas aprovadas do usuário autenticado.
+
+    Args:
+        request: Requisição (para o cabeçalho If-None-Match)
+        session: Sessão do banco de dados
+        current_user: Usuário autenticado
+
+    Returns:
+        Calendário em streaming ou 304 se não houve alteração
+    """
+    # A ETag muda quando qualquer reserva do usuário (ou seu laboratório) é alterada
+    latest_update, approved_count, latest_laboratory_update = session.exec(
+        select(
+            func.max(Reservation.updated_at),
+            func.count(Reservation.id).filter(
+                Reservation.status == ReservationStatus.approved
+            ),
+            func.max(Laboratory.updated_at),
+        )
+        .join(Laboratory, Laboratory.id == Reservation.laboratory_id)
+        .where(Reservation.user_id == current_user.id)
+    ).one()
+    etag = build_etag(
+        "user", current_user.id, latest_update, approved_count, latest_laboratory_update
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Cursor no servidor: as reservas são lidas em blocos enquanto o feed é enviado
+    statement = (
+        select(
+            Reservation.id,
+            Reservation.start_time,
+            Reservation.end_time,
+            Reservation.title,
+            Reservation.description,
+            Reservation.updated_at,
+            Laboratory.name,
+        )
+        .join(Laboratory, Laboratory.id == Reservation.laboratory_id)
+        .where(
+            Reservation.user_id == current_user.id,
+            Reservation.status == ReservationStatus.approved,
+        )
+        .order_by(Reservation.start_time)
+        .execution_options(yield_per=ICAL_FETCH_SIZE)
+    )
+    rows = session.exec(statement)
+
+    # As reservas são do próprio usuário, então nada é ocultado
+    events = (
+        build_vevent(
+            row.id,
+            row.start_time,
+            row.end_time,
+            row.title,
+            row.description,
+            row.name,
+            row.updated_at,
+        )
+        for row in rows
+    )
+
+    headers["Content-Disposition"] = 'inline; filename="minhas-reservas.ics"'
+    return StreamingResponse(
+        calendar_stream("Minhas reservas", events),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers,
+    )
+
+
 @router.get(
     "/{user_id}",
     summary="Buscar usuário por ID",
@@ -121,6 +309,7 @@ def activate_user(
 
     user.is_active = True
     session.add(user)
+    publish_invalidation(session, USERS, user.email)
     session.commit()
     session.refresh(user)
 
@@ -162,6 +351,9 @@ def deactivate_user(
 
     user.is_active = False
     session.add(user)
+    publish_invalidation(session, USERS, user.email)
+    # Tokens já emitidos deixam de valer mesmo se o usuário for reativado
+    revoke_subject(session, user.email)
     session.commit()
     session.refresh(user)
 
@@ -199,4 +391,6 @@ def delete_user(
         )
 
     session.delete(user)
+    publish_invalidation(session, USERS, user.email)
+    publish_invalidation(session, ACCESS, user.id)
     session.commit()
@@ -1,9 +1,9 @@
 """
 Schemas Pydantic para validação de dados de entrada/saída.
 """
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
 
 # ==================== USER SCHEMAS ====================
@@ -34,6 +34,20 @@ class Token(BaseModel):
     """Schema para resposta de token"""
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = Field(
+        default=None,
+        description="Token de renovação (use em /auth/refresh antes de o token de acesso expirar)"
+    )
+
+
+class RefreshRequest(BaseModel):
+    """Schema para renovação da sessão"""
+    refresh_token: str = Field(description="Token de renovação recebido no login")
+
+
+class LogoutRequest(BaseModel):
+    """Schema para logout (sem token de renovação, todas as sessões são encerradas)"""
+    refresh_token: str | None = Field(default=None, description="Token de renovação a revogar")
 
 
 class TokenData(BaseModel):
@@ -73,6 +87,27 @@ class RegistrationRequestApprove(BaseModel):
     role: str = Field(description="Perfil do usuário (aluno ou professor)")
 
 
+class RegistrationBatchItem(BaseModel):
+    """Solicitação a aprovar em lote"""
+    id: int = Field(description="ID da solicitação")
+    role: str = Field(description="Perfil do usuário (aluno ou professor)")
+
+
+class RegistrationBatchApprove(BaseModel):
+    """Schema para aprovar solicitações de cadastro em lote"""
+    items: list[RegistrationBatchItem] = Field(
+        min_length=1, max_length=500, description="Solicitações e perfis"
+    )
+
+
+class RegistrationBatchResult(BaseModel):
+    """Resultado da aprovação de uma solicitação do lote"""
+    id: int = Field(description="ID da solicitação")
+    approved: bool = Field(description="Indica se o usuário foi criado")
+    error: str | None = Field(default=None, description="Motivo da recusa do item")
+    user: UserResponse | None = Field(default=None, description="Usuário criado")
+
+
 # ==================== LABORATORY SCHEMAS ====================
 
 class LaboratoryCreate(BaseModel):
@@ -154,6 +189,50 @@ class UserLaboratoryAccessResponse(BaseModel):
         from_attributes = True
 
 
+class UserLaboratoryAccessBulk(BaseModel):
+    """Schema para conceder ou revogar acessos em lote (lista de usuários ou projeto inteiro)"""
+    laboratory_id: int = Field(description="ID do laboratório")
+    user_ids: Optional[list[int]] = Field(
+        None, min_length=1, max_length=5000, description="IDs dos usuários"
+    )
+    project_name: Optional[str] = Field(None, description="Todos os usuários do projeto")
+    
+    @model_validator(mode='after')
+    def validate_target(self):
+        if (self.user_ids is None) == (self.project_name is None):
+            raise ValueError("Informe user_ids ou project_name (apenas um)")
+        return self
+
+
+class UserLaboratoryAccessBulkResult(BaseModel):
+    """Schema para resposta de concessão/revogação em lote"""
+    laboratory_id: int
+    affected: int = Field(description="Quantidade de acessos concedidos ou revogados")
+    user_ids: list[int] = Field(description="Usuários afetados")
+
+
+class UserSummary(BaseModel):
+    """Resumo do usuário embutido em outras respostas (expand=user)"""
+    id: int
+    email: str
+    role: str
+    project_name: str
+    is_active: bool
+
+
+class LaboratorySummary(BaseModel):
+    """Resumo do laboratório embutido em outras respostas (expand=laboratory)"""
+    id: int
+    name: str
+    is_active: bool
+
+
+class UserLaboratoryAccessExpanded(UserLaboratoryAccessResponse):
+    """Acesso com o usuário e/ou o laboratório embutidos, conforme `expand`"""
+    user: Optional[UserSummary] = None
+    laboratory: Optional[LaboratorySummary] = None
+
+
 class AccessRequestCreate(BaseModel):
     """Schema para criar uma solicitação de acesso"""
     laboratory_id: int = Field(description="ID do laboratório solicitado")
@@ -182,6 +261,21 @@ class AccessRequestProcess(BaseModel):
 
 
 
+# ==================== IMPORT SCHEMAS ====================
+
+class ImportRowError(BaseModel):
+    """Erro em uma linha do arquivo importado"""
+    row: int = Field(description="Número da linha no arquivo")
+    error: str = Field(description="Motivo da rejeição da linha")
+
+
+class ImportReport(BaseModel):
+    """Schema para resposta de importação em lote"""
+    total_rows: int = 0
+    created: int = 0
+    errors: list[ImportRowError] = []
+
+
 # ==================== RESERVATION SCHEMAS ====================
 
 class ReservationCreate(BaseModel):
@@ -255,11 +349,50 @@ class ReservationResponse(BaseModel):
     rejection_reason: Optional[str]
     created_at: datetime
     updated_at: datetime
+    version: int = Field(description="Versão atual (a mesma da ETag); envie em If-Match ao alterar")
+    
+    class Config:
+        from_attributes = True
+
+
+class ReservationClaimResponse(BaseModel):
+    """Schema para as reservas pendentes entregues a um administrador para análise"""
+    claimed_until: datetime = Field(description="Prazo da análise; depois dele as reservas voltam à fila")
+    reservations: list[ReservationResponse]
+
+
+class ConflictGraphNode(BaseModel):
+    """Reserva pendente ou aprovada que participa de um conflito"""
+    id: int
+    user_id: int
+    laboratory_id: int
+    computer_id: Optional[int]
+    reservation_type: str
+    status: str
+    start_time: datetime
+    end_time: datetime
+    title: str
     
     class Config:
         from_attributes = True
 
 
+class ConflictComponent(BaseModel):
+    """Grupo de reservas ligadas por conflitos de horário"""
+    laboratory_id: int
+    reservation_ids: list[int]
+    conflicts: list[tuple[int, int]] = Field(description="Pares de reservas conflitantes")
+    suggested_ids: list[int] = Field(description="Pendentes que podem ser aprovadas juntas")
+    blocked_ids: list[int] = Field(description="Pendentes que conflitam com uma reserva já aprovada")
+
+
+class ConflictGraphResponse(BaseModel):
+    """Schema para o grafo de conflitos da fila de reservas pendentes"""
+    reservations: list[ConflictGraphNode]
+    components: list[ConflictComponent]
+    conflict_free_ids: list[int] = Field(description="Pendentes sem nenhum conflito")
+
+
 # ==================== AVAILABILITY SCHEMAS ====================
 
 class AvailabilityQuery(BaseModel):
@@ -283,3 +416,50 @@ class AvailabilityResponse(BaseModel):
     laboratory_name: str
     date: datetime
     time_slots: list[TimeSlot]
+
+
+# ==================== REPORT SCHEMAS ====================
+
+class DailyUtilization(BaseModel):
+    """Horas reservadas em um dia para um laboratório/computador"""
+    day: date
+    laboratory_id: int
+    computer_id: Optional[int]
+    booked_hours: float
+
+
+class HourlyUtilization(BaseModel):
+    """Horas reservadas acumuladas em uma hora do dia (UTC)"""
+    hour: int
+    booked_hours: float
+
+
+class UtilizationReport(BaseModel):
+    """Schema para resposta do relatório de utilização"""
+    from_date: date
+    to_date: date
+    laboratory_id: Optional[int]
+    total_booked_hours: float
+    approved_count: int
+    rejected_count: int
+    cancelled_count: int
+    approval_rate: Optional[float] = Field(
+        None, description="Aprovadas / (aprovadas + rejeitadas)"
+    )
+    daily: list[DailyUtilization]
+    peak_hours: list[HourlyUtilization]
+
+
+class LaboratoryHeatmap(BaseModel):
+    """Ocupação semanal de um laboratório"""
+    laboratory_id: int
+    occupancy: list[list[float]] = Field(
+        description="Matriz 7 × 24 (segunda a domingo × hora UTC) com a fração de tempo ocupado"
+    )
+
+
+class HeatmapResponse(BaseModel):
+    """Schema para resposta do mapa de calor semanal"""
+    from_date: date
+    to_date: date
+    laboratories: list[LaboratoryHeatmap]
@@ -3,9 +3,26 @@
 # Garante que a aplicação escute em 0.0.0.0 e na porta correta
 
 PORT=${PORT:-8000}
+export PORT
+
+# Desenvolvimento local: START_MODE=dev inicia um único processo com auto-reload
+if [ "$START_MODE" = "dev" ]; then
+    echo "Iniciando aplicação (desenvolvimento) na porta $PORT..."
+    exec python3 -m uvicorn main:app --host 0.0.0.0 --port $PORT --reload
+fi
+
+# Aplica as migrações pendentes uma única vez, antes de subir os workers
+# (um banco criado pelo create_all é marcado com a 0001 pelo migrations/env.py)
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    python3 -m alembic upgrade head || exit 1
+fi
+
 echo "Iniciando aplicação na porta $PORT..."
 
-# Inicia com uvicorn
-# --host 0.0.0.0 é fundamental para o Render detectar o processo
-# --port $PORT usa a porta dinâmica fornecida pelo Render
-python3 -m uvicorn main:app --host 0.0.0.0 --port $PORT
+# Produção: Gunicorn com vários workers Uvicorn (veja gunicorn.conf.py)
+# WEB_CONCURRENCY define o número de workers (padrão: núcleos disponíveis ao container)
+# FORWARDED_ALLOW_IPS é obrigatório: IP(s) do proxy reverso ("*" no Render)
+# Deploy sem downtime (o preload mantém o código antigo em um kill -HUP):
+#   kill -USR2 <pid do mestre>; depois kill -WINCH e kill -QUIT no mestre antigo
+# exec substitui o shell para que o Gunicorn receba os sinais do Render
+exec python3 -m gunicorn main:app -c gunicorn.conf.py
@@ -0,0 +1,32 @@
+"""
+Configuração compartilhada dos testes.
+"""
+import os
+import sys
+
+import pytest
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import rate_limit
+from utils.revocation import revocation_filter
+from utils.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cada teste recria o banco; o cache e o filtro de revogações do processo não podem sobreviver entre eles."""
+    cache.clear()
+    revocation_filter.reset()
+    yield
+    cache.clear()
+    revocation_filter.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_rate_limit():
+    """Os baldes do limitador também são do processo e não podem vazar entre testes."""
+    rate_limit.buckets.clear()
+    yield
+    rate_limit.buckets.clear()
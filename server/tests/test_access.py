@@ -0,0 +1,273 @@
+"""
+Testes para as rotas de acesso a laboratórios.
+"""
+import unittest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import User, Laboratory, UserLaboratoryAccess, Role
+from utils.jwt import create_access_token
+
+
+class TestAccessListings(unittest.TestCase):
+    """Testes para as listagens de acessos com `expand`."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.admin = User(
+            email="admin@test.com",
+            hashed_password="hashed_password",
+            role=Role.admin,
+            project_name="Admin",
+            is_active=True
+        )
+        self.aluno = User(
+            email="aluno@test.com",
+            hashed_password="hashed_password",
+            role=Role.aluno,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.labs = [Laboratory(name=f"Lab {i}", capacity=10) for i in range(3)]
+        self.session.add_all([self.admin, self.aluno, *self.labs])
+        self.session.commit()
+        self.session.add_all([
+            UserLaboratoryAccess(user_id=self.aluno.id, laboratory_id=lab.id, granted_by=self.admin.id)
+            for lab in self.labs[:2]
+        ])
+        self.session.commit()
+
+        self.headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': self.admin.email})}"
+        }
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.close()
+        app.dependency_overrides.clear()
+        SQLModel.metadata.drop_all(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+
+    def get(self, url, **params):
+        """Helper: GET autenticado como admin."""
+        return self.client.get(url, params=params, headers=self.headers)
+
+    def test_list_user_access_without_expand(self):
+        """Testa que sem `expand` a resposta mantém o formato original."""
+        response = self.get(f"/access/user/{self.aluno.id}")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data), 2)
+        self.assertEqual(set(data[0]), {"id", "user_id", "laboratory_id", "granted_at", "granted_by"})
+
+    def test_list_user_access_expanded(self):
+        """Testa os resumos embutidos de usuário e laboratório."""
+        response = self.get(f"/access/user/{self.aluno.id}", expand="user,laboratory")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([access["laboratory"]["name"] for access in data], ["Lab 0", "Lab 1"])
+        self.assertEqual(data[0]["user"]["email"], "aluno@test.com")
+        self.assertNotIn("hashed_password", data[0]["user"])
+
+    def test_list_laboratory_access_expanded(self):
+        """Testa a listagem por laboratório com o usuário embutido."""
+        response = self.get(f"/access/laboratory/{self.labs[0].id}", expand="user")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["user"]["role"], "aluno")
+        self.assertNotIn("laboratory", data[0])
+
+    def test_single_query(self):
+        """Testa que a listagem expandida faz uma única consulta além da autenticação."""
+        self.get(f"/access/laboratory/{self.labs[0].id}")  # aquece o cache do usuário
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", record)
+        try:
+            response = self.get(f"/access/laboratory/{self.labs[0].id}", expand="user,laboratory")
+        finally:
+            event.remove(self.engine, "before_cursor_execute", record)
+
+        self.assertEqual(response.status_code, 200)
+        selects = [statement for statement in statements if "userlaboratoryaccess" in statement]
+        self.assertEqual(len(selects), 1)
+
+    def test_owner_without_accesses_and_missing_owner(self):
+        """Testa a lista vazia para dono sem acessos e o 404 para dono inexistente."""
+        response = self.get(f"/access/laboratory/{self.labs[2].id}", expand="user")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+        self.assertEqual(self.get("/access/user/999").status_code, 404)
+        self.assertEqual(self.get("/access/laboratory/999").status_code, 404)
+
+    def test_invalid_expand(self):
+        """Testa a rejeição de expansões desconhecidas."""
+        response = self.get(f"/access/user/{self.aluno.id}", expand="user,senha")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("senha", response.json()["detail"])
+
+
+class TestBulkAccess(unittest.TestCase):
+    """Testes para a concessão e revogação de acessos em lote."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.admin = User(
+            email="admin@test.com",
+            hashed_password="hashed_password",
+            role=Role.admin,
+            project_name="Admin",
+            is_active=True
+        )
+        self.team = [
+            User(email=f"membro{i}@test.com", hashed_password="hashed_password",
+                 role=Role.aluno, project_name="Equipe", is_active=True)
+            for i in range(4)
+        ]
+        self.other = User(
+            email="outro@test.com",
+            hashed_password="hashed_password",
+            role=Role.aluno,
+            project_name="Outro",
+            is_active=True
+        )
+        self.lab = Laboratory(name="Lab", capacity=10)
+        self.session.add_all([self.admin, *self.team, self.other, self.lab])
+        self.session.commit()
+
+        # Um membro já tem acesso
+        self.session.add(UserLaboratoryAccess(
+            user_id=self.team[0].id, laboratory_id=self.lab.id, granted_by=self.admin.id
+        ))
+        self.session.commit()
+
+        self.headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': self.admin.email})}"
+        }
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.close()
+        app.dependency_overrides.clear()
+        SQLModel.metadata.drop_all(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+
+    def post(self, url, **body):
+        """Helper: POST autenticado como admin."""
+        return self.client.post(url, json={"laboratory_id": self.lab.id, **body}, headers=self.headers)
+
+    def access_user_ids(self):
+        """Helper: Usuários com acesso ao laboratório."""
+        return sorted(self.session.exec(
+            select(UserLaboratoryAccess.user_id).where(UserLaboratoryAccess.laboratory_id == self.lab.id)
+        ).all())
+
+    def test_grant_by_project(self):
+        """Testa a concessão para o projeto inteiro, sem duplicar acessos existentes."""
+        response = self.post("/access/bulk", project_name="Equipe")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["affected"], 3)
+        self.assertEqual(data["user_ids"], sorted(user.id for user in self.team[1:]))
+        self.assertEqual(self.access_user_ids(), sorted(user.id for user in self.team))
+
+        # Repetir não concede nada
+        self.assertEqual(self.post("/access/bulk", project_name="Equipe").json()["affected"], 0)
+
+    def test_grant_by_user_ids_ignores_unknown(self):
+        """Testa a concessão por lista, ignorando IDs inexistentes."""
+        response = self.post("/access/bulk", user_ids=[self.other.id, self.team[0].id, 999])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user_ids"], [self.other.id])
+
+    def test_revoke_by_project(self):
+        """Testa a revogação em lote restrita ao projeto e ao laboratório."""
+        self.post("/access/bulk", user_ids=[user.id for user in self.team] + [self.other.id])
+
+        response = self.post("/access/bulk/revoke", project_name="Equipe")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["affected"], 4)
+        self.assertEqual(self.access_user_ids(), [self.other.id])
+
+    def test_unique_constraint(self):
+        """Testa que o banco rejeita acesso duplicado."""
+        self.session.add(UserLaboratoryAccess(
+            user_id=self.team[0].id, laboratory_id=self.lab.id, granted_by=self.admin.id
+        ))
+        with self.assertRaises(IntegrityError):
+            self.session.commit()
+        self.session.rollback()
+
+    def test_validation(self):
+        """Testa o alvo obrigatório (apenas um) e o laboratório inexistente."""
+        self.assertEqual(self.post("/access/bulk").status_code, 422)
+        self.assertEqual(
+            self.post("/access/bulk", user_ids=[self.other.id], project_name="Equipe").status_code, 422
+        )
+
+        response = self.client.post(
+            "/access/bulk/revoke", json={"laboratory_id": 999, "project_name": "Equipe"}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
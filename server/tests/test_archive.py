@@ -0,0 +1,212 @@
+"""
+Testes para o arquivamento de reservas antigas.
+"""
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import (
+    User, Laboratory, Reservation, ReservationArchive, ScheduledJobRun,
+    Role, ReservationStatus, ReservationType
+)
+from utils.archive import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_INTERVAL_SECONDS, archive_expired_reservations, run_archive_cycle
+)
+from utils.jwt import create_access_token
+
+
+class TestArchive(unittest.TestCase):
+    """Testes para o arquivamento de reservas."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.user = User(
+            email="professor@test.com",
+            hashed_password="hashed_password",
+            role=Role.professor,
+            project_name="Test Project",
+            is_active=True
+        )
+        self.lab = Laboratory(name="Lab Arquivo", capacity=20)
+        self.session.add(self.user)
+        self.session.add(self.lab)
+        self.session.commit()
+        self.session.refresh(self.user)
+        self.session.refresh(self.lab)
+
+        token = create_access_token(data={"sub": self.user.email})
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.rollback()
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            self.session.execute(table.delete())
+        self.session.commit()
+        self.session.close()
+        app.dependency_overrides.clear()
+
+    def create_reservation(self, days_ago: int, title: str) -> Reservation:
+        """Helper: Cria uma reserva aprovada que começou há `days_ago` dias."""
+        start_time = datetime.now(timezone.utc) - timedelta(days=days_ago)
+        reservation = Reservation(
+            user_id=self.user.id,
+            laboratory_id=self.lab.id,
+            reservation_type=ReservationType.room,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=2),
+            title=title,
+            status=ReservationStatus.approved
+        )
+        self.session.add(reservation)
+        self.session.commit()
+        self.session.refresh(reservation)
+        return reservation
+
+    def test_archive_moves_only_expired_reservations(self):
+        """Testa que apenas reservas além do horizonte são arquivadas."""
+        old_id = self.create_reservation(ARCHIVE_AFTER_DAYS + 10, "Antiga").id
+        recent_id = self.create_reservation(1, "Recente").id
+
+        archived = archive_expired_reservations(self.session, batch_size=1)
+
+        self.assertEqual(archived, 1)
+        self.session.expunge_all()
+        self.assertIsNone(self.session.get(Reservation, old_id))
+        self.assertIsNotNone(self.session.get(Reservation, recent_id))
+
+        archived_row = self.session.get(ReservationArchive, old_id)
+        self.assertEqual(archived_row.title, "Antiga")
+        self.assertEqual(archived_row.status, ReservationStatus.approved)
+        self.assertIsNotNone(archived_row.archived_at)
+
+    def test_archive_in_multiple_batches(self):
+        """Testa que o arquivamento percorre vários lotes."""
+        for i in range(5):
+            self.create_reservation(ARCHIVE_AFTER_DAYS + 10 + i, f"Antiga {i}")
+
+        archived = archive_expired_reservations(self.session, batch_size=2)
+
+        self.assertEqual(archived, 5)
+        remaining = self.session.exec(select(Reservation)).all()
+        self.assertEqual(remaining, [])
+
+    def test_list_reservations_reads_archive_only_when_needed(self):
+        """Testa que a listagem só consulta o arquivo para períodos antigos."""
+        self.create_reservation(ARCHIVE_AFTER_DAYS + 10, "Antiga")
+        self.create_reservation(1, "Recente")
+        archive_expired_reservations(self.session)
+
+        recent_start = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+        response = self.client.get(
+            "/reservations/",
+            params={"start_date": recent_start},
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["title"] for r in response.json()], ["Recente"])
+
+        old_start = (datetime.now(timezone.utc) - timedelta(days=ARCHIVE_AFTER_DAYS + 30)).isoformat()
+        response = self.client.get(
+            "/reservations/",
+            params={"start_date": old_start},
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["title"] for r in response.json()], ["Antiga", "Recente"])
+
+        # Sem data inicial a listagem cobre todo o histórico
+        response = self.client.get("/reservations/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["title"] for r in response.json()], ["Antiga", "Recente"])
+
+        # Seleção parcial sem start_time continua ordenada por início
+        response = self.client.get(
+            "/reservations/",
+            params={"start_date": old_start, "fields": "title"},
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([set(r) for r in response.json()], [{"id", "title"}] * 2)
+        self.assertEqual([r["title"] for r in response.json()], ["Antiga", "Recente"])
+
+    def test_archive_cycle_skipped_without_lock(self):
+        """Testa que o ciclo não arquiva nada quando outro processo detém o lock."""
+        self.create_reservation(ARCHIVE_AFTER_DAYS + 10, "Antiga")
+
+        @contextmanager
+        def busy_lock(engine, name):
+            yield False
+
+        with patch("utils.locks.singleton_lock", busy_lock):
+            self.assertEqual(run_archive_cycle(self.engine), 0)
+        self.assertEqual(len(self.session.exec(select(Reservation)).all()), 1)
+
+        # Em bancos sem advisory lock (SQLite) o ciclo sempre roda
+        self.assertEqual(run_archive_cycle(self.engine), 1)
+
+    def test_archive_cycle_runs_once_per_interval(self):
+        """Testa que um worker reiniciado não repete um ciclo que ainda não venceu."""
+        # Cada reserva antiga é seguida de uma recente: o SQLite reutilizaria
+        # o maior id da tabela, que já estaria no arquivo
+        self.create_reservation(ARCHIVE_AFTER_DAYS + 10, "Antiga")
+        self.create_reservation(1, "Recente")
+        self.assertEqual(run_archive_cycle(self.engine), 1)
+
+        self.create_reservation(ARCHIVE_AFTER_DAYS + 10, "Outra antiga")
+        self.create_reservation(1, "Outra recente")
+        self.assertEqual(run_archive_cycle(self.engine), 0)
+        self.assertEqual(len(self.session.exec(select(Reservation)).all()), 3)
+
+        # Vencido o intervalo (ou em uma execução manual), o ciclo volta a rodar
+        run = self.session.get(ScheduledJobRun, "archive")
+        run.last_run_at -= timedelta(seconds=ARCHIVE_INTERVAL_SECONDS)
+        self.session.add(run)
+        self.session.commit()
+        self.assertEqual(run_archive_cycle(self.engine), 1)
+
+        self.create_reservation(ARCHIVE_AFTER_DAYS + 10, "Mais uma")
+        self.assertEqual(run_archive_cycle(self.engine, force=True), 1)
+
+    def test_get_archived_reservation(self):
+        """Testa a busca por ID de uma reserva arquivada."""
+        old_id = self.create_reservation(ARCHIVE_AFTER_DAYS + 10, "Antiga").id
+        archive_expired_reservations(self.session)
+
+        response = self.client.get(f"/reservations/{old_id}", headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Antiga")
+
+
+if __name__ == '__main__':
+    unittest.main()
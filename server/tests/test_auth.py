@@ -1,4 +1,6 @@
 import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine, select
 from sqlmodel.pool import StaticPool
@@ -11,7 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from main import app
 from database import get_session
 from models import User, RegistrationRequest, Role
-from utils.hash_password import hash_password
+from utils.hash_password import hash_password, verify_password
 from utils.jwt import create_access_token
 
 
@@ -86,6 +88,24 @@ class TestAuth(unittest.TestCase):
         self.assertFalse(data["is_processed"])
         self.assertIn("submitted_at", data)
     
+    def test_request_registration_stores_only_hash(self):
+        """Testa que a senha é hasheada em segundo plano e o texto não é gravado."""
+        response = self.client.post(
+            "/auth/request-registration",
+            json={
+                "email": "novo@example.com",
+                "password": "senha12345",
+                "project_name": "Projeto Teste"
+            }
+        )
+        self.assertEqual(response.status_code, 201)
+        
+        request = self.session.get(
+            RegistrationRequest, response.json()["id"], populate_existing=True
+        )
+        self.assertFalse(hasattr(request, "password"))
+        self.assertTrue(verify_password("senha12345", request.hashed_password))
+    
     def test_request_registration_duplicate_email(self):
         """Testa solicitação com e-mail já cadastrado."""
         # Criar usuário existente
@@ -117,7 +137,7 @@ class TestAuth(unittest.TestCase):
         # Criar solicitação pendente
         request = RegistrationRequest(
             email="pendente@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto",
             is_processed=False
         )
@@ -170,13 +190,13 @@ class TestAuth(unittest.TestCase):
         # Criar algumas solicitações
         request1 = RegistrationRequest(
             email="req1@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto 1",
             is_processed=False
         )
         request2 = RegistrationRequest(
             email="req2@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto 2",
             is_processed=False
         )
@@ -201,13 +221,13 @@ class TestAuth(unittest.TestCase):
         # Criar solicitações pendentes e processadas
         pending = RegistrationRequest(
             email="pendente@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto",
             is_processed=False
         )
         processed = RegistrationRequest(
             email="processada@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto",
             is_processed=True
         )
@@ -261,7 +281,7 @@ class TestAuth(unittest.TestCase):
         # Criar solicitação
         request = RegistrationRequest(
             email="aprovado@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto Aprovado",
             is_processed=False
         )
@@ -293,11 +313,93 @@ class TestAuth(unittest.TestCase):
         self.assertIsNotNone(user)
         self.assertEqual(user.role, Role.aluno)
     
+    def test_approve_registration_request_without_bcrypt(self):
+        """Testa que a aprovação apenas copia o hash já calculado."""
+        hashed = hash_password("senha12345")
+        request = RegistrationRequest(
+            email="aprovado@example.com",
+            hashed_password=hashed,
+            project_name="Projeto Aprovado",
+            is_processed=False
+        )
+        self.session.add(request)
+        self.session.commit()
+        self.session.refresh(request)
+        
+        with patch("routers.auth.hash_password") as mocked_hash:
+            response = self.client.post(
+                f"/auth/registration-requests/{request.id}/approve",
+                json={"role": "aluno"},
+                headers=self.admin_headers
+            )
+        
+        self.assertEqual(response.status_code, 201)
+        mocked_hash.assert_not_called()
+        user = self.session.exec(select(User).where(User.email == "aprovado@example.com")).one()
+        self.assertEqual(user.hashed_password, hashed)
+    
+    def test_approve_registration_request_hash_pending(self):
+        """Testa a aprovação antes de o hash da senha ficar pronto."""
+        request = RegistrationRequest(
+            email="pendente@example.com",
+            project_name="Projeto",
+            is_processed=False
+        )
+        self.session.add(request)
+        self.session.commit()
+        self.session.refresh(request)
+        
+        response = self.client.post(
+            f"/auth/registration-requests/{request.id}/approve",
+            json={"role": "aluno"},
+            headers=self.admin_headers
+        )
+        
+        self.assertEqual(response.status_code, 409)
+        self.session.refresh(request)
+        self.assertFalse(request.is_processed)
+    
+    def test_lost_hash_allows_resubmission(self):
+        """Testa que uma solicitação cujo hash se perdeu pode ser reenviada."""
+        request = RegistrationRequest(
+            email="perdida@example.com",
+            project_name="Projeto",
+            is_processed=False,
+            submitted_at=datetime.now(timezone.utc) - timedelta(hours=1)
+        )
+        self.session.add(request)
+        self.session.commit()
+        self.session.refresh(request)
+        
+        # O administrador é orientado a pedir o reenvio
+        response = self.client.post(
+            f"/auth/registration-requests/{request.id}/approve",
+            json={"role": "aluno"},
+            headers=self.admin_headers
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("novamente", response.json()["detail"])
+        
+        response = self.client.post(
+            "/auth/request-registration",
+            json={
+                "email": "perdida@example.com",
+                "password": "novasenha123",
+                "project_name": "Outro Projeto"
+            }
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["id"], request.id)
+        
+        request = self.session.get(RegistrationRequest, request.id, populate_existing=True)
+        self.assertEqual(request.project_name, "Outro Projeto")
+        self.assertTrue(verify_password("novasenha123", request.hashed_password))
+    
     def test_approve_registration_request_as_professor(self):
         """Testa aprovar solicitação criando usuário como professor."""
         request = RegistrationRequest(
             email="prof@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto Prof",
             is_processed=False
         )
@@ -319,7 +421,7 @@ class TestAuth(unittest.TestCase):
         """Testa aprovar com role inválido."""
         request = RegistrationRequest(
             email="teste@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto",
             is_processed=False
         )
@@ -350,7 +452,7 @@ class TestAuth(unittest.TestCase):
         """Testa aprovar solicitação já processada."""
         request = RegistrationRequest(
             email="processada@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto",
             is_processed=True
         )
@@ -377,11 +479,87 @@ class TestAuth(unittest.TestCase):
     
     # ========== Testes para RF07 - Rejeitar solicitação (Admin) ==========
     
+    def test_approve_registration_requests_batch(self):
+        """Testa a aprovação em lote com resultado por item."""
+        hashed = hash_password("senha12345")
+        existing_user = User(
+            email="existente@example.com",
+            hashed_password=hashed,
+            role=Role.aluno,
+            project_name="Projeto",
+            is_active=True
+        )
+        requests = [
+            RegistrationRequest(email=f"aluno{i}@example.com", hashed_password=hashed, project_name="Projeto")
+            for i in range(3)
+        ]
+        duplicate = RegistrationRequest(email="existente@example.com", hashed_password=hashed, project_name="Projeto")
+        processed = RegistrationRequest(
+            email="antigo@example.com", hashed_password=hashed, project_name="Projeto", is_processed=True
+        )
+        self.session.add_all([existing_user, *requests, duplicate, processed])
+        self.session.commit()
+        ids = [request.id for request in requests]
+        
+        items = [
+            {"id": ids[0], "role": "aluno"},
+            {"id": ids[1], "role": "professor"},
+            {"id": duplicate.id, "role": "aluno"},
+            {"id": processed.id, "role": "aluno"},
+            {"id": 999, "role": "aluno"},
+            {"id": ids[2], "role": "diretor"},
+            {"id": ids[0], "role": "aluno"},
+        ]
+        with patch("routers.auth.hash_password") as mocked_hash:
+            response = self.client.post(
+                "/auth/registration-requests/approve-batch",
+                json={"items": items},
+                headers=self.admin_headers
+            )
+        mocked_hash.assert_not_called()
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual([result["id"] for result in results], [item["id"] for item in items])
+        self.assertEqual([result["approved"] for result in results], [True, True] + [False] * 5)
+        self.assertEqual(results[0]["user"]["email"], "aluno0@example.com")
+        self.assertEqual(results[1]["user"]["role"], "professor")
+        self.assertEqual(results[2]["error"], "E-mail já cadastrado no sistema")
+        self.assertEqual(results[3]["error"], "Esta solicitação já foi processada")
+        self.assertEqual(results[4]["error"], "Solicitação não encontrada")
+        self.assertIn("Role inválido", results[5]["error"])
+        self.assertEqual(results[6]["error"], "Solicitação repetida no lote")
+        
+        # Aprovadas e a duplicada são encerradas; a de role inválido continua pendente
+        processed_flags = {
+            request.id: request.is_processed
+            for request in self.session.exec(
+                select(RegistrationRequest).execution_options(populate_existing=True)
+            ).all()
+        }
+        self.assertTrue(processed_flags[ids[0]])
+        self.assertTrue(processed_flags[ids[1]])
+        self.assertTrue(processed_flags[duplicate.id])
+        self.assertFalse(processed_flags[ids[2]])
+        
+        login = self.client.post(
+            "/auth/login", json={"email": "aluno1@example.com", "password": "senha12345"}
+        )
+        self.assertEqual(login.status_code, 200)
+    
+    def test_approve_registration_requests_batch_requires_admin(self):
+        """Testa que apenas administradores aprovam em lote."""
+        response = self.client.post(
+            "/auth/registration-requests/approve-batch",
+            json={"items": [{"id": 1, "role": "aluno"}]}
+        )
+        self.assertEqual(response.status_code, 401)
+    
     def test_reject_registration_request(self):
         """Testa rejeitar uma solicitação de cadastro (RF07)."""
         request = RegistrationRequest(
             email="rejeitado@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto Rejeitado",
             is_processed=False
         )
@@ -419,7 +597,7 @@ class TestAuth(unittest.TestCase):
         """Testa rejeitar solicitação já processada."""
         request = RegistrationRequest(
             email="processada@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto",
             is_processed=True
         )
@@ -447,7 +625,7 @@ class TestAuth(unittest.TestCase):
         # Criar usuário via aprovação de solicitação
         request = RegistrationRequest(
             email="login@example.com",
-            password="senha12345",
+            hashed_password=hash_password("senha12345"),
             project_name="Projeto",
             is_processed=False
         )
@@ -0,0 +1,223 @@
+"""
+Testes para o cache por worker e o barramento de invalidação.
+"""
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import User, Laboratory, Computer, Role
+from utils.cache import (
+    ACCESS, LABORATORIES, USERS, LocalCache, cache, encode_message, publish_invalidation
+)
+from utils.jwt import create_access_token
+
+
+class TestLocalCache(unittest.TestCase):
+    """Testes para o cache em memória."""
+
+    def test_apply_messages(self):
+        """Testa a invalidação por chave e por namespace."""
+        local = LocalCache(ttl=60)
+        local.set(USERS, "a@test.com", 1)
+        local.set(USERS, "b@test.com", 2)
+        local.set(LABORATORIES, "list:False", [])
+
+        local.apply(encode_message(USERS, "a@test.com"))
+        self.assertIsNone(local.get(USERS, "a@test.com"))
+        self.assertEqual(local.get(USERS, "b@test.com"), 2)
+
+        local.apply(encode_message(LABORATORIES))
+        self.assertIsNone(local.get(LABORATORIES, "list:False"))
+        self.assertEqual(local.get(USERS, "b@test.com"), 2)
+
+    def test_fill_skipped_after_concurrent_invalidation(self):
+        """Testa que uma leitura anterior à invalidação não alimenta o cache."""
+        local = LocalCache(ttl=60)
+
+        generation = local.generation(LABORATORIES)
+        # Escrita confirmada (e invalidação aplicada) durante a consulta
+        local.apply(encode_message(LABORATORIES))
+        local.set(LABORATORIES, "list:False", ["antigo"], generation)
+        self.assertIsNone(local.get(LABORATORIES, "list:False"))
+
+        generation = local.generation(LABORATORIES)
+        local.apply(encode_message(USERS, "a@test.com"))
+        local.set(LABORATORIES, "list:False", ["novo"], generation)
+        self.assertEqual(local.get(LABORATORIES, "list:False"), ["novo"])
+
+        generation = local.generation(LABORATORIES)
+        local.clear()
+        local.set(LABORATORIES, "list:False", ["antigo"], generation)
+        self.assertIsNone(local.get(LABORATORIES, "list:False"))
+
+    def test_zero_ttl_disables_cache(self):
+        """Testa que TTL zero desativa o cache."""
+        local = LocalCache(ttl=0)
+        local.set(USERS, "a@test.com", 1)
+
+        self.assertIsNone(local.get(USERS, "a@test.com"))
+
+
+class TestInvalidation(unittest.TestCase):
+    """Testes para a invalidação publicada pelas rotas."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.admin = User(
+            email="admin@test.com",
+            hashed_password="hashed_password",
+            role=Role.admin,
+            project_name="Admin",
+            is_active=True
+        )
+        self.student = User(
+            email="aluno@test.com",
+            hashed_password="hashed_password",
+            role=Role.aluno,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.session.add_all([self.admin, self.student])
+        self.session.commit()
+        self.session.refresh(self.admin)
+        self.session.refresh(self.student)
+
+        self.admin_headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': self.admin.email})}"
+        }
+        self.student_headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': self.student.email})}"
+        }
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.rollback()
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            self.session.execute(table.delete())
+        self.session.commit()
+        self.session.close()
+        app.dependency_overrides.clear()
+
+    def test_invalidation_applied_on_commit(self):
+        """Testa que a invalidação só é aplicada quando a transação é confirmada."""
+        cache.set(USERS, "x@test.com", 1)
+
+        publish_invalidation(self.session, USERS, "x@test.com")
+        self.session.rollback()
+        self.assertEqual(cache.get(USERS, "x@test.com"), 1)
+
+        publish_invalidation(self.session, USERS, "x@test.com")
+        self.assertEqual(cache.get(USERS, "x@test.com"), 1)
+        self.session.commit()
+        self.assertIsNone(cache.get(USERS, "x@test.com"))
+
+    def test_laboratory_list_invalidated_by_create(self):
+        """Testa que a listagem em cache é invalidada ao cadastrar um laboratório."""
+        self.session.add(Laboratory(name="Lab A", capacity=10))
+        self.session.commit()
+
+        response = self.client.get("/laboratories/", headers=self.student_headers)
+        self.assertEqual([lab["name"] for lab in response.json()], ["Lab A"])
+
+        # Escrita fora das rotas não publica invalidação: a listagem vem do cache
+        self.session.add(Laboratory(name="Lab B", capacity=10))
+        self.session.commit()
+        response = self.client.get("/laboratories/", headers=self.student_headers)
+        self.assertEqual(len(response.json()), 1)
+
+        response = self.client.post(
+            "/laboratories/",
+            json={"name": "Lab C", "capacity": 10},
+            headers=self.admin_headers
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(
+            "/laboratories/", params={"fields": "name"}, headers=self.student_headers
+        )
+        self.assertEqual(
+            sorted(lab["name"] for lab in response.json()), ["Lab A", "Lab B", "Lab C"]
+        )
+        self.assertEqual(set(response.json()[0]), {"id", "name"})
+
+    def test_access_invalidated_by_grant(self):
+        """Testa que o conjunto de acessos em cache é invalidado ao conceder acesso."""
+        lab = Laboratory(name="Lab Acesso", capacity=10)
+        self.session.add(lab)
+        self.session.commit()
+        self.session.refresh(lab)
+        computer = Computer(name="PC-01", laboratory_id=lab.id)
+        self.session.add(computer)
+        self.session.commit()
+        self.session.refresh(computer)
+
+        reservation = {
+            "laboratory_id": lab.id,
+            "computer_id": computer.id,
+            "reservation_type": "computer",
+            "start_time": "2030-01-10T10:00:00Z",
+            "end_time": "2030-01-10T11:00:00Z",
+            "title": "Estudo"
+        }
+        response = self.client.post("/reservations/", json=reservation, headers=self.student_headers)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(cache.get(ACCESS, self.student.id), frozenset())
+
+        response = self.client.post(
+            "/access/",
+            json={"user_id": self.student.id, "laboratory_id": lab.id},
+            headers=self.admin_headers
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(cache.get(ACCESS, self.student.id))
+
+        response = self.client.post("/reservations/", json=reservation, headers=self.student_headers)
+        self.assertEqual(response.status_code, 201)
+
+    def test_user_invalidated_by_deactivate(self):
+        """Testa que o usuário em cache é invalidado ao ser desativado."""
+        response = self.client.get("/auth/me", headers=self.student_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(cache.get(USERS, self.student.email))
+
+        response = self.client.patch(
+            f"/users/{self.student.id}/deactivate", headers=self.admin_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(USERS, self.student.email))
+
+        # Sem a revogação do token, o usuário desativado é lido de novo do banco
+        with patch("dependencies.is_revoked", return_value=False):
+            response = self.client.get("/auth/me", headers=self.student_headers)
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Testes para os feeds iCalendar de laboratórios e usuários.
+"""
+import unittest
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import (
+    User, Laboratory, Reservation, Role, ReservationStatus, ReservationType
+)
+from utils.ical import fold_line
+from utils.jwt import create_access_token
+
+
+class TestCalendar(unittest.TestCase):
+    """Testes para os feeds iCalendar."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.owner = User(
+            email="owner@test.com",
+            hashed_password="hashed_password",
+            role=Role.professor,
+            project_name="Test Project",
+            is_active=True
+        )
+        self.other = User(
+            email="other@test.com",
+            hashed_password="hashed_password",
+            role=Role.aluno,
+            project_name="Test Project",
+            is_active=True
+        )
+        self.lab = Laboratory(name="Lab Calendário", capacity=20)
+        self.session.add_all([self.owner, self.other, self.lab])
+        self.session.commit()
+        for obj in (self.owner, self.other, self.lab):
+            self.session.refresh(obj)
+
+        self.owner_headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': self.owner.email})}"
+        }
+        self.other_headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': self.other.email})}"
+        }
+
+        start_time = datetime(2030, 5, 6, 10, 0, tzinfo=timezone.utc)
+        self.reservations = [
+            Reservation(
+                user_id=self.owner.id,
+                laboratory_id=self.lab.id,
+                reservation_type=ReservationType.room,
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=2),
+                title="Reunião secreta",
+                description="Pauta, item; outro",
+                is_confidential=True,
+                status=ReservationStatus.approved
+            ),
+            Reservation(
+                user_id=self.owner.id,
+                laboratory_id=self.lab.id,
+                reservation_type=ReservationType.room,
+                start_time=start_time + timedelta(days=1),
+                end_time=start_time + timedelta(days=1, hours=1),
+                title="Pendente",
+                status=ReservationStatus.pending
+            ),
+        ]
+        self.session.add_all(self.reservations)
+        self.session.commit()
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.rollback()
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            self.session.execute(table.delete())
+        self.session.commit()
+        self.session.close()
+        app.dependency_overrides.clear()
+
+    def test_laboratory_calendar_for_owner(self):
+        """Testa o feed do laboratório visto pelo dono da reserva."""
+        response = self.client.get(f"/laboratories/{self.lab.id}/calendar.ics", headers=self.owner_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/calendar"))
+        self.assertIn("ETag", response.headers)
+
+        body = response.text
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(body.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 1)
+        self.assertIn("SUMMARY:Reunião secreta", body)
+        self.assertIn("DESCRIPTION:Pauta\\, item\\; outro", body)
+        self.assertIn("DTSTART:20300506T100000Z", body)
+        self.assertIn("LOCATION:Lab Calendário", body)
+
+    def test_laboratory_calendar_redacts_confidential(self):
+        """Testa que reservas confidenciais são ocultadas para outros usuários."""
+        response = self.client.get(f"/laboratories/{self.lab.id}/calendar.ics", headers=self.other_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("SUMMARY:[Reserva Confidencial]", response.text)
+        self.assertNotIn("Reunião secreta", response.text)
+        self.assertNotIn("DESCRIPTION", response.text)
+
+    def test_laboratory_calendar_not_modified(self):
+        """Testa a resposta 304 e a troca de ETag após uma alteração."""
+        url = f"/laboratories/{self.lab.id}/calendar.ics"
+        etag = self.client.get(url, headers=self.owner_headers).headers["ETag"]
+
+        response = self.client.get(url, headers={**self.owner_headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        # Outro usuário recebe outra ETag (a ocultação depende do observador)
+        other_etag = self.client.get(url, headers=self.other_headers).headers["ETag"]
+        self.assertNotEqual(other_etag, etag)
+
+        pending = self.reservations[1]
+        pending.status = ReservationStatus.approved
+        pending.updated_at = datetime.now(timezone.utc)
+        self.session.add(pending)
+        self.session.commit()
+
+        response = self.client.get(url, headers={**self.owner_headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.text.count("BEGIN:VEVENT"), 2)
+
+    def test_laboratory_calendar_not_found(self):
+        """Testa o feed de um laboratório inexistente."""
+        response = self.client.get("/laboratories/9999/calendar.ics", headers=self.owner_headers)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_my_calendar(self):
+        """Testa o feed de reservas do usuário autenticado."""
+        response = self.client.get("/users/me/calendar.ics", headers=self.owner_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.count("BEGIN:VEVENT"), 1)
+        self.assertIn("SUMMARY:Reunião secreta", response.text)
+
+        etag = response.headers["ETag"]
+        response = self.client.get("/users/me/calendar.ics", headers={**self.owner_headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get("/users/me/calendar.ics", headers=self.other_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("BEGIN:VEVENT", response.text)
+
+    def test_fold_line(self):
+        """Testa a quebra de linhas longas em no máximo 75 octetos."""
+        folded = fold_line("SUMMARY:" + "ç" * 60)
+
+        lines = folded.rstrip("\r\n").split("\r\n")
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in lines))
+        self.assertEqual("".join(line[1:] if i else line for i, line in enumerate(lines)), "SUMMARY:" + "ç" * 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
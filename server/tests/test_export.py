@@ -0,0 +1,180 @@
+"""
+Testes para a exportação de reservas em CSV e Parquet.
+"""
+import csv
+import io
+import unittest
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import (
+    User, Laboratory, Reservation, Role, ReservationStatus, ReservationType
+)
+from utils.archive import ARCHIVE_AFTER_DAYS, archive_expired_reservations
+from utils.export import EXPORT_COLUMNS
+from utils.jwt import create_access_token
+
+
+class TestExport(unittest.TestCase):
+    """Testes para a exportação de reservas."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.admin = User(
+            email="admin@test.com",
+            hashed_password="hashed_password",
+            role=Role.admin,
+            project_name="Admin",
+            is_active=True
+        )
+        self.lab = Laboratory(name="Lab Exportação", capacity=20)
+        self.session.add_all([self.admin, self.lab])
+        self.session.commit()
+        self.session.refresh(self.admin)
+        self.session.refresh(self.lab)
+
+        token = create_access_token(data={"sub": self.admin.email})
+        self.admin_headers = {"Authorization": f"Bearer {token}"}
+
+        # Uma reserva que será arquivada e duas recentes
+        now = datetime.now(timezone.utc)
+        for days_ago, title in [(ARCHIVE_AFTER_DAYS + 10, "Antiga"), (3, "Recente, com vírgula"), (1, "Ontem")]:
+            start_time = now - timedelta(days=days_ago)
+            self.session.add(Reservation(
+                user_id=self.admin.id,
+                laboratory_id=self.lab.id,
+                reservation_type=ReservationType.room,
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=1),
+                title=title,
+                status=ReservationStatus.approved
+            ))
+        self.session.commit()
+        archive_expired_reservations(self.session)
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.rollback()
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            self.session.execute(table.delete())
+        self.session.commit()
+        self.session.close()
+        app.dependency_overrides.clear()
+
+    def test_export_csv_includes_archive(self):
+        """Testa a exportação CSV de todo o histórico, inclusive o arquivo."""
+        response = self.client.get("/reservations/export", headers=self.admin_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertIn("attachment", response.headers["content-disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual(list(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual([row["title"] for row in rows], ["Antiga", "Recente, com vírgula", "Ontem"])
+        self.assertEqual(rows[0]["status"], "approved")
+        self.assertEqual(rows[0]["computer_id"], "")
+
+    def test_export_csv_with_period(self):
+        """Testa a exportação filtrada por período."""
+        from_date = (datetime.now(timezone.utc) - timedelta(days=2)).date().isoformat()
+
+        response = self.client.get(
+            "/reservations/export",
+            params={"from": from_date},
+            headers=self.admin_headers
+        )
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual([row["title"] for row in rows], ["Ontem"])
+
+    def test_export_csv_empty(self):
+        """Testa que uma exportação vazia contém apenas o cabeçalho."""
+        response = self.client.get(
+            "/reservations/export",
+            params={"from": "2099-01-01"},
+            headers=self.admin_headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.strip(), ",".join(EXPORT_COLUMNS))
+
+    def test_export_parquet(self):
+        """Testa a exportação em Parquet."""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow não instalado")
+
+        response = self.client.get(
+            "/reservations/export",
+            params={"format": "parquet"},
+            headers=self.admin_headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(response.content))
+        self.assertEqual(table.column_names, EXPORT_COLUMNS)
+        self.assertEqual(table.column("title").to_pylist(), ["Antiga", "Recente, com vírgula", "Ontem"])
+        self.assertEqual(table.column("status").to_pylist(), ["approved"] * 3)
+
+    def test_export_invalid_format(self):
+        """Testa a rejeição de formatos desconhecidos."""
+        response = self.client.get(
+            "/reservations/export",
+            params={"format": "xlsx"},
+            headers=self.admin_headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_as_non_admin(self):
+        """Testa que apenas administradores exportam reservas."""
+        professor = User(
+            email="professor@test.com",
+            hashed_password="hashed_password",
+            role=Role.professor,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.session.add(professor)
+        self.session.commit()
+        token = create_access_token(data={"sub": professor.email})
+
+        response = self.client.get(
+            "/reservations/export",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+Testes para a importação em lote de laboratórios, computadores e acessos.
+"""
+import json
+import unittest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import User, Laboratory, Computer, UserLaboratoryAccess, Role
+from utils.jwt import create_access_token
+
+
+class TestBulkImport(unittest.TestCase):
+    """Testes para as rotas de importação em lote."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.admin = User(
+            email="admin@test.com",
+            hashed_password="hashed_password",
+            role=Role.admin,
+            project_name="Admin",
+            is_active=True
+        )
+        self.session.add(self.admin)
+        self.session.commit()
+        self.session.refresh(self.admin)
+
+        token = create_access_token(data={"sub": self.admin.email})
+        self.admin_headers = {"Authorization": f"Bearer {token}"}
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.rollback()
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            self.session.execute(table.delete())
+        self.session.commit()
+        self.session.close()
+        app.dependency_overrides.clear()
+
+    def upload(self, url: str, filename: str, content: str, headers: dict = None):
+        """Helper: Envia um arquivo para uma rota de importação."""
+        return self.client.post(
+            url,
+            files={"file": (filename, content.encode("utf-8"))},
+            headers=headers or self.admin_headers
+        )
+
+    def test_import_laboratories_csv(self):
+        """Testa a importação de laboratórios com linhas inválidas e duplicadas."""
+        self.session.add(Laboratory(name="Lab Existente", capacity=10))
+        self.session.commit()
+
+        content = (
+            "name,description,capacity\n"
+            "Lab A,Primeiro,20\n"
+            "Lab Existente,,15\n"
+            "Lab B,,0\n"
+            "Lab A,Repetido,30\n"
+            "Lab C,,25\n"
+        )
+        response = self.upload("/laboratories/import", "labs.csv", content)
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report["total_rows"], 5)
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4, 5])
+        self.assertIn("já existe", report["errors"][0]["error"])
+        self.assertIn("capacity", report["errors"][1]["error"])
+
+        names = set(self.session.exec(select(Laboratory.name)).all())
+        self.assertEqual(names, {"Lab Existente", "Lab A", "Lab C"})
+        lab_a = self.session.exec(select(Laboratory).where(Laboratory.name == "Lab A")).one()
+        self.assertIsNotNone(lab_a.created_at)
+        self.assertTrue(lab_a.is_active)
+
+    def test_import_computers_ndjson(self):
+        """Testa a importação de computadores em NDJSON."""
+        lab = Laboratory(name="Lab PCs", capacity=10)
+        self.session.add(lab)
+        self.session.commit()
+        self.session.refresh(lab)
+        self.session.add(Computer(name="PC-01", laboratory_id=lab.id))
+        self.session.commit()
+
+        lines = [
+            json.dumps({"name": "PC-01", "laboratory_id": lab.id}),
+            json.dumps({"name": "PC-02", "laboratory_id": lab.id, "specifications": "i7"}),
+            json.dumps({"name": "PC-03", "laboratory_id": 9999}),
+            "{não é json",
+            "",
+            json.dumps({"name": "PC-04", "laboratory_id": lab.id}),
+        ]
+        response = self.upload("/computers/import", "pcs.ndjson", "\n".join(lines))
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report["total_rows"], 5)
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(
+            [(error["row"], error["error"][:20]) for error in report["errors"]],
+            [(1, "Computador 'PC-01' j"), (3, "Laboratório não enco"), (4, "JSON inválido: Expec")]
+        )
+
+        names = set(self.session.exec(select(Computer.name)).all())
+        self.assertEqual(names, {"PC-01", "PC-02", "PC-04"})
+
+    def test_import_access_csv(self):
+        """Testa a concessão de acessos em lote."""
+        lab = Laboratory(name="Lab Acesso", capacity=10)
+        student = User(
+            email="aluno@test.com",
+            hashed_password="hashed_password",
+            role=Role.aluno,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.session.add_all([lab, student])
+        self.session.commit()
+        self.session.refresh(lab)
+        self.session.refresh(student)
+
+        content = (
+            "user_id,laboratory_id\n"
+            f"{student.id},{lab.id}\n"
+            f"{student.id},{lab.id}\n"
+            f"9999,{lab.id}\n"
+        )
+        response = self.upload("/access/import", "acessos.csv", content)
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report["created"], 1)
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4])
+
+        access = self.session.exec(select(UserLaboratoryAccess)).one()
+        self.assertEqual(access.granted_by, self.admin.id)
+
+    def test_import_invalid_format(self):
+        """Testa a rejeição de formatos desconhecidos."""
+        response = self.client.post(
+            "/laboratories/import",
+            params={"format": "xlsx"},
+            files={"file": ("labs.xlsx", b"")},
+            headers=self.admin_headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_non_utf8_file(self):
+        """Testa que um CSV em Latin-1 é recusado sem gravar nenhuma linha."""
+        rows = "".join(f"Lab {i},,10\n" for i in range(600))
+        content = ("name,description,capacity\n" + rows + "Laboratório São José,,10\n").encode("latin-1")
+        response = self.client.post(
+            "/laboratories/import",
+            files={"file": ("labs.csv", content)},
+            headers=self.admin_headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("UTF-8", response.json()["detail"])
+
+        # get_session fecha a sessão sem commit; aqui a sessão é compartilhada
+        self.session.rollback()
+        self.assertEqual(self.session.exec(select(Laboratory)).all(), [])
+
+    def test_import_as_non_admin(self):
+        """Testa que apenas administradores importam dados."""
+        professor = User(
+            email="professor@test.com",
+            hashed_password="hashed_password",
+            role=Role.professor,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.session.add(professor)
+        self.session.commit()
+        token = create_access_token(data={"sub": professor.email})
+
+        response = self.upload(
+            "/laboratories/import",
+            "labs.csv",
+            "name,capacity\nLab,10\n",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
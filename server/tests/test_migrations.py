@@ -0,0 +1,224 @@
+"""
+Testes para as migrações do banco de dados.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlmodel import SQLModel
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models  # noqa: F401
+from database import ALEMBIC_CONFIG, check_schema_version, get_schema_head
+
+# Schema que o create_all gerava antes das migrações (bancos já em produção)
+BASELINE_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL,
+    email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL,
+    role VARCHAR(9) NOT NULL,
+    project_name VARCHAR NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_user_email ON user (email);
+CREATE INDEX ix_user_project_name ON user (project_name);
+CREATE TABLE registrationrequest (
+    id INTEGER NOT NULL,
+    email VARCHAR NOT NULL,
+    project_name VARCHAR NOT NULL,
+    password VARCHAR NOT NULL,
+    is_processed BOOLEAN NOT NULL,
+    submitted_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_registrationrequest_project_name ON registrationrequest (project_name);
+CREATE UNIQUE INDEX ix_registrationrequest_email ON registrationrequest (email);
+CREATE TABLE laboratory (
+    id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    description VARCHAR(500),
+    capacity INTEGER NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_laboratory_name ON laboratory (name);
+CREATE TABLE computer (
+    id INTEGER NOT NULL,
+    name VARCHAR(50) NOT NULL,
+    laboratory_id INTEGER NOT NULL,
+    specifications VARCHAR(500),
+    is_active BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(laboratory_id) REFERENCES laboratory (id)
+);
+CREATE INDEX ix_computer_name ON computer (name);
+CREATE TABLE userlaboratoryaccess (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    laboratory_id INTEGER NOT NULL,
+    granted_at DATETIME NOT NULL,
+    granted_by INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES user (id),
+    FOREIGN KEY(laboratory_id) REFERENCES laboratory (id),
+    FOREIGN KEY(granted_by) REFERENCES user (id)
+);
+CREATE TABLE accessrequest (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    laboratory_id INTEGER NOT NULL,
+    reason VARCHAR(500),
+    is_processed BOOLEAN NOT NULL,
+    is_approved BOOLEAN NOT NULL,
+    submitted_at DATETIME NOT NULL,
+    processed_at DATETIME,
+    processed_by INTEGER,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES user (id),
+    FOREIGN KEY(laboratory_id) REFERENCES laboratory (id),
+    FOREIGN KEY(processed_by) REFERENCES user (id)
+);
+CREATE INDEX ix_accessrequest_is_processed ON accessrequest (is_processed);
+CREATE INDEX ix_accessrequest_laboratory_id ON accessrequest (laboratory_id);
+CREATE INDEX ix_accessrequest_user_id ON accessrequest (user_id);
+CREATE TABLE reservation (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    laboratory_id INTEGER NOT NULL,
+    computer_id INTEGER,
+    reservation_type VARCHAR(8) NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME NOT NULL,
+    title VARCHAR(200) NOT NULL,
+    description VARCHAR(1000),
+    is_confidential BOOLEAN NOT NULL,
+    status VARCHAR(9) NOT NULL,
+    reviewed_by INTEGER,
+    reviewed_at DATETIME,
+    rejection_reason VARCHAR(500),
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES user (id),
+    FOREIGN KEY(laboratory_id) REFERENCES laboratory (id),
+    FOREIGN KEY(computer_id) REFERENCES computer (id),
+    FOREIGN KEY(reviewed_by) REFERENCES user (id)
+);
+CREATE INDEX ix_reservation_laboratory_id ON reservation (laboratory_id);
+CREATE INDEX ix_reservation_status ON reservation (status);
+CREATE INDEX ix_reservation_user_id ON reservation (user_id);
+CREATE INDEX ix_reservation_end_time ON reservation (end_time);
+CREATE INDEX ix_reservation_start_time ON reservation (start_time);
+"""
+
+
+class TestMigrations(unittest.TestCase):
+    """Testes para as migrações Alembic."""
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.directory.name, 'migrations.db')}"
+        self.engine = create_engine(self.url)
+        self.config = Config(ALEMBIC_CONFIG)
+        self.config.cmd_opts = type("Options", (), {"x": [f"url={self.url}"]})()
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def test_migrations_match_models(self):
+        """Testa que as migrações produzem exatamente o schema dos modelos."""
+        command.upgrade(self.config, "head")
+
+        with self.engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), SQLModel.metadata)
+
+        self.assertEqual(diff, [])
+
+    def create_baseline_schema(self):
+        """Helper: Cria o banco como o create_all fazia, sem alembic_version."""
+        with self.engine.begin() as connection:
+            connection.connection.executescript(BASELINE_SCHEMA)
+
+    def assert_matches_models(self):
+        """Helper: Compara o schema do banco com os modelos."""
+        with self.engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), SQLModel.metadata)
+        self.assertEqual(diff, [])
+
+    def test_baseline_stamp_and_upgrade(self):
+        """Testa o caminho documentado para bancos criados pelo create_all."""
+        self.create_baseline_schema()
+
+        command.stamp(self.config, "0001")
+        command.upgrade(self.config, "head")
+
+        self.assert_matches_models()
+        self.assertTrue(check_schema_version(self.engine))
+
+    def test_baseline_upgrade_without_stamp(self):
+        """Testa que o upgrade marca sozinho um banco criado pelo create_all."""
+        self.create_baseline_schema()
+
+        command.upgrade(self.config, "head")
+
+        self.assert_matches_models()
+        self.assertTrue(check_schema_version(self.engine))
+
+    def test_initial_schema_is_baseline(self):
+        """Testa que a 0001 cria exatamente as tabelas do schema original."""
+        command.upgrade(self.config, "0001")
+        migrated = set(inspect(self.engine).get_table_names()) - {"alembic_version"}
+
+        baseline = create_engine("sqlite://")
+        with baseline.begin() as connection:
+            connection.connection.executescript(BASELINE_SCHEMA)
+        self.assertEqual(migrated, set(inspect(baseline).get_table_names()))
+        baseline.dispose()
+
+    def test_hot_query_indexes(self):
+        """Testa a criação dos índices compostos."""
+        command.upgrade(self.config, "head")
+
+        indexes = {index["name"] for index in inspect(self.engine).get_indexes("reservation")}
+        self.assertIn("ix_reservation_lab_status_start_end", indexes)
+        self.assertIn("ix_reservation_user_status", indexes)
+
+    def test_downgrade_to_base(self):
+        """Testa que todas as migrações podem ser desfeitas."""
+        command.upgrade(self.config, "head")
+        command.downgrade(self.config, "base")
+
+        self.assertEqual(inspect(self.engine).get_table_names(), ["alembic_version"])
+
+    def test_check_schema_version(self):
+        """Testa a verificação de versão feita na inicialização."""
+        self.assertFalse(check_schema_version(self.engine))
+
+        command.upgrade(self.config, "0001")
+        self.assertFalse(check_schema_version(self.engine))
+
+        command.upgrade(self.config, "head")
+        self.assertTrue(check_schema_version(self.engine))
+        self.assertEqual(get_schema_head(), "0013")
+
+
+if __name__ == '__main__':
+    unittest.main()
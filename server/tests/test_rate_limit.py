@@ -0,0 +1,156 @@
+"""
+Testes para a limitação de requisições (token bucket).
+"""
+import inspect
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import User, Role
+from utils import rate_limit
+from utils.jwt import create_access_token
+from utils.rate_limit import MemoryBuckets, RateLimitRule, parse_rule
+
+
+class TestBuckets(unittest.TestCase):
+    """Testes para a contagem dos baldes."""
+
+    def test_parse_rule(self):
+        """Testa a leitura do formato "<requisições>/<segundos>"."""
+        self.assertEqual(parse_rule("10/60"), RateLimitRule(capacity=10, period=60))
+
+    def test_burst_and_refill(self):
+        """Testa a rajada até a capacidade e o reabastecimento com o tempo."""
+        buckets = MemoryBuckets()
+        rule = RateLimitRule(capacity=3, period=3)
+
+        self.assertEqual([buckets.take("k", rule, now=0) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(buckets.take("k", rule, now=0), 1.0)
+
+        # Meio segundo depois, meio token: ainda falta meio segundo
+        self.assertAlmostEqual(buckets.take("k", rule, now=0.5), 0.5)
+        self.assertEqual(buckets.take("k", rule, now=1.0), 0)
+
+        # Chaves diferentes têm baldes independentes
+        self.assertEqual(buckets.take("outra", rule, now=1.0), 0)
+
+    def test_prune_keeps_memory_bounded(self):
+        """Testa que o número de baldes em memória é limitado."""
+        buckets = MemoryBuckets(max_keys=10)
+        rule = RateLimitRule(capacity=1, period=60)
+
+        for i in range(100):
+            buckets.take(f"ip:{i}", rule, now=i)
+
+        self.assertLessEqual(len(buckets.buckets), 10)
+        self.assertIn("ip:99", buckets.buckets)
+
+
+class TestRateLimitedRoutes(unittest.TestCase):
+    """Testes para as rotas limitadas."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.rules = patch.dict(rate_limit.RATE_LIMIT_RULES, {
+            "login": RateLimitRule(capacity=3, period=60),
+            "login_account": RateLimitRule(capacity=2, period=60),
+            "reservations": RateLimitRule(capacity=2, period=60),
+        })
+        self.rules.start()
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.rules.stop()
+        self.session.close()
+        app.dependency_overrides.clear()
+        SQLModel.metadata.drop_all(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+
+    def login(self, email):
+        """Helper: Tentativa de login com senha errada."""
+        return self.client.post("/auth/login", json={"email": email, "password": "errada123"})
+
+    def test_login_limited_per_account_before_bcrypt(self):
+        """Testa que a conta é bloqueada sem consultar o bcrypt."""
+        with patch("routers.auth.verify_password", return_value=False) as verify:
+            statuses = [self.login("alvo@test.com").status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [401, 401, 429])
+        self.assertEqual(verify.call_count, 0)  # usuário inexistente
+
+        response = self.login("alvo@test.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+
+    def test_login_limited_per_ip(self):
+        """Testa o limite por IP com e-mails diferentes."""
+        with patch("routers.auth.verify_password") as verify:
+            statuses = [self.login(f"user{i}@test.com").status_code for i in range(4)]
+
+        self.assertEqual(statuses, [401, 401, 401, 429])
+        verify.assert_not_called()
+
+    def test_dependency_runs_off_event_loop(self):
+        """Testa que a dependência é síncrona (executada no threadpool, sem bloquear o loop)."""
+        self.assertFalse(inspect.iscoroutinefunction(rate_limit.rate_limit("login")))
+
+    def test_reservation_writes_limited_per_user(self):
+        """Testa que escritas de reserva respondem 429 antes de chegar ao banco."""
+        user = User(
+            email="prof@test.com",
+            hashed_password="hashed_password",
+            role=Role.professor,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.session.add(user)
+        self.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': user.email})}"}
+
+        statuses = [
+            self.client.delete("/reservations/999", headers=headers).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [404, 404, 429])
+
+        # Outro usuário no mesmo IP também é limitado pelo balde do IP
+        response = self.client.delete("/reservations/999")
+        self.assertEqual(response.status_code, 429)
+
+    def test_disabled(self):
+        """Testa que RATE_LIMIT_ENABLED=false desliga o limite."""
+        with patch.object(rate_limit, "RATE_LIMIT_ENABLED", False):
+            statuses = {self.login("alvo@test.com").status_code for _ in range(5)}
+
+        self.assertEqual(statuses, {401})
+
+
+if __name__ == '__main__':
+    unittest.main()
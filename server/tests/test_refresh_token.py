@@ -0,0 +1,186 @@
+"""
+Testes para a renovação de sessão com tokens de renovação.
+"""
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import RefreshToken, User, Role
+from utils.hash_password import hash_password
+from utils.refresh_token import find_refresh_token, hash_refresh_token, rotate_refresh_token
+
+
+class TestRefreshToken(unittest.TestCase):
+    """Testes para /auth/refresh e a revogação no logout."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.user = User(
+            email="prof@test.com",
+            hashed_password=hash_password("senha12345"),
+            role=Role.professor,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.session.add(self.user)
+        self.session.commit()
+        self.session.refresh(self.user)
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.close()
+        app.dependency_overrides.clear()
+        SQLModel.metadata.drop_all(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+
+    def login(self):
+        """Helper: Login com as credenciais corretas."""
+        response = self.client.post(
+            "/auth/login",
+            json={"email": "prof@test.com", "password": "senha12345"}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def refresh(self, refresh_token):
+        """Helper: Renovação da sessão."""
+        return self.client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+    def test_login_stores_only_hash(self):
+        """Testa que o banco guarda apenas o HMAC do token."""
+        tokens = self.login()
+
+        stored = self.session.exec(select(RefreshToken)).one()
+        self.assertEqual(stored.token_hash, hash_refresh_token(tokens["refresh_token"]))
+        self.assertNotEqual(stored.token_hash, tokens["refresh_token"])
+
+    def test_refresh_rotates_without_bcrypt(self):
+        """Testa que a renovação emite novos tokens sem verificar a senha."""
+        tokens = self.login()
+
+        with patch("routers.auth.verify_password") as verify:
+            response = self.refresh(tokens["refresh_token"])
+        verify.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        renewed = response.json()
+        self.assertNotEqual(renewed["refresh_token"], tokens["refresh_token"])
+
+        me = self.client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {renewed['access_token']}"}
+        )
+        self.assertEqual(me.json()["email"], "prof@test.com")
+
+    def test_reused_token_revokes_all_sessions(self):
+        """Testa que reapresentar um token já usado encerra todas as sessões."""
+        tokens = self.login()
+        renewed = self.refresh(tokens["refresh_token"]).json()
+
+        self.assertEqual(self.refresh(tokens["refresh_token"]).status_code, 401)
+        self.assertEqual(self.refresh(renewed["refresh_token"]).status_code, 401)
+
+    def test_expired_and_unknown_tokens(self):
+        """Testa a rejeição de tokens expirados ou desconhecidos."""
+        tokens = self.login()
+        stored = self.session.exec(select(RefreshToken)).one()
+        stored.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        self.session.add(stored)
+        self.session.commit()
+
+        self.assertEqual(self.refresh(tokens["refresh_token"]).status_code, 401)
+        self.assertEqual(self.refresh("desconhecido").status_code, 401)
+
+    def test_inactive_user_cannot_refresh(self):
+        """Testa que usuário desativado não renova a sessão."""
+        tokens = self.login()
+        self.user.is_active = False
+        self.session.add(self.user)
+        self.session.commit()
+
+        self.assertEqual(self.refresh(tokens["refresh_token"]).status_code, 403)
+
+    def test_inactive_user_gets_no_new_token(self):
+        """Testa que nenhum token é emitido (nem o usado revogado) para usuário inativo."""
+        tokens = self.login()
+        self.user.is_active = False
+        self.session.add(self.user)
+        self.session.commit()
+
+        self.assertEqual(self.refresh(tokens["refresh_token"]).status_code, 403)
+
+        stored = self.session.exec(select(RefreshToken)).all()
+        self.assertEqual(len(stored), 1)
+        self.assertIsNone(stored[0].revoked_at)
+
+    def test_concurrent_refresh_with_same_token(self):
+        """Testa que duas renovações simultâneas com o mesmo token não geram dois descendentes."""
+        tokens = self.login()
+
+        # A segunda requisição leu o token antes de a primeira revogá-lo
+        with Session(self.engine) as other_session:
+            stale = find_refresh_token(other_session, tokens["refresh_token"])
+            renewed = self.refresh(tokens["refresh_token"]).json()
+
+            with patch("utils.refresh_token.find_refresh_token", return_value=stale):
+                self.assertIsNone(rotate_refresh_token(other_session, tokens["refresh_token"]))
+
+        # Tratado como reuso: o descendente da primeira também é revogado
+        self.assertEqual(self.refresh(renewed["refresh_token"]).status_code, 401)
+        self.assertEqual(len(self.session.exec(select(RefreshToken)).all()), 2)
+
+    def test_logout_revokes_token(self):
+        """Testa que o logout revoga o token informado e mantém as outras sessões."""
+        first = self.login()
+        second = self.login()
+        headers = {"Authorization": f"Bearer {first['access_token']}"}
+
+        response = self.client.post(
+            "/auth/logout", json={"refresh_token": first["refresh_token"]}, headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.refresh(first["refresh_token"]).status_code, 401)
+        self.assertEqual(self.refresh(second["refresh_token"]).status_code, 200)
+
+    def test_logout_without_token_revokes_all(self):
+        """Testa que o logout sem token encerra todas as sessões do usuário."""
+        first = self.login()
+        second = self.login()
+        headers = {"Authorization": f"Bearer {first['access_token']}"}
+
+        self.assertEqual(self.client.post("/auth/logout", headers=headers).status_code, 200)
+
+        self.assertEqual(self.refresh(first["refresh_token"]).status_code, 401)
+        self.assertEqual(self.refresh(second["refresh_token"]).status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Testes para o roteamento de leituras para réplicas.
+"""
+import unittest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import database
+from main import app
+from database import PRIMARY_COOKIE, ReplicaPool, get_session
+from models import User, Laboratory, Role
+from utils.jwt import create_access_token
+
+
+def memory_engine():
+    """Helper: Banco SQLite em memória com todas as tabelas."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+class FakeLagPool(ReplicaPool):
+    """Pool cujo atraso de cada réplica é definido pelo teste."""
+
+    def __init__(self, engines, lags):
+        super().__init__(engines, max_lag=5)
+        self.fake_lags = lags
+
+    def measure_lag(self, replica):
+        lag = self.fake_lags[self.engines.index(replica)]
+        if lag is None:
+            raise ConnectionError("réplica fora do ar")
+        return lag
+
+
+class TestReplicaPool(unittest.TestCase):
+    """Testes para a rotação de réplicas."""
+
+    def test_round_robin(self):
+        """Testa a alternância entre réplicas saudáveis."""
+        engines = [memory_engine(), memory_engine()]
+        pool = ReplicaPool(engines)
+
+        self.assertEqual([pool.choose() for _ in range(4)], engines * 2)
+
+    def test_health_check_removes_lagging_replicas(self):
+        """Testa que réplicas atrasadas ou fora do ar saem da rotação."""
+        engines = [memory_engine(), memory_engine(), memory_engine()]
+        pool = FakeLagPool(engines, lags=[0.5, 30, None])
+
+        self.assertEqual(pool.check_health(), [engines[0]])
+        self.assertEqual({pool.choose() for _ in range(3)}, {engines[0]})
+
+        pool.fake_lags = [None, None, None]
+        pool.check_health()
+        self.assertIsNone(pool.choose())
+
+
+class TestReadRouting(unittest.TestCase):
+    """Testes para as leituras das listagens em réplicas."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = memory_engine()
+        cls.replica_engine = memory_engine()
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.original_replicas = database.replicas
+        database.replicas = ReplicaPool([self.replica_engine])
+
+        self.admin = User(
+            email="admin@test.com",
+            hashed_password="hashed_password",
+            role=Role.admin,
+            project_name="Admin",
+            is_active=True
+        )
+        self.session.add_all([self.admin, Laboratory(name="Lab Primário", capacity=10)])
+        self.session.commit()
+        self.session.refresh(self.admin)
+        self.headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': self.admin.email})}"
+        }
+
+        # A réplica ainda não recebeu o laboratório (simula atraso)
+        with Session(self.replica_engine) as replica_session:
+            replica_session.add(Laboratory(name="Lab Réplica", capacity=10))
+            replica_session.commit()
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        database.replicas = self.original_replicas
+        for engine in (self.engine, self.replica_engine):
+            with Session(engine) as session:
+                for table in reversed(SQLModel.metadata.sorted_tables):
+                    session.execute(table.delete())
+                session.commit()
+        self.session.close()
+        app.dependency_overrides.clear()
+
+    def list_names(self, headers=None):
+        """Helper: Nomes dos laboratórios listados."""
+        response = self.client.get("/laboratories/", headers=headers or self.headers)
+        self.assertEqual(response.status_code, 200)
+        return sorted(lab["name"] for lab in response.json())
+
+    def test_list_reads_from_replica(self):
+        """Testa que a listagem lê da réplica."""
+        self.assertEqual(self.list_names(), ["Lab Réplica"])
+
+    def test_read_your_writes(self):
+        """Testa que após uma escrita as leituras do cliente vão ao primário."""
+        response = self.client.post(
+            "/laboratories/",
+            json={"name": "Lab Novo", "capacity": 10},
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+        # Cookie guardado pelo cliente
+        self.assertEqual(self.list_names(), ["Lab Novo", "Lab Primário"])
+
+        # Sem o cookie, o registro do worker ainda reconhece o token
+        self.client.cookies.clear()
+        self.assertEqual(self.list_names(), ["Lab Novo", "Lab Primário"])
+
+    def test_failed_write_keeps_replica(self):
+        """Testa que uma escrita rejeitada não desvia as leituras."""
+        response = self.client.post(
+            "/laboratories/",
+            json={"name": "Lab Primário", "capacity": 10},
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.list_names(), ["Lab Réplica"])
+
+    def test_fallback_to_primary_without_healthy_replicas(self):
+        """Testa o uso do primário quando nenhuma réplica está saudável."""
+        database.replicas.healthy = []
+
+        self.assertEqual(self.list_names(), ["Lab Primário"])
+
+
+if __name__ == '__main__':
+    unittest.main()
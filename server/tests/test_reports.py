@@ -0,0 +1,345 @@
+"""
+Testes para os agregados de ocupação e o relatório de utilização.
+"""
+import unittest
+import warnings
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import (
+    User, Laboratory, Reservation, ReservationDailyStats,
+    Role, ReservationStatus, ReservationType
+)
+from utils.heatmap import fetch_reservation_minutes, period_bounds, weekly_occupancy
+from utils.jwt import create_access_token
+from utils.stats import hour_buckets, reconcile_daily_stats, update_reservation_stats
+
+
+class TestReports(unittest.TestCase):
+    """Testes para o relatório de utilização."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.admin = User(
+            email="admin@test.com",
+            hashed_password="hashed_password",
+            role=Role.admin,
+            project_name="Admin",
+            is_active=True
+        )
+        self.professor = User(
+            email="professor@test.com",
+            hashed_password="hashed_password",
+            role=Role.professor,
+            project_name="Test Project",
+            is_active=True
+        )
+        self.lab = Laboratory(name="Lab Relatórios", capacity=20)
+        self.session.add_all([self.admin, self.professor, self.lab])
+        self.session.commit()
+        for obj in (self.admin, self.professor, self.lab):
+            self.session.refresh(obj)
+
+        admin_token = create_access_token(data={"sub": self.admin.email})
+        professor_token = create_access_token(data={"sub": self.professor.email})
+        self.admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        self.professor_headers = {"Authorization": f"Bearer {professor_token}"}
+
+        # Amanhã, das 10:00 às 12:30 (UTC)
+        tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+        self.start_time = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 10, tzinfo=timezone.utc)
+        self.end_time = self.start_time + timedelta(hours=2, minutes=30)
+        self.day = tomorrow.isoformat()
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.rollback()
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            self.session.execute(table.delete())
+        self.session.commit()
+        self.session.close()
+        app.dependency_overrides.clear()
+
+    def create_pending_reservation(self) -> int:
+        """Helper: Cria uma reserva pendente e retorna seu ID."""
+        reservation = Reservation(
+            user_id=self.professor.id,
+            laboratory_id=self.lab.id,
+            reservation_type=ReservationType.room,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            title="Aula",
+            status=ReservationStatus.pending
+        )
+        self.session.add(reservation)
+        self.session.commit()
+        return reservation.id
+
+    def get_report(self) -> dict:
+        """Helper: Consulta o relatório de utilização do dia da reserva."""
+        response = self.client.get(
+            "/reports/utilization",
+            params={"from": self.day, "to": self.day, "laboratory_id": self.lab.id},
+            headers=self.admin_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_hour_buckets(self):
+        """Testa a divisão de um intervalo em horas cheias."""
+        buckets = list(hour_buckets(self.start_time, self.end_time))
+
+        self.assertEqual([(hour, minutes) for _, hour, minutes in buckets], [(10, 60), (11, 60), (12, 30)])
+
+    def test_report_after_approval(self):
+        """Testa que a aprovação alimenta os agregados incrementalmente."""
+        reservation_id = self.create_pending_reservation()
+
+        response = self.client.post(f"/reservations/{reservation_id}/approve", headers=self.admin_headers)
+        self.assertEqual(response.status_code, 200)
+
+        report = self.get_report()
+        self.assertEqual(report["total_booked_hours"], 2.5)
+        self.assertEqual(report["approved_count"], 1)
+        self.assertEqual(report["approval_rate"], 1.0)
+        self.assertEqual(len(report["daily"]), 1)
+        self.assertEqual(report["daily"][0]["booked_hours"], 2.5)
+        self.assertEqual([h["hour"] for h in report["peak_hours"]], [10, 11, 12])
+
+    def test_report_after_cancellation(self):
+        """Testa que o cancelamento remove as horas reservadas."""
+        reservation_id = self.create_pending_reservation()
+        self.client.post(f"/reservations/{reservation_id}/approve", headers=self.admin_headers)
+
+        response = self.client.delete(f"/reservations/{reservation_id}", headers=self.professor_headers)
+        self.assertEqual(response.status_code, 204)
+
+        report = self.get_report()
+        self.assertEqual(report["total_booked_hours"], 0)
+        self.assertEqual(report["approved_count"], 0)
+        self.assertEqual(report["cancelled_count"], 1)
+        self.assertEqual(report["daily"], [])
+        self.assertIsNone(report["approval_rate"])
+
+    def test_report_after_rejection(self):
+        """Testa a taxa de aprovação com uma reserva rejeitada."""
+        reservation_id = self.create_pending_reservation()
+
+        self.client.post(
+            f"/reservations/{reservation_id}/reject",
+            json={"rejection_reason": "Manutenção"},
+            headers=self.admin_headers
+        )
+
+        report = self.get_report()
+        self.assertEqual(report["rejected_count"], 1)
+        self.assertEqual(report["approval_rate"], 0.0)
+
+    def test_reconcile_matches_incremental(self):
+        """Testa que a reconciliação reproduz os agregados incrementais."""
+        reservation_id = self.create_pending_reservation()
+        self.client.post(f"/reservations/{reservation_id}/approve", headers=self.admin_headers)
+        incremental = self.get_report()
+
+        # Corrompe os agregados e reconcilia
+        for stats in self.session.exec(select(ReservationDailyStats)).all():
+            stats.booked_minutes = 0
+            self.session.add(stats)
+        self.session.commit()
+
+        day = self.start_time.date()
+        reconcile_daily_stats(self.session, day, day)
+
+        self.assertEqual(self.get_report(), incremental)
+
+
+    def test_reconcile_locks_stats_before_reading(self):
+        """Testa que, no PostgreSQL, a reconstrução trava os agregados antes de ler as reservas."""
+        from unittest.mock import MagicMock
+
+        session = MagicMock()
+        session.get_bind.return_value.dialect.name = "postgresql"
+        session.exec.return_value = []
+        day = self.start_time.date()
+        reconcile_daily_stats(session, day, day)
+
+        first = session.method_calls[1]
+        self.assertEqual(first[0], "execute")
+        self.assertEqual(
+            str(first[1][0]),
+            "LOCK TABLE reservation_daily_stats IN SHARE ROW EXCLUSIVE MODE"
+        )
+        self.assertEqual(session.method_calls[2][0], "exec")
+    def test_incremental_stats_single_row_per_bucket(self):
+        """Testa que atualizações do mesmo balde somam na mesma linha, inclusive para salas."""
+        for _ in range(2):
+            reservation = Reservation(
+                user_id=self.professor.id,
+                laboratory_id=self.lab.id,
+                reservation_type=ReservationType.room,
+                start_time=self.start_time,
+                end_time=self.start_time + timedelta(minutes=30),
+                title="Aula",
+                status=ReservationStatus.approved
+            )
+            with Session(self.engine) as session:
+                update_reservation_stats(session, reservation, old_status=ReservationStatus.pending)
+                session.commit()
+
+        rows = self.session.exec(select(ReservationDailyStats)).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0].approved_count, rows[0].booked_minutes), (2, 60))
+
+        # O banco recusa um segundo agregado para o mesmo balde
+        self.session.add(ReservationDailyStats(
+            day=rows[0].day, hour=rows[0].hour, laboratory_id=self.lab.id, computer_id=None
+        ))
+        with self.assertRaises(IntegrityError):
+            self.session.commit()
+        self.session.rollback()
+
+    def test_heatmap(self):
+        """Testa o mapa de calor de uma reserva aprovada."""
+        reservation_id = self.create_pending_reservation()
+        self.client.post(f"/reservations/{reservation_id}/approve", headers=self.admin_headers)
+
+        response = self.client.get(
+            "/reports/heatmap",
+            params={"from": self.day, "to": self.day},
+            headers=self.admin_headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        laboratories = response.json()["laboratories"]
+        self.assertEqual(len(laboratories), 1)
+        self.assertEqual(laboratories[0]["laboratory_id"], self.lab.id)
+
+        weekday = self.start_time.weekday()
+        occupancy = laboratories[0]["occupancy"]
+        self.assertEqual(occupancy[weekday][9:14], [0.0, 1.0, 1.0, 0.5, 0.0])
+        self.assertEqual(sum(map(sum, occupancy)), 2.5)
+
+    def test_fetch_reservation_minutes(self):
+        """Testa a leitura dos horários já em minutos desde a época."""
+        reservation_id = self.create_pending_reservation()
+        reservation = self.session.get(Reservation, reservation_id)
+        reservation.status = ReservationStatus.approved
+        reservation.end_time = self.end_time + timedelta(seconds=45)
+        self.session.add(reservation)
+        self.session.commit()
+
+        range_start, range_end = period_bounds(self.start_time.date(), self.start_time.date())
+        laboratory_ids, starts, ends = fetch_reservation_minutes(
+            self.session, [Reservation], range_start, range_end
+        )
+
+        self.assertEqual(laboratory_ids.tolist(), [self.lab.id])
+        self.assertEqual(starts.tolist(), [int(self.start_time.timestamp()) // 60])
+        self.assertEqual(ends.tolist(), [int(self.end_time.timestamp()) // 60])
+
+        _, starts, _ = fetch_reservation_minutes(
+            self.session, [Reservation], range_end, range_end + timedelta(days=1)
+        )
+        self.assertEqual(starts.size, 0)
+
+    def test_weekly_occupancy_overlaps_and_clipping(self):
+        """Testa sobreposições, múltiplas semanas e recorte ao período."""
+        from_date = datetime(2024, 1, 1).date()  # segunda-feira
+        to_date = datetime(2024, 1, 14).date()
+        labs, occupancy = weekly_occupancy(
+            [1, 1, 2, 2],
+            [
+                datetime(2024, 1, 1, 8, 0),
+                datetime(2024, 1, 1, 8, 30),   # sobrepõe a anterior
+                datetime(2023, 12, 31, 23, 0), # começa antes do período
+                datetime(2024, 1, 14, 23, 30), # termina depois do período
+            ],
+            [
+                datetime(2024, 1, 1, 9, 0),
+                datetime(2024, 1, 1, 9, 30),
+                datetime(2024, 1, 1, 1, 0),
+                datetime(2024, 1, 15, 2, 0),
+            ],
+            from_date,
+            to_date
+        )
+
+        self.assertEqual(labs.tolist(), [1, 2])
+        # Duas segundas-feiras no período: 60 + 30 minutos ocupados em 120 disponíveis
+        self.assertAlmostEqual(occupancy[0, 0, 8], 0.5)
+        self.assertAlmostEqual(occupancy[0, 0, 9], 0.25)
+        self.assertAlmostEqual(occupancy[1, 0, 0], 0.5)
+        self.assertAlmostEqual(occupancy[1, 6, 23], 0.25)
+        self.assertAlmostEqual(occupancy.sum(), 0.5 + 0.25 + 0.5 + 0.25)
+
+    def test_weekly_occupancy_timezone_aware(self):
+        """Testa que horários com fuso são convertidos para UTC sem avisos do NumPy."""
+        from_date = datetime(2024, 1, 1).date()
+        brasilia = timezone(timedelta(hours=-3))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            labs, occupancy = weekly_occupancy(
+                [1],
+                [datetime(2024, 1, 1, 5, 0, tzinfo=brasilia)],
+                [datetime(2024, 1, 1, 6, 30, tzinfo=brasilia)],
+                from_date,
+                from_date
+            )
+
+        self.assertEqual(labs.tolist(), [1])
+        self.assertAlmostEqual(occupancy[0, 0, 8], 1.0)
+        self.assertAlmostEqual(occupancy[0, 0, 9], 0.5)
+        self.assertAlmostEqual(occupancy.sum(), 1.5)
+
+    def test_report_as_aluno(self):
+        """Testa que alunos não acessam o relatório."""
+        aluno = User(
+            email="aluno@test.com",
+            hashed_password="hashed_password",
+            role=Role.aluno,
+            project_name="Test Project",
+            is_active=True
+        )
+        self.session.add(aluno)
+        self.session.commit()
+        token = create_access_token(data={"sub": aluno.email})
+
+        response = self.client.get(
+            "/reports/utilization",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
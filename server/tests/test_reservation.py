@@ -3,8 +3,9 @@ Testes para o módulo de reservas usando unittest.
 """
 import unittest
 from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel, create_engine, select
 from sqlmodel.pool import StaticPool
 import sys
 import os
@@ -14,7 +15,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from main import app
 from database import get_session
-from models import User, Laboratory, Computer, Reservation, Role, ReservationStatus, ReservationType
+from models import (
+    User, Laboratory, Computer, Reservation, ReservationDailyStats, Role, ReservationStatus, ReservationType
+)
+from utils.conflicts import conflict_edges, conflict_graph
+from utils.jwt import create_access_token
 
 
 class TestReservations(unittest.TestCase):
@@ -270,6 +275,85 @@ class TestReservations(unittest.TestCase):
         self.assertTrue(reservation.is_confidential)
         # Na API, outros usuários não veriam o título real
     
+    def test_confidential_reservation_redacted_in_api(self):
+        """Testa que a API oculta reservas confidenciais sem alterar a reserva."""
+        import uuid
+        owner = self.create_test_user(Role.professor)
+        other = self.create_test_user(Role.aluno)
+        admin = self.create_test_user(Role.admin, f"admin_{uuid.uuid4().hex[:8]}@test.com")
+        lab = self.create_test_lab()
+        
+        start_time = datetime.now(timezone.utc) + timedelta(hours=2)
+        reservation = Reservation(
+            user_id=owner.id,
+            laboratory_id=lab.id,
+            reservation_type=ReservationType.room,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=2),
+            title="Confidential Meeting",
+            description="Secret agenda",
+            is_confidential=True
+        )
+        self.session.add(reservation)
+        self.session.commit()
+        self.session.refresh(reservation)
+        
+        def headers(user):
+            return {"Authorization": f"Bearer {create_access_token(data={'sub': user.email})}"}
+        
+        # Outro usuário vê a reserva ocultada, na listagem e no detalhe
+        response = self.client.get("/reservations/", headers=headers(other))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["title"], "[Reserva Confidencial]")
+        self.assertIsNone(response.json()[0]["description"])
+        
+        response = self.client.get(f"/reservations/{reservation.id}", headers=headers(other))
+        self.assertEqual(response.json()["title"], "[Reserva Confidencial]")
+        
+        # Dono e administrador veem os dados reais
+        for user in (owner, admin):
+            response = self.client.get(f"/reservations/{reservation.id}", headers=headers(user))
+            self.assertEqual(response.json()["title"], "Confidential Meeting")
+            self.assertEqual(response.json()["description"], "Secret agenda")
+        
+        # A reserva no banco não foi alterada pela ocultação
+        self.assertNotIn(reservation, self.session.dirty)
+        self.session.expire_all()
+        self.assertEqual(self.session.get(Reservation, reservation.id).title, "Confidential Meeting")
+    
+    def test_list_reservations_with_fields(self):
+        """Testa a listagem de reservas com seleção parcial de campos."""
+        owner = self.create_test_user(Role.professor)
+        other = self.create_test_user(Role.aluno)
+        lab = self.create_test_lab()
+        
+        start_time = datetime.now(timezone.utc) + timedelta(hours=2)
+        self.session.add(Reservation(
+            user_id=owner.id,
+            laboratory_id=lab.id,
+            reservation_type=ReservationType.room,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+            title="Confidential Meeting",
+            description="Secret agenda",
+            is_confidential=True
+        ))
+        self.session.commit()
+        
+        token = create_access_token(data={"sub": other.email})
+        response = self.client.get(
+            "/reservations/",
+            params={"fields": "title,status"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data[0]), {"id", "title", "status"})
+        # A ocultação de confidenciais continua valendo
+        self.assertEqual(data[0]["title"], "[Reserva Confidencial]")
+        self.assertEqual(data[0]["status"], "pending")
+    
     def test_multiple_pending_reservations_detection(self):
         """Testa detecção de múltiplas reservas pendentes."""
         from sqlmodel import select
@@ -462,6 +546,329 @@ class TestReservations(unittest.TestCase):
         self.assertEqual(reservation.status, ReservationStatus.rejected)
         self.assertIsNotNone(reservation.rejection_reason)
         self.assertEqual(reservation.reviewed_by, admin.id)
+    
+    def create_future_reservation(self, user: User, lab: Laboratory) -> Reservation:
+        """Helper: Cria uma reserva pendente de sala daqui a duas horas."""
+        start_time = datetime.now(timezone.utc) + timedelta(hours=2)
+        reservation = Reservation(
+            user_id=user.id,
+            laboratory_id=lab.id,
+            reservation_type=ReservationType.room,
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1),
+            title="Original"
+        )
+        self.session.add(reservation)
+        self.session.commit()
+        self.session.refresh(reservation)
+        return reservation
+    
+    def test_etag_and_if_match(self):
+        """Testa a ETag por versão e a recusa (412) de alterações sobre versão antiga."""
+        professor = self.create_test_user(Role.professor)
+        reservation = self.create_future_reservation(professor, self.create_test_lab())
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': professor.email})}"}
+        url = f"/reservations/{reservation.id}"
+        
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.headers["ETag"], '"1"')
+        self.assertEqual(response.json()["version"], 1)
+        
+        response = self.client.patch(url, json={"title": "Primeira"}, headers={**headers, "If-Match": '"1"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["ETag"], '"2"')
+        self.assertEqual(response.json()["version"], 2)
+        
+        # Segunda edição baseada na versão 1: não sobrescreve a primeira
+        response = self.client.patch(url, json={"title": "Segunda"}, headers={**headers, "If-Match": '"1"'})
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(url, headers={**headers, "If-Match": '"1"'})
+        self.assertEqual(response.status_code, 412)
+        
+        self.session.expire_all()
+        self.assertEqual(self.session.get(Reservation, reservation.id).title, "Primeira")
+        
+        # Sem If-Match (ou com "*") a alteração é feita sobre a versão atual
+        response = self.client.patch(url, json={"title": "Terceira"}, headers=headers)
+        self.assertEqual(response.json()["version"], 3)
+        response = self.client.delete(url, headers={**headers, "If-Match": "*"})
+        self.assertEqual(response.status_code, 204)
+    
+    def test_review_with_stale_version(self):
+        """Testa que aprovação e reprovação respeitam o If-Match."""
+        import uuid
+        professor = self.create_test_user(Role.professor)
+        admin = self.create_test_user(Role.admin, f"admin_{uuid.uuid4().hex[:8]}@test.com")
+        reservation = self.create_future_reservation(professor, self.create_test_lab())
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': admin.email})}"}
+        url = f"/reservations/{reservation.id}"
+        
+        response = self.client.post(
+            f"{url}/reject", json={"rejection_reason": "Motivo"}, headers={**headers, "If-Match": '"7"'}
+        )
+        self.assertEqual(response.status_code, 412)
+        
+        response = self.client.post(f"{url}/approve", headers={**headers, "If-Match": '"1"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "approved")
+        self.assertEqual(response.headers["ETag"], '"2"')
+    
+    def test_concurrent_write_detected(self):
+        """Testa que o UPDATE condicional detecta alteração entre a leitura e a escrita."""
+        from fastapi import HTTPException
+        from routers.reservations import save_reservation
+        
+        professor = self.create_test_user(Role.professor)
+        reservation = self.create_future_reservation(professor, self.create_test_lab())
+        
+        # Outra requisição leu a mesma versão antes desta gravar
+        with Session(self.engine) as other_session:
+            stale = other_session.get(Reservation, reservation.id)
+            
+            save_reservation(self.session, reservation, title="Admin")
+            self.session.commit()
+            
+            with self.assertRaises(HTTPException) as context:
+                save_reservation(other_session, stale, title="Usuário")
+            self.assertEqual(context.exception.status_code, 412)
+        
+        self.session.refresh(reservation)
+        self.assertEqual(reservation.title, "Admin")
+        self.assertEqual(reservation.version, 2)
+    
+    def test_claim_pending_queue(self):
+        """Testa que administradores recebem reservas pendentes diferentes para análise."""
+        import uuid
+        first_admin = self.create_test_user(Role.admin, f"admin_{uuid.uuid4().hex[:8]}@test.com")
+        second_admin = self.create_test_user(Role.admin, f"admin_{uuid.uuid4().hex[:8]}@test.com")
+        lab = self.create_test_lab()
+        reservations = [
+            self.create_future_reservation(self.create_test_user(Role.professor), lab)
+            for _ in range(3)
+        ]
+        ids = [reservation.id for reservation in reservations]
+        
+        def claim(admin, limit):
+            headers = {"Authorization": f"Bearer {create_access_token(data={'sub': admin.email})}"}
+            response = self.client.post("/reservations/pending/claim", params={"limit": limit}, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            return [reservation["id"] for reservation in response.json()["reservations"]]
+        
+        self.assertEqual(claim(first_admin, 2), ids[:2])
+        self.assertEqual(claim(second_admin, 2), ids[2:])
+        # Pedir de novo renova as do próprio administrador, sem pegar as do outro
+        self.assertEqual(claim(first_admin, 5), ids[:2])
+        
+        # Outro administrador não analisa uma reserva pega enquanto o prazo vale
+        second_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': second_admin.email})}"}
+        response = self.client.post(f"/reservations/{ids[0]}/approve", headers=second_headers)
+        self.assertEqual(response.status_code, 409)
+        
+        # Com o prazo vencido, a reserva volta à fila
+        self.session.expire_all()
+        expired = self.session.get(Reservation, ids[0])
+        expired.claimed_until = datetime.now(timezone.utc) - timedelta(minutes=1)
+        self.session.add(expired)
+        self.session.commit()
+        
+        self.assertEqual(claim(second_admin, 5), [ids[0], ids[2]])
+        response = self.client.post(f"/reservations/{ids[0]}/approve", headers=second_headers)
+        self.assertEqual(response.status_code, 200)
+        
+        self.session.expire_all()
+        approved = self.session.get(Reservation, ids[0])
+        self.assertIsNone(approved.claimed_by)
+        self.assertEqual(approved.version, 2)
+    
+    def test_approval_rejects_conflicting_pending(self):
+        """Testa que aprovar reprova as pendentes que passam a conflitar, e só elas."""
+        import uuid
+        admin = self.create_test_user(Role.admin, f"admin_{uuid.uuid4().hex[:8]}@test.com")
+        lab = self.create_test_lab()
+        other_lab = self.create_test_lab()
+        first_computer = self.create_test_computer(lab.id)
+        second_computer = self.create_test_computer(lab.id)
+        start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        
+        def pending(laboratory, offset_hours, computer=None):
+            reservation = Reservation(
+                user_id=self.create_test_user(Role.professor).id,
+                laboratory_id=laboratory.id,
+                computer_id=computer.id if computer else None,
+                reservation_type=ReservationType.computer if computer else ReservationType.room,
+                start_time=start + timedelta(hours=offset_hours),
+                end_time=start + timedelta(hours=offset_hours + 2),
+                title="Pendente"
+            )
+            self.session.add(reservation)
+            self.session.commit()
+            return reservation.id
+        
+        approved_id = pending(lab, 0, first_computer)
+        same_computer = pending(lab, 1, first_computer)
+        room = pending(lab, -1)
+        other_computer = pending(lab, 0, second_computer)
+        later = pending(lab, 2, first_computer)
+        elsewhere = pending(other_lab, 0)
+        
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': admin.email})}"}
+        response = self.client.post(f"/reservations/{approved_id}/approve", headers=headers)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Rejected-Reservations"], f"{same_computer},{room}")
+        
+        self.session.expire_all()
+        statuses = {
+            reservation_id: self.session.get(Reservation, reservation_id).status
+            for reservation_id in (same_computer, room, other_computer, later, elsewhere)
+        }
+        self.assertEqual(statuses, {
+            same_computer: ReservationStatus.rejected,
+            room: ReservationStatus.rejected,
+            other_computer: ReservationStatus.pending,
+            later: ReservationStatus.pending,
+            elsewhere: ReservationStatus.pending,
+        })
+        rejected = self.session.get(Reservation, room)
+        self.assertIn(str(approved_id), rejected.rejection_reason)
+        self.assertEqual(rejected.reviewed_by, admin.id)
+        self.assertEqual(rejected.version, 2)
+        
+        # As reprovações automáticas entram nos agregados diários
+        stats = self.session.exec(
+            select(ReservationDailyStats).where(ReservationDailyStats.laboratory_id == lab.id)
+        ).all()
+        self.assertEqual(sum(row.rejected_count for row in stats), 2)
+        self.assertEqual(sum(row.approved_count for row in stats), 1)
+    
+    def test_approval_locks_conflicting_rows_in_order(self):
+        """Testa que a aprovação trava a reserva e as pendentes conflitantes em ordem de id."""
+        from unittest.mock import MagicMock
+        from sqlalchemy.dialects import postgresql
+        from routers.reservations import lock_for_approval
+        
+        reservation = self.create_future_reservation(self.create_test_user(Role.professor), self.create_test_lab())
+        session = MagicMock()
+        lock_for_approval(session, reservation)
+        
+        sql = str(session.exec.call_args[0][0].compile(dialect=postgresql.dialect()))
+        self.assertIn("ORDER BY reservation.id", sql)
+        self.assertTrue(sql.endswith("FOR UPDATE"))
+    
+    def test_pending_conflicts_endpoint(self):
+        """Testa o grafo de conflitos da fila para um dia."""
+        import uuid
+        admin = self.create_test_user(Role.admin, f"admin_{uuid.uuid4().hex[:8]}@test.com")
+        lab = self.create_test_lab()
+        day = (datetime.now(timezone.utc) + timedelta(days=2)).date()
+        start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=8)
+        
+        def add(offset_hours, status=ReservationStatus.pending):
+            reservation = Reservation(
+                user_id=self.create_test_user(Role.professor).id,
+                laboratory_id=lab.id,
+                reservation_type=ReservationType.room,
+                start_time=start + timedelta(hours=offset_hours),
+                end_time=start + timedelta(hours=offset_hours + 2),
+                title="Aula",
+                status=status
+            )
+            self.session.add(reservation)
+            self.session.commit()
+            return reservation.id
+        
+        first, second, third = add(0), add(1), add(2)
+        alone = add(5)
+        approved, blocked = add(8, ReservationStatus.approved), add(9)
+        
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': admin.email})}"}
+        response = self.client.get(
+            "/reservations/pending/conflicts", params={"day": day.isoformat()}, headers=headers
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["conflict_free_ids"], [alone])
+        queue, approved_component = data["components"]
+        self.assertEqual(queue["reservation_ids"], [first, second, third])
+        self.assertEqual(queue["conflicts"], [[first, second], [second, third]])
+        self.assertEqual(queue["suggested_ids"], [first, third])
+        self.assertEqual(approved_component["blocked_ids"], [blocked])
+        self.assertEqual(approved_component["suggested_ids"], [])
+        self.assertEqual({node["id"] for node in data["reservations"]}, {first, second, third, approved, blocked})
+        
+        # Apenas administradores
+        professor_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': self.create_test_user().email})}"}
+        response = self.client.get("/reservations/pending/conflicts", headers=professor_headers)
+        self.assertEqual(response.status_code, 403)
+
+
+class TestConflictGraph(unittest.TestCase):
+    """Testes para a varredura que monta o grafo de conflitos."""
+    
+    def reservation(self, id, start, end, status=ReservationStatus.pending, computer_id=None, laboratory_id=1):
+        """Helper: Reserva com horários em horas a partir de uma data fixa."""
+        base = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        return SimpleNamespace(
+            id=id,
+            laboratory_id=laboratory_id,
+            computer_id=computer_id,
+            reservation_type=ReservationType.computer if computer_id else ReservationType.room,
+            status=status,
+            start_time=base + timedelta(hours=start),
+            end_time=base + timedelta(hours=end)
+        )
+    
+    def test_edges_follow_room_and_computer_rules(self):
+        """Testa que computadores diferentes não conflitam, mas a sala conflita com todos."""
+        reservations = [
+            self.reservation(1, 0, 2, computer_id=10),
+            self.reservation(2, 1, 3, computer_id=11),
+            self.reservation(3, 1, 2, computer_id=10),
+            self.reservation(4, 2, 4),
+            self.reservation(5, 0, 4, laboratory_id=2),
+        ]
+        
+        self.assertEqual(sorted(conflict_edges(reservations)), [(1, 3), (2, 4)])
+    
+    def test_edges_match_pairwise_comparison(self):
+        """Testa a varredura contra a comparação de todos os pares."""
+        import random
+        generator = random.Random(42)
+        reservations = []
+        for id in range(1, 200):
+            start = generator.randint(0, 100)
+            computer_id = generator.choice([None, 1, 2, 3])
+            reservations.append(self.reservation(id, start, start + generator.randint(1, 6), computer_id=computer_id))
+        
+        expected = {
+            (first.id, second.id)
+            for first in reservations for second in reservations
+            if first.id < second.id
+            and first.start_time < second.end_time and second.start_time < first.end_time
+            and (first.computer_id is None or second.computer_id is None or first.computer_id == second.computer_id)
+        }
+        self.assertEqual(set(conflict_edges(reservations)), expected)
+    
+    def test_components_and_suggestions(self):
+        """Testa componentes, bloqueios por aprovadas e a sugestão gulosa."""
+        components, conflict_free_ids = conflict_graph([
+            self.reservation(1, 0, 10),
+            self.reservation(2, 1, 2),
+            self.reservation(3, 3, 4),
+            self.reservation(4, 20, 22, status=ReservationStatus.approved),
+            self.reservation(5, 21, 23),
+            self.reservation(6, 30, 31),
+            self.reservation(7, 40, 42, status=ReservationStatus.approved),
+            self.reservation(8, 41, 43, status=ReservationStatus.approved),
+        ])
+        
+        self.assertEqual(conflict_free_ids, [6])
+        self.assertEqual(len(components), 2)
+        self.assertEqual(components[0]["reservation_ids"], [1, 2, 3])
+        self.assertEqual(components[0]["suggested_ids"], [2, 3])
+        self.assertEqual(components[1]["blocked_ids"], [5])
+        self.assertEqual(components[1]["suggested_ids"], [])
 
 
 class TestLaboratoryModel(unittest.TestCase):
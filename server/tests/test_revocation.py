@@ -0,0 +1,155 @@
+"""
+Testes para a revogação de tokens de acesso.
+"""
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+import sys
+import os
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database import get_session
+from models import User, Role
+from utils import revocation
+from utils.jwt import create_access_token
+from utils.revocation import BloomFilter, reload_revocations, revocation_filter
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Testes para o filtro de Bloom."""
+
+    def test_no_false_negatives(self):
+        """Testa que toda chave adicionada é encontrada."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positive_rate(self):
+        """Testa que a taxa de falsos positivos fica perto da configurada."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        false_positives = sum(f"outro-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestTokenRevocation(unittest.TestCase):
+    """Testes para o logout, a desativação e a consulta ao filtro."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Configuração executada uma vez antes de todos os testes."""
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(cls.engine)
+
+    def setUp(self):
+        """Configuração executada antes de cada teste."""
+        self.session = Session(self.engine)
+
+        def get_session_override():
+            return self.session
+
+        app.dependency_overrides[get_session] = get_session_override
+        self.client = TestClient(app)
+
+        self.professor = User(
+            email="prof@test.com",
+            hashed_password="hashed_password",
+            role=Role.professor,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.aluno = User(
+            email="aluno@test.com",
+            hashed_password="hashed_password",
+            role=Role.aluno,
+            project_name="Projeto",
+            is_active=True
+        )
+        self.session.add_all([self.professor, self.aluno])
+        self.session.commit()
+        self.session.refresh(self.professor)
+        self.session.refresh(self.aluno)
+
+        reload_revocations(self.engine)
+
+    def tearDown(self):
+        """Limpeza executada após cada teste."""
+        self.session.close()
+        app.dependency_overrides.clear()
+        SQLModel.metadata.drop_all(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+
+    def headers(self, email):
+        """Helper: Header com um token novo para o usuário."""
+        return {"Authorization": f"Bearer {create_access_token(data={'sub': email})}"}
+
+    def me(self, headers):
+        """Helper: Status de /auth/me."""
+        return self.client.get("/auth/me", headers=headers).status_code
+
+    def test_logout_revokes_access_token(self):
+        """Testa que o token usado no logout deixa de valer e os outros continuam."""
+        headers = self.headers("prof@test.com")
+        other_headers = self.headers("prof@test.com")
+
+        self.assertEqual(self.client.post("/auth/logout", headers=headers).status_code, 200)
+
+        self.assertEqual(self.me(headers), 401)
+        self.assertEqual(self.me(other_headers), 200)
+
+    def test_revocation_survives_reload(self):
+        """Testa que a reconstrução do filtro a partir da tabela mantém a revogação."""
+        headers = self.headers("prof@test.com")
+        self.client.post("/auth/logout", headers=headers)
+
+        revocation_filter.reset()
+        self.assertEqual(self.me(headers), 401)
+
+        self.assertEqual(reload_revocations(self.engine), 1)
+        self.assertEqual(self.me(headers), 401)
+
+    def test_deactivate_revokes_existing_tokens(self):
+        """Testa que a desativação revoga os tokens já emitidos, mas não os futuros."""
+        aluno_headers = self.headers("aluno@test.com")
+
+        response = self.client.patch(
+            f"/users/{self.aluno.id}/deactivate", headers=self.headers("prof@test.com")
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.me(aluno_headers), 401)
+
+        # Reativado, o usuário volta a entrar com tokens novos
+        self.aluno.is_active = True
+        self.session.add(self.aluno)
+        self.session.commit()
+        with patch("utils.jwt.datetime") as mocked_datetime:
+            mocked_datetime.now.return_value = datetime.now(timezone.utc) + timedelta(seconds=2)
+            new_headers = self.headers("aluno@test.com")
+        self.assertEqual(self.me(new_headers), 200)
+
+    def test_common_case_skips_database(self):
+        """Testa que tokens não revogados não consultam a tabela de revogações."""
+        headers = self.headers("prof@test.com")
+        self.assertEqual(self.me(headers), 200)
+
+        with patch.object(revocation, "select", side_effect=AssertionError("consulta inesperada")):
+            self.assertEqual(self.me(headers), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
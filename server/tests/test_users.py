@@ -111,6 +111,86 @@ class TestUsersRoutes(unittest.TestCase):
         response = self.client.get("/users/")
         self.assertEqual(response.status_code, 401)
     
+    def test_list_users_with_fields(self):
+        """Testa listar usuários retornando apenas alguns campos."""
+        response = self.client.get(
+            "/users/",
+            params={"fields": "email,role"},
+            headers=self.professor_headers
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertGreaterEqual(len(data), 2)
+        self.assertEqual(set(data[0]), {"id", "email", "role"})
+    
+    def test_list_users_with_invalid_fields(self):
+        """Testa que campos fora do schema de resposta são rejeitados."""
+        response = self.client.get(
+            "/users/",
+            params={"fields": "email,hashed_password"},
+            headers=self.professor_headers
+        )
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hashed_password", response.json()["detail"])
+    
+    def test_list_users_filters(self):
+        """Testa a busca por prefixo do e-mail e os filtros."""
+        self.session.add_all([
+            User(email="ana@test.com", hashed_password="x" * 8, role=Role.aluno,
+                 project_name="Outro", is_active=False),
+            User(email="a_b@test.com", hashed_password="x" * 8, role=Role.aluno,
+                 project_name="Outro", is_active=True),
+        ])
+        self.session.commit()
+        
+        def emails(**params):
+            response = self.client.get("/users/", params=params, headers=self.professor_headers)
+            self.assertEqual(response.status_code, 200)
+            return [user["email"] for user in response.json()]
+        
+        self.assertEqual(emails(q="a"), ["a_b@test.com", "aluno@test.com", "ana@test.com"])
+        # "_" é literal, não curinga do LIKE
+        self.assertEqual(emails(q="a_"), ["a_b@test.com"])
+        self.assertEqual(emails(role="professor"), ["professor@test.com"])
+        self.assertEqual(emails(project_name="Outro", is_active=True), ["a_b@test.com"])
+        self.assertEqual(emails(is_active=False), ["ana@test.com"])
+        
+        response = self.client.get("/users/", params={"role": "diretor"}, headers=self.professor_headers)
+        self.assertEqual(response.status_code, 400)
+    
+    def test_list_users_keyset_pagination(self):
+        """Testa a paginação por cursor em ordem de e-mail."""
+        self.session.add_all([
+            User(email=f"user{i:02d}@test.com", hashed_password="x" * 8, role=Role.aluno,
+                 project_name="Projeto Teste", is_active=True)
+            for i in range(5)
+        ])
+        self.session.commit()
+        
+        collected = []
+        params = {"limit": 3, "fields": "id"}
+        while True:
+            response = self.client.get("/users/", params=params, headers=self.professor_headers)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page), 3)
+            self.assertEqual(set(page[0]), {"id"})
+            collected.extend(user["id"] for user in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            params["cursor"] = cursor
+        
+        expected = [
+            user.id for user in self.session.exec(select(User).order_by(User.email)).all()
+        ]
+        self.assertEqual(collected, expected)
+        
+        response = self.client.get("/users/", params={"cursor": "%%%"}, headers=self.professor_headers)
+        self.assertEqual(response.status_code, 400)
+    
     # ========== Testes para GET /users/{user_id} ==========
     
     def test_read_user_by_id_as_owner(self):
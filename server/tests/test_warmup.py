@@ -0,0 +1,56 @@
+"""
+Testes para o aquecimento e a inicialização adiada.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+# Adiciona o diretório server ao path para imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.warmup import deferred_startup, warm_pool
+
+
+class TestWarmup(unittest.TestCase):
+    """Testes para utils/warmup.py."""
+
+    def test_warm_pool(self):
+        """Testa que as conexões abertas ficam disponíveis no pool."""
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(
+                f"sqlite:///{os.path.join(directory, 'warmup.db')}",
+                poolclass=QueuePool,
+                pool_size=3,
+            )
+
+            self.assertEqual(warm_pool(engine, connections=5), 3)
+            self.assertEqual(engine.pool.checkedin(), 3)
+            self.assertEqual(engine.pool.checkedout(), 0)
+            engine.dispose()
+
+    def test_deferred_startup(self):
+        """Testa que as verificações adiadas rodam e o OpenAPI fica pronto."""
+        app = FastAPI()
+        calls = []
+
+        def failing_check():
+            calls.append("failing")
+            raise RuntimeError("banco indisponível")
+
+        def check():
+            calls.append("check")
+
+        asyncio.run(deferred_startup(app, failing_check, check))
+
+        self.assertEqual(calls, ["failing", "check"])
+        self.assertIsNotNone(app.openapi_schema)
+
+
+if __name__ == '__main__':
+    unittest.main()
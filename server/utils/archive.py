@@ -0,0 +1,162 @@
+"""
+Arquivamento de reservas antigas.
+
+Reservas encerradas há mais de ARCHIVE_AFTER_DAYS dias são movidas, em lotes,
+da tabela `reservation` para `reservation_archive`. Assim as consultas do dia a
+dia (listagens e verificação de conflitos) só percorrem reservas recentes.
+Execute manualmente: python -m utils.archive
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, insert, literal
+from sqlmodel import Session, select
+
+from models import Reservation, ReservationArchive
+from utils.locks import scheduled_run
+
+load_dotenv()
+
+# Configurações de arquivamento
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+# Colunas copiadas da reserva original (archived_at é preenchida no arquivamento)
+ARCHIVED_COLUMNS = [
+    column.name for column in ReservationArchive.__table__.columns
+    if column.name != "archived_at"
+]
+
+
+def get_archive_cutoff(now: datetime | None = None) -> datetime:
+    """
+    Retorna o instante limite: reservas que terminaram antes dele ficam no arquivo.
+
+    Args:
+        now: Instante de referência (padrão: agora, em UTC)
+
+    Returns:
+        Data/hora de corte do arquivamento
+    """
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=ARCHIVE_AFTER_DAYS)
+
+
+def needs_archive(start_date: datetime | None) -> bool:
+    """
+    Indica se um período que começa em `start_date` alcança reservas arquivadas.
+    Sem data inicial o período é aberto e cobre todo o histórico.
+    """
+    if start_date is None:
+        return True
+
+    if start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+
+    return start_date < get_archive_cutoff()
+
+
+def archive_batch(session: Session, cutoff: datetime, batch_size: int) -> int:
+    """
+    Move um lote de reservas encerradas antes de `cutoff` para o arquivo.
+
+    A cópia e a remoção acontecem na mesma transação, de modo que uma reserva
+    nunca aparece nas duas tabelas ao mesmo tempo.
+
+    Returns:
+        Quantidade de reservas arquivadas no lote
+    """
+    statement = (
+        select(Reservation.id)
+        .where(Reservation.end_time < cutoff)
+        .order_by(Reservation.id)
+        .limit(batch_size)
+    )
+    ids = list(session.exec(statement).all())
+
+    if not ids:
+        return 0
+
+    source_columns = [getattr(Reservation, name) for name in ARCHIVED_COLUMNS]
+    archived_at = literal(datetime.now(timezone.utc), ReservationArchive.__table__.c.archived_at.type)
+
+    session.execute(
+        insert(ReservationArchive).from_select(
+            [*ARCHIVED_COLUMNS, "archived_at"],
+            select(*source_columns, archived_at).where(Reservation.id.in_(ids))
+        )
+    )
+    session.execute(delete(Reservation).where(Reservation.id.in_(ids)))
+    session.commit()
+
+    return len(ids)
+
+
+def archive_expired_reservations(
+    session: Session,
+    batch_size: int | None = None,
+    max_batches: int | None = None
+) -> int:
+    """
+    Arquiva, em lotes, todas as reservas que passaram do horizonte configurado.
+
+    Args:
+        session: Sessão do banco de dados
+        batch_size: Reservas por lote (padrão: ARCHIVE_BATCH_SIZE)
+        max_batches: Limite de lotes nesta execução (padrão: sem limite)
+
+    Returns:
+        Total de reservas arquivadas
+    """
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    cutoff = get_archive_cutoff()
+    total = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(session, cutoff, batch_size)
+        total += moved
+        batches += 1
+        if moved < batch_size:
+            break
+
+    return total
+
+
+def run_archive_cycle(engine, force: bool = False) -> int:
+    """
+    Executa um ciclo completo de arquivamento com uma sessão própria.
+    Só um processo arquiva por vez, e no máximo uma vez por intervalo;
+    os demais (ou um worker recém-reciclado) pulam o ciclo. `force` ignora
+    o intervalo (execução manual).
+    """
+    interval = 0 if force else ARCHIVE_INTERVAL_SECONDS
+    with scheduled_run(engine, "archive", interval) as due:
+        if not due:
+            return 0
+        with Session(engine) as session:
+            return archive_expired_reservations(session)
+
+
+async def archive_loop(engine) -> None:
+    """
+    Tarefa de fundo que arquiva reservas periodicamente.
+    Cada ciclo roda em uma thread para não bloquear o event loop.
+    """
+    while True:
+        try:
+            archived = await asyncio.to_thread(run_archive_cycle, engine)
+            if archived:
+                print(f"✓ {archived} reservas arquivadas")
+        except Exception as e:
+            print(f"⚠️  Falha no arquivamento de reservas: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    print(f"✓ {run_archive_cycle(engine, force=True)} reservas arquivadas")
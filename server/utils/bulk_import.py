@@ -0,0 +1,125 @@
+"""
+Leitura em streaming de arquivos CSV/NDJSON para as rotas de importação em lote.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+from fastapi import HTTPException, UploadFile, status
+from pydantic import BaseModel, ValidationError
+
+from schemas import ImportReport, ImportRowError
+
+# Linhas validadas e gravadas por vez (uma consulta IN por lote)
+IMPORT_BATCH_SIZE = 500
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+INVALID_ENCODING_DETAIL = (
+    "O arquivo deve estar codificado em UTF-8. "
+    "Ao exportar da planilha, escolha o formato \"CSV UTF-8\""
+)
+
+T = TypeVar("T")
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def resolve_format(upload: UploadFile, file_format: str | None) -> str:
+    """Determina o formato pelo parâmetro explícito ou pela extensão do arquivo."""
+    if file_format is None:
+        filename = (upload.filename or "").lower()
+        file_format = "ndjson" if filename.endswith((".ndjson", ".jsonl")) else "csv"
+
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato inválido. Use: csv, ndjson"
+        )
+
+    return file_format
+
+
+def iter_lines(upload: UploadFile) -> Iterator[str]:
+    """
+    Decodifica o arquivo como UTF-8 (com ou sem BOM), linha a linha.
+
+    Planilhas exportadas em pt-BR costumam sair em Latin-1/CP1252; nesse caso
+    a importação inteira é recusada com 400, antes do commit das rotas.
+    """
+    try:
+        yield from codecs.iterdecode(upload.file, "utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=INVALID_ENCODING_DETAIL
+        )
+
+
+def iter_records(upload: UploadFile, file_format: str) -> Iterator[tuple[int, dict | str]]:
+    """
+    Lê o arquivo linha a linha, sem carregá-lo inteiro em memória.
+
+    Yields:
+        Tuplas (número da linha, registro). Quando a linha não pode ser
+        interpretada, o registro é a mensagem de erro.
+    """
+    lines = iter_lines(upload)
+
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # Campos vazios no CSV equivalem a valores ausentes
+            yield reader.line_num, {
+                key.strip(): (value.strip() or None) if isinstance(value, str) else value
+                for key, value in record.items()
+                if key
+            }
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f"JSON inválido: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, "Cada linha deve conter um objeto JSON"
+            continue
+        yield line_number, record
+
+
+def iter_batches(items: Iterable[T], size: int = IMPORT_BATCH_SIZE) -> Iterator[list[T]]:
+    """Agrupa um iterável em listas de até `size` itens."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def validate_batch(
+    batch: list[tuple[int, dict | str]],
+    schema: type[SchemaT],
+    report: ImportReport
+) -> list[tuple[int, SchemaT]]:
+    """
+    Valida um lote de registros com o schema de criação correspondente.
+    Registros inválidos entram no relatório e são descartados.
+    """
+    valid = []
+    for row, record in batch:
+        report.total_rows += 1
+        if isinstance(record, str):
+            report.errors.append(ImportRowError(row=row, error=record))
+            continue
+        try:
+            valid.append((row, schema.model_validate(record)))
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            report.errors.append(ImportRowError(row=row, error=message))
+    return valid
@@ -0,0 +1,211 @@
+"""
+Cache em memória por worker com invalidação entre workers.
+
+Cada worker mantém seu próprio cache (catálogo de laboratórios e computadores,
+usuários autenticados, acessos). As rotas que alteram esses dados publicam uma
+mensagem curta de invalidação ("namespace" ou "namespace:chave"):
+- no próprio worker a entrada é removida quando a transação é confirmada;
+- no PostgreSQL a mensagem também é enviada com NOTIFY na mesma transação, e o
+  listener de cada worker (LISTEN) remove as entradas correspondentes;
+- em outros bancos (SQLite, testes) só há a invalidação local.
+O TTL limita o tempo de vida de uma entrada caso alguma mensagem se perca.
+
+Cada namespace tem um contador de geração, incrementado a cada invalidação.
+Quem preenche o cache após uma consulta informa a geração lida antes dela: se
+uma invalidação chegou durante a consulta, o resultado (possivelmente anterior
+à escrita) não é armazenado.
+"""
+import asyncio
+import os
+import select as io_select
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_CHANNEL = "cache_invalidation"
+# Tempo máximo de espera por notificações em cada ciclo do listener
+CACHE_LISTEN_TIMEOUT_SECONDS = 5
+
+# Namespaces
+LABORATORIES = "laboratories"
+COMPUTERS = "computers"
+USERS = "users"
+ACCESS = "access"
+
+# Mensagens publicadas na sessão e aplicadas localmente após o commit
+PENDING_INVALIDATIONS = "cache_invalidations"
+
+
+class LocalCache:
+    """Cache do processo, organizado em namespaces, com expiração por TTL."""
+
+    def __init__(self, ttl: int = CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.entries: dict[str, dict[str, tuple[float, object]]] = {}
+        self.generations: dict[str, int] = {}
+        self.subscribers: dict[str, list] = {}
+        self.lock = threading.Lock()
+
+    def generation(self, namespace: str) -> int:
+        """Geração atual do namespace; deve ser lida antes da consulta ao banco."""
+        with self.lock:
+            return self.generations.setdefault(namespace, 0)
+
+    def get(self, namespace: str, key) -> object | None:
+        """Retorna o valor em cache ou None se ausente ou expirado."""
+        with self.lock:
+            entry = self.entries.get(namespace, {}).get(str(key))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, namespace: str, key, value, generation: int | None = None) -> None:
+        """
+        Armazena um valor até o TTL expirar ou uma invalidação chegar.
+        Com `generation`, o valor é descartado se o namespace foi invalidado
+        depois que essa geração foi lida.
+        """
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            if generation is not None and self.generations.get(namespace, 0) != generation:
+                return
+            self.entries.setdefault(namespace, {})[str(key)] = (time.monotonic() + self.ttl, value)
+
+    def evict(self, namespace: str, key=None) -> None:
+        """Remove uma entrada ou, sem chave, o namespace inteiro."""
+        with self.lock:
+            self.generations[namespace] = self.generations.get(namespace, 0) + 1
+            if key is None:
+                self.entries.pop(namespace, None)
+            else:
+                self.entries.get(namespace, {}).pop(str(key), None)
+
+    def subscribe(self, namespace: str, callback) -> None:
+        """Registra uma função chamada com a chave de cada mensagem do namespace."""
+        self.subscribers.setdefault(namespace, []).append(callback)
+
+    def apply(self, message: str) -> None:
+        """Aplica uma mensagem de invalidação ("namespace" ou "namespace:chave")."""
+        namespace, _, key = message.partition(":")
+        self.evict(namespace, key or None)
+        for callback in self.subscribers.get(namespace, ()):
+            callback(key or None)
+
+    def clear(self) -> None:
+        """Esvazia o cache."""
+        with self.lock:
+            self.entries.clear()
+            for namespace in self.generations:
+                self.generations[namespace] += 1
+
+
+cache = LocalCache()
+
+
+def encode_message(namespace: str, key=None) -> str:
+    """Monta a mensagem de invalidação."""
+    return namespace if key is None else f"{namespace}:{key}"
+
+
+def publish_invalidation(session: Session, namespace: str, key=None) -> None:
+    """
+    Publica a invalidação de uma entrada (ou de um namespace inteiro).
+    Deve ser chamada antes do commit: a mensagem só é entregue se a transação
+    for confirmada, tanto localmente quanto via NOTIFY.
+    """
+    message = encode_message(namespace, key)
+    session.info.setdefault(PENDING_INVALIDATIONS, set()).add(message)
+
+    bind = session.get_bind()
+    if bind.dialect.name == "postgresql":
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CACHE_CHANNEL, "payload": message}
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def apply_pending_invalidations(session: Session) -> None:
+    """Invalida o cache local assim que a transação é confirmada."""
+    for message in session.info.pop(PENDING_INVALIDATIONS, ()):
+        cache.apply(message)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_pending_invalidations(session: Session) -> None:
+    """Descarta as invalidações de uma transação desfeita."""
+    session.info.pop(PENDING_INVALIDATIONS, None)
+
+
+class InvalidationListener:
+    """Conexão dedicada que escuta o canal de invalidação (LISTEN)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.connection = None
+
+    def connect(self) -> None:
+        connection = self.engine.raw_connection()
+        # Conexão exclusiva do listener, fora do pool
+        connection.detach()
+        dbapi_connection = connection.driver_connection
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"LISTEN {CACHE_CHANNEL}")
+        cursor.close()
+        self.connection = connection
+        # Mensagens podem ter sido perdidas enquanto estava desconectado
+        cache.clear()
+
+    def poll(self, timeout: float = CACHE_LISTEN_TIMEOUT_SECONDS) -> int:
+        """Aguarda notificações por até `timeout` segundos e as aplica."""
+        if self.connection is None:
+            self.connect()
+
+        dbapi_connection = self.connection.driver_connection
+        readable, _, _ = io_select.select([dbapi_connection], [], [], timeout)
+        if not readable:
+            return 0
+
+        dbapi_connection.poll()
+        applied = 0
+        while dbapi_connection.notifies:
+            notify = dbapi_connection.notifies.pop(0)
+            cache.apply(notify.payload)
+            applied += 1
+        return applied
+
+    def close(self) -> None:
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            finally:
+                self.connection = None
+
+
+async def invalidation_loop(engine) -> None:
+    """
+    Tarefa de fundo que aplica as invalidações publicadas por outros workers.
+    Só é necessária no PostgreSQL; nos demais bancos a invalidação é local.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    listener = InvalidationListener(engine)
+    try:
+        while True:
+            try:
+                await asyncio.to_thread(listener.poll)
+            except Exception as e:
+                print(f"⚠️  Falha no listener de invalidação de cache: {e}")
+                listener.close()
+                await asyncio.sleep(CACHE_LISTEN_TIMEOUT_SECONDS)
+    finally:
+        listener.close()
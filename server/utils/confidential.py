@@ -0,0 +1,47 @@
+"""
+Regras de visibilidade de reservas confidenciais.
+
+A ocultação é feita no próprio SELECT, com uma expressão CASE por coluna
+sensível, em vez de alterar objetos do ORM depois da consulta.
+"""
+from sqlalchemy import and_, case, literal, null
+
+from models import Role, User
+from schemas import ReservationResponse
+
+# Título exibido no lugar do original para quem não pode ver a reserva
+CONFIDENTIAL_TITLE = "[Reserva Confidencial]"
+
+# Colunas sensíveis e o valor exibido quando estão ocultas
+REDACTED_FIELDS = {
+    "title": CONFIDENTIAL_TITLE,
+    "description": None,
+}
+
+
+def redacted_column(model, name: str, user: User):
+    """
+    Retorna a coluna `name` de `model` já com a regra de ocultação aplicada.
+
+    Para administradores, ou colunas que não são sensíveis, é a própria coluna.
+    Nos demais casos é um CASE que troca o valor quando a reserva é
+    confidencial e pertence a outro usuário.
+    """
+    column = getattr(model, name)
+    if name not in REDACTED_FIELDS or user.role == Role.admin:
+        return column
+
+    hidden = and_(model.is_confidential == True, model.user_id != user.id)
+    replacement = REDACTED_FIELDS[name]
+    replacement = null() if replacement is None else literal(replacement)
+
+    return case((hidden, replacement), else_=column).label(name)
+
+
+def reservation_columns(model, user: User, names: list[str] | None = None) -> list:
+    """
+    Colunas de `ReservationResponse` para `model` (ativa ou arquivada), com ocultação.
+    `names` restringe o resultado a um subconjunto dos campos.
+    """
+    names = names or list(ReservationResponse.model_fields)
+    return [redacted_column(model, name, user) for name in names]
@@ -0,0 +1,127 @@
+"""
+Grafo de conflitos entre reservas pendentes e aprovadas.
+
+As reservas de cada laboratório são percorridas em ordem de início (varredura).
+Um heap guarda as que ainda estão em andamento, pelo horário de término, e
+cada nova reserva só é comparada com as ativas que podem conflitar com ela:
+todas, se for de sala; as de sala e as do mesmo computador, se for de
+computador (as mesmas regras de `check_time_conflicts`). O custo é
+O(n log n) mais o número de conflitos, sem comparar todos os pares.
+"""
+import heapq
+from collections import defaultdict
+
+from models import ReservationStatus, ReservationType
+
+
+def conflict_edges(reservations) -> list[tuple[int, int]]:
+    """
+    Pares de reservas conflitantes (id menor, id maior).
+
+    `reservations` são objetos com id, laboratory_id, computer_id,
+    reservation_type, start_time e end_time.
+    """
+    by_laboratory = defaultdict(list)
+    for reservation in reservations:
+        by_laboratory[reservation.laboratory_id].append(reservation)
+
+    edges = []
+    for laboratory_reservations in by_laboratory.values():
+        laboratory_reservations.sort(key=lambda reservation: (reservation.start_time, reservation.id))
+
+        # Reservas em andamento, por computador (None para as de sala)
+        active: dict[int | None, set[int]] = defaultdict(set)
+        ending = []
+
+        for reservation in laboratory_reservations:
+            while ending and ending[0][0] <= reservation.start_time:
+                _, ended_id, key = heapq.heappop(ending)
+                active[key].discard(ended_id)
+                if not active[key]:
+                    del active[key]
+
+            if reservation.reservation_type == ReservationType.room:
+                key = None
+                overlapping = [other for ids in active.values() for other in ids]
+            else:
+                key = reservation.computer_id
+                overlapping = [*active.get(None, ()), *active.get(key, ())]
+
+            edges.extend(
+                (min(other, reservation.id), max(other, reservation.id)) for other in overlapping
+            )
+
+            active[key].add(reservation.id)
+            heapq.heappush(ending, (reservation.end_time, reservation.id, key))
+
+    return edges
+
+
+def conflict_graph(reservations) -> tuple[list[dict], list[int]]:
+    """
+    Agrupa as reservas pendentes em componentes conexos do grafo de conflitos.
+
+    Conflitos entre duas reservas aprovadas são ignorados. Em cada componente,
+    as pendentes que conflitam com uma aprovada são bloqueadas; entre as
+    demais, a sugestão é um conjunto maximal sem conflitos, escolhido de forma
+    gulosa pelo término mais cedo (ótimo quando todas disputam o mesmo recurso).
+
+    Returns:
+        Tupla (componentes, IDs das pendentes sem nenhum conflito)
+    """
+    by_id = {reservation.id: reservation for reservation in reservations}
+    pending = {
+        reservation.id for reservation in reservations
+        if reservation.status == ReservationStatus.pending
+    }
+
+    neighbors: dict[int, set[int]] = defaultdict(set)
+    for first, second in conflict_edges(reservations):
+        if first in pending or second in pending:
+            neighbors[first].add(second)
+            neighbors[second].add(first)
+
+    components = []
+    visited = set()
+    for start in sorted(neighbors):
+        if start in visited:
+            continue
+
+        # Busca em profundidade pelo componente
+        visited.add(start)
+        stack = [start]
+        members = []
+        while stack:
+            current = stack.pop()
+            members.append(current)
+            for neighbor in neighbors[current]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        members.sort()
+
+        blocked = {
+            member for member in members
+            if member in pending and any(neighbor not in pending for neighbor in neighbors[member])
+        }
+        candidates = sorted(
+            (member for member in members if member in pending and member not in blocked),
+            key=lambda member: (by_id[member].end_time, by_id[member].start_time, member)
+        )
+        suggested = []
+        for candidate in candidates:
+            if not neighbors[candidate].intersection(suggested):
+                suggested.append(candidate)
+
+        components.append({
+            "laboratory_id": by_id[start].laboratory_id,
+            "reservation_ids": members,
+            "conflicts": sorted(
+                (member, neighbor) for member in members for neighbor in neighbors[member] if member < neighbor
+            ),
+            "suggested_ids": sorted(suggested),
+            "blocked_ids": sorted(blocked),
+        })
+
+    conflict_free_ids = sorted(pending - visited)
+    return components, conflict_free_ids
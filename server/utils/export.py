@@ -0,0 +1,137 @@
+"""
+Exportação de reservas em CSV e Parquet com memória constante.
+
+As linhas chegam em blocos de um cursor no servidor e cada bloco é convertido
+e enviado antes do próximo ser lido. No Parquet, cada bloco vira um row group.
+O pyarrow só é importado quando uma exportação Parquet é pedida.
+"""
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Iterable, Iterator
+
+from sqlalchemy import Boolean, DateTime, Integer, TypeDecorator
+
+from models import Reservation, ReservationArchive
+
+# Linhas lidas do cursor e convertidas por vez
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Colunas comuns às reservas ativas e arquivadas (a fila de análise não é exportada)
+EXPORT_COLUMNS = [
+    column.name for column in Reservation.__table__.columns
+    if column.name in ReservationArchive.__table__.columns
+]
+
+
+def export_value(value):
+    """Converte um valor do banco para sua representação exportada."""
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def csv_stream(chunks: Iterable[list], columns: list[str]) -> Iterator[str]:
+    """Gera o CSV bloco a bloco, começando pelo cabeçalho."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for rows in chunks:
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else export_value(value)
+                for value in row
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Cabeçalho ainda não enviado (nenhuma linha exportada)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class ChunkSink(io.RawIOBase):
+    """Destino de escrita que acumula bytes até serem drenados para a resposta."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def arrow_schema(columns: list[str]):
+    """Monta o schema Parquet a partir dos tipos das colunas da reserva."""
+    import pyarrow as pa
+
+    fields = []
+    for name in columns:
+        column_type = Reservation.__table__.c[name].type
+        # Tipos do SQLModel (UTCDateTime, AutoString) decoram um tipo base
+        if isinstance(column_type, TypeDecorator):
+            column_type = column_type.impl_instance
+        if isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+
+    return pa.schema(fields)
+
+
+def parquet_stream(chunks: Iterable[list], columns: list[str]) -> Iterator[bytes]:
+    """Gera o arquivo Parquet com um row group por bloco de linhas."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(columns)
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    try:
+        for rows in chunks:
+            arrays = [
+                pa.array([export_value(value) for value in values], type=field.type)
+                for values, field in zip(zip(*rows), schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    """Indica se o pyarrow está instalado."""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
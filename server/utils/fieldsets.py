@@ -0,0 +1,59 @@
+"""
+Seleção parcial de campos (`fields=`) nas rotas de listagem.
+
+Os campos pedidos reduzem tanto as colunas do SELECT quanto o JSON de resposta.
+Só são aceitos campos do schema de resposta da rota.
+"""
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+FIELDS_DESCRIPTION = "Campos a retornar, separados por vírgula (ex.: id,name). Padrão: todos"
+
+
+def select_fields(fields: str | None, schema: type[BaseModel]) -> list[str]:
+    """
+    Valida o parâmetro `fields` contra os campos do schema de resposta.
+
+    Args:
+        fields: Valor do parâmetro (ex.: "id,title,start_time") ou None
+        schema: Schema de resposta da rota, que define os campos permitidos
+
+    Returns:
+        Campos selecionados, na ordem do schema. O `id` é sempre incluído.
+
+    Raises:
+        HTTPException: Se algum campo não fizer parte do schema
+    """
+    allowed = list(schema.model_fields)
+    if fields is None:
+        return allowed
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos: {', '.join(sorted(unknown))}. Permitidos: {', '.join(allowed)}"
+        )
+
+    requested.add("id")
+    return [field for field in allowed if field in requested]
+
+
+def model_columns(model, names: list[str]) -> list:
+    """Colunas de `model` correspondentes aos campos selecionados."""
+    return [getattr(model, name) for name in names]
+
+
+def project_fields(rows: list[dict], names: list[str]) -> list[dict]:
+    """Recorta linhas já carregadas (ex.: do cache) para os campos selecionados."""
+    return [{name: row[name] for name in names} for row in rows]
+
+
+def sparse_response(rows) -> JSONResponse:
+    """Serializa linhas com apenas os campos selecionados, sem o schema completo."""
+    return JSONResponse(content=jsonable_encoder([
+        dict(row._mapping) if hasattr(row, "_mapping") else row for row in rows
+    ]))
@@ -0,0 +1,150 @@
+"""
+Cálculo vetorizado do mapa de calor semanal de ocupação (laboratório × hora da semana).
+
+A ocupação é calculada com resolução de minuto usando arrays de diferenças:
+cada reserva soma +1 no minuto de início e -1 no minuto de término, e a soma
+acumulada fornece quantas reservas estão ativas em cada minuto. Os horários são
+lidos do banco já como minutos desde a época (inteiros), e os arrays são montados
+direto do resultado: nenhum laço Python percorre as reservas.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, extract, func
+from sqlmodel import Session, select
+
+from models import ReservationStatus
+from utils.stats import to_utc_naive
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def epoch_minutes(column, dialect: str):
+    """Expressão SQL com os minutos desde a época (UTC) de uma coluna de data/hora."""
+    if dialect == "postgresql":
+        seconds = func.floor(extract("epoch", column))
+    else:
+        # SQLite grava o horário em UTC como texto; strftime('%s') devolve os segundos
+        seconds = func.strftime("%s", column)
+    return cast(seconds, BigInteger) // 60
+
+
+def fetch_reservation_minutes(
+    session: Session,
+    models: list,
+    range_start: datetime,
+    range_end: datetime,
+    laboratory_id: int | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lê as reservas aprovadas que tocam o intervalo, já em minutos desde a época.
+
+    Returns:
+        Arrays int64 (IDs dos laboratórios, inícios, términos)
+    """
+    dialect = session.get_bind().dialect.name
+    rows = []
+    for model in models:
+        statement = select(
+            model.laboratory_id,
+            epoch_minutes(model.start_time, dialect),
+            epoch_minutes(model.end_time, dialect)
+        ).where(
+            model.status == ReservationStatus.approved,
+            model.start_time < range_end,
+            model.end_time > range_start
+        )
+        if laboratory_id is not None:
+            statement = statement.where(model.laboratory_id == laboratory_id)
+        # Execução Core: só inteiros na resposta, sem a camada de carregamento do ORM
+        rows.extend(session.connection().execute(statement).all())
+
+    # fromiter consome os inteiros em sequência, sem o custo de np.array sobre objetos Row
+    columns = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=3 * len(rows)).reshape(-1, 3)
+    return columns[:, 0], columns[:, 1], columns[:, 2]
+
+
+def to_datetime64(values) -> np.ndarray:
+    """
+    Converte horários para datetime64 UTC em minutos.
+
+    Aceita arrays de minutos desde a época (como lidos por
+    `fetch_reservation_minutes`), arrays datetime64 ou sequências de datetimes.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iuM":
+        return values.astype("datetime64[m]")
+    # O NumPy não aceita mais datetimes com fuso: normaliza para UTC sem fuso
+    array = np.asarray([to_utc_naive(value) for value in values], dtype="datetime64[us]")
+    return array.astype("datetime64[m]")
+
+
+def weekly_occupancy(
+    laboratory_ids: np.ndarray,
+    start_times: np.ndarray,
+    end_times: np.ndarray,
+    from_date: date,
+    to_date: date
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula a fração de tempo ocupado de cada laboratório em cada hora da semana.
+
+    Args:
+        laboratory_ids: IDs dos laboratórios de cada reserva
+        start_times: Inícios das reservas (minutos desde a época ou datetime64, UTC)
+        end_times: Términos das reservas (minutos desde a época ou datetime64, UTC)
+        from_date: Primeiro dia do período
+        to_date: Último dia do período (inclusive)
+
+    Returns:
+        Tupla (IDs dos laboratórios, matriz labs × 7 × 24 com valores entre 0 e 1).
+        O dia 0 da semana é segunda-feira.
+    """
+    days = (to_date - from_date).days + 1
+    total_minutes = days * MINUTES_PER_DAY
+
+    labs, lab_index = np.unique(np.asarray(laboratory_ids, dtype=np.int64), return_inverse=True)
+    if labs.size == 0:
+        return labs, np.zeros((0, 7, 24))
+
+    # Minuto de início/término relativo ao começo do período, limitado ao período
+    origin = np.datetime64(from_date.isoformat(), "m")
+    starts = np.clip((to_datetime64(start_times) - origin).astype(np.int64), 0, total_minutes)
+    ends = np.clip((to_datetime64(end_times) - origin).astype(np.int64), 0, total_minutes)
+
+    valid = ends > starts
+    lab_index, starts, ends = lab_index[valid], starts[valid], ends[valid]
+
+    # Array de diferenças por laboratório + soma acumulada = reservas ativas por minuto
+    diff = np.zeros((labs.size, total_minutes + 1), dtype=np.int32)
+    np.add.at(diff, (lab_index, starts), 1)
+    np.add.at(diff, (lab_index, ends), -1)
+    occupied = np.cumsum(diff[:, :total_minutes], axis=1, dtype=np.int32) > 0
+
+    # Minutos ocupados por dia e hora: labs × dias × 24
+    hourly = occupied.reshape(labs.size, days, 24, 60).sum(axis=3)
+
+    # Agrupa os dias pelo dia da semana
+    weekdays = (from_date.weekday() + np.arange(days)) % 7
+    occupied_minutes = np.zeros((labs.size, 7, 24))
+    for weekday in range(7):
+        occupied_minutes[:, weekday, :] = hourly[:, weekdays == weekday, :].sum(axis=1)
+
+    # Normaliza pelo total de minutos disponíveis em cada hora da semana
+    available_minutes = np.bincount(weekdays, minlength=7)[None, :, None] * 60
+    occupancy = np.divide(
+        occupied_minutes,
+        available_minutes,
+        out=np.zeros_like(occupied_minutes),
+        where=available_minutes > 0
+    )
+
+    return labs, occupancy
+
+
+def period_bounds(from_date: date, to_date: date) -> tuple[datetime, datetime]:
+    """Retorna o intervalo [início, fim) em UTC correspondente aos dias do período."""
+    return (
+        datetime.combine(from_date, time.min, tzinfo=timezone.utc),
+        datetime.combine(to_date + timedelta(days=1), time.min, tzinfo=timezone.utc),
+    )
@@ -0,0 +1,112 @@
+"""
+Geração de feeds iCalendar (RFC 5545) e validação condicional por ETag.
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+PRODID = "-//Embedded Schedules//Reservas//PT-BR"
+
+# Reservas lidas do cursor do servidor por vez
+ICAL_FETCH_SIZE = 200
+
+
+def escape_text(value: str) -> str:
+    """Escapa caracteres especiais de campos de texto do iCalendar."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Quebra linhas com mais de 75 octetos, como exige a RFC 5545."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    current = ""
+    size = 0
+    limit = 75
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            parts.append(current)
+            current = ""
+            size = 0
+            limit = 74  # Linhas de continuação começam com um espaço
+        current += char
+        size += char_size
+    parts.append(current)
+
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(value: datetime) -> str:
+    """Formata um datetime em UTC no formato do iCalendar (ex.: 20240101T100000Z)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def build_vevent(
+    reservation_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    summary: str,
+    description: str | None,
+    location: str | None,
+    updated_at: datetime
+) -> str:
+    """Monta um VEVENT para uma reserva aprovada."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:reservation-{reservation_id}@embedded-schedules",
+        f"DTSTAMP:{format_datetime(updated_at)}",
+        f"DTSTART:{format_datetime(start_time)}",
+        f"DTEND:{format_datetime(end_time)}",
+        f"SUMMARY:{escape_text(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    if location:
+        lines.append(f"LOCATION:{escape_text(location)}")
+    lines.append("END:VEVENT")
+
+    return "".join(fold_line(line) for line in lines)
+
+
+def calendar_stream(name: str, events: Iterable[str]) -> Iterator[str]:
+    """
+    Gera o calendário em partes: cabeçalho, um VEVENT por vez e rodapé.
+    `events` é consumido sob demanda, sem montar o documento inteiro em memória.
+    """
+    yield (
+        fold_line("BEGIN:VCALENDAR")
+        + fold_line("VERSION:2.0")
+        + fold_line(f"PRODID:{PRODID}")
+        + fold_line("CALSCALE:GREGORIAN")
+        + fold_line("METHOD:PUBLISH")
+        + fold_line(f"X-WR-CALNAME:{escape_text(name)}")
+    )
+    yield from events
+    yield fold_line("END:VCALENDAR")
+
+
+def build_etag(*parts) -> str:
+    """Gera uma ETag forte a partir das partes que determinam o conteúdo do feed."""
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Verifica se o cabeçalho If-None-Match corresponde à ETag atual."""
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
@@ -2,6 +2,7 @@
 Utilitários para criação e verificação de tokens JWT.
 """
 import os
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
@@ -24,16 +25,17 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expires_delta: Tempo até expiração (opcional)
         
     Returns:
-        Token JWT codificado
+        Token JWT codificado, com identificador único (jti) para revogação
     """
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": now, "jti": secrets.token_hex(16)})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     
     return encoded_jwt
@@ -0,0 +1,87 @@
+"""
+Execução exclusiva das tarefas periódicas entre processos.
+
+Cada worker do Gunicorn executa o lifespan da aplicação e agenda as tarefas
+de fundo. Tarefas que alteram dados em massa (arquivamento, reconciliação dos
+agregados) não podem rodar em paralelo: antes de cada ciclo, o processo tenta
+um advisory lock do PostgreSQL e, se outro processo já o detém, pula o ciclo.
+
+O lock só evita a sobreposição. Como os workers são reciclados com frequência
+(max_requests) e cada um começa um ciclo ao subir, o horário da última
+execução fica na tabela scheduled_job_run e é conferido sob o lock: o ciclo só
+roda quando o intervalo da tarefa já passou.
+"""
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from models import ScheduledJobRun
+
+
+def lock_key(name: str) -> int:
+    """Chave numérica estável do advisory lock para o nome da tarefa."""
+    return zlib.crc32(name.encode("utf-8"))
+
+
+@contextmanager
+def singleton_lock(engine, name: str):
+    """
+    Tenta obter o lock exclusivo da tarefa `name` durante o bloco.
+
+    No PostgreSQL usa pg_try_advisory_lock em uma conexão dedicada, liberada
+    ao final do bloco (ou automaticamente, se o processo morrer). Em outros
+    bancos (SQLite, de desenvolvimento, com um único processo) sempre obtém.
+
+    Yields:
+        True se o lock foi obtido; False se outro processo está executando a tarefa
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    key = lock_key(name)
+    with engine.connect() as connection:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        connection.commit()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
+
+
+@contextmanager
+def scheduled_run(engine, name: str, interval_seconds: int):
+    """
+    Decide se o ciclo da tarefa `name` deve rodar agora.
+
+    Roda quando o lock exclusivo foi obtido e a última execução concluída
+    começou há pelo menos `interval_seconds`. Se o bloco terminar sem erro,
+    o início desta execução é registrado (uma falha é tentada de novo no
+    próximo ciclo).
+
+    Yields:
+        True se o ciclo deve rodar; False se outro processo está executando
+        a tarefa ou se ela ainda não venceu
+    """
+    with singleton_lock(engine, name) as acquired:
+        if not acquired:
+            yield False
+            return
+
+        started_at = datetime.now(timezone.utc)
+        with Session(engine) as session:
+            run = session.get(ScheduledJobRun, name)
+        if run is not None and started_at - run.last_run_at < timedelta(seconds=interval_seconds):
+            yield False
+            return
+
+        yield True
+
+        with Session(engine) as session:
+            session.merge(ScheduledJobRun(name=name, last_run_at=started_at))
+            session.commit()
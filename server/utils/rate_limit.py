@@ -0,0 +1,196 @@
+"""
+Limitação de requisições com baldes de tokens (token bucket).
+
+Cada chave (escopo da rota + IP ou usuário) tem um balde com até `capacity`
+tokens, reabastecido continuamente à taxa de `capacity / period` por segundo.
+Cada requisição consome um token; sem tokens, a rota responde 429 com
+Retry-After antes de qualquer acesso ao banco ou cálculo de bcrypt.
+
+Backends:
+- memory (padrão): dicionário por worker, chave -> (tokens, instante);
+- postgres: tabela `rate_limit_bucket`, compartilhada entre workers e instâncias.
+
+Os limites são configurados por variável de ambiente no formato
+"<requisições>/<segundos>", ex.: RATE_LIMIT_LOGIN=10/60.
+"""
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+from sqlalchemy import text
+
+from utils.jwt import decode_access_token
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# Quantidade máxima de baldes mantidos em memória por worker
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Até `capacity` requisições a cada `period` segundos (com rajadas até `capacity`)."""
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        """Tokens reabastecidos por segundo."""
+        return self.capacity / self.period
+
+
+def parse_rule(value: str) -> RateLimitRule:
+    """Converte "10/60" em RateLimitRule(capacity=10, period=60)."""
+    capacity, _, period = value.partition("/")
+    return RateLimitRule(capacity=int(capacity), period=float(period or 60))
+
+
+RATE_LIMIT_RULES = {
+    # Login: por IP e por conta (tentativas contra o mesmo e-mail)
+    "login": parse_rule(os.getenv("RATE_LIMIT_LOGIN", "10/60")),
+    "login_account": parse_rule(os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", "5/60")),
+    # Criação, edição e cancelamento de reservas: por IP e por usuário
+    "reservations": parse_rule(os.getenv("RATE_LIMIT_RESERVATIONS", "20/60")),
+}
+
+
+def take_token(tokens: float, updated_at: float, rule: RateLimitRule, now: float) -> tuple[float, float]:
+    """
+    Reabastece o balde até `now` e tenta consumir um token.
+
+    Returns:
+        Tupla (tokens restantes, segundos de espera). Espera 0 significa permitido.
+    """
+    tokens = min(rule.capacity, tokens + (now - updated_at) * rule.rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rule.rate
+
+
+class MemoryBuckets:
+    """Baldes do worker: dicionário chave -> (tokens, instante da atualização)."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self.buckets: dict[str, tuple[float, float]] = {}
+        self.lock = threading.Lock()
+
+    def take(self, key: str, rule: RateLimitRule, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            tokens, updated_at = self.buckets.get(key, (rule.capacity, now))
+            tokens, retry_after = take_token(tokens, updated_at, rule, now)
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.prune(now)
+        return retry_after
+
+    def prune(self, now: float) -> None:
+        """Remove os baldes mais antigos (chamado com o lock adquirido)."""
+        # Baldes parados há mais tempo já estão cheios e equivalem a um balde novo
+        by_age = sorted(self.buckets.items(), key=lambda item: item[1][1])
+        for key, _ in by_age[:len(by_age) // 2]:
+            del self.buckets[key]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.buckets.clear()
+
+
+class PostgresBuckets:
+    """Baldes compartilhados na tabela `rate_limit_bucket` (uma transação curta por requisição)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def take(self, key: str, rule: RateLimitRule, now: float | None = None) -> float:
+        # Relógio de parede: o instante é comparado entre processos e máquinas
+        now = time.time() if now is None else now
+        with self.engine.begin() as connection:
+            row = connection.execute(
+                text("SELECT tokens, updated_at FROM rate_limit_bucket WHERE key = :key FOR UPDATE"),
+                {"key": key}
+            ).first()
+            tokens, updated_at = row if row else (rule.capacity, now)
+            tokens, retry_after = take_token(tokens, updated_at, rule, now)
+            connection.execute(
+                text(
+                    "INSERT INTO rate_limit_bucket (key, tokens, updated_at) VALUES (:key, :tokens, :now) "
+                    "ON CONFLICT (key) DO UPDATE SET tokens = :tokens, updated_at = :now"
+                ),
+                {"key": key, "tokens": tokens, "now": now}
+            )
+        return retry_after
+
+
+def create_backend():
+    """Cria o backend configurado (memória se não houver banco PostgreSQL)."""
+    if RATE_LIMIT_BACKEND == "postgres":
+        from database import engine
+
+        if engine is not None and engine.dialect.name == "postgresql":
+            return PostgresBuckets(engine)
+        print("⚠️  RATE_LIMIT_BACKEND=postgres requer DATABASE PostgreSQL; usando memória")
+    return MemoryBuckets()
+
+
+buckets = create_backend()
+
+
+def check_rate_limit(scope: str, *identities: str) -> None:
+    """
+    Consome um token de cada identidade no escopo.
+
+    Raises:
+        HTTPException: 429 com Retry-After se algum balde estiver vazio
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+
+    rule = RATE_LIMIT_RULES[scope]
+    for identity in identities:
+        retry_after = buckets.take(f"{scope}:{identity}", rule)
+        if retry_after:
+            seconds = math.ceil(retry_after)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Muitas requisições. Tente novamente em {seconds} segundos.",
+                headers={"Retry-After": str(seconds)},
+            )
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP do cliente (atrás de proxy, resolvido pelo Uvicorn via X-Forwarded-For
+    dos proxies listados em FORWARDED_ALLOW_IPS; veja gunicorn.conf.py).
+    """
+    return request.client.host if request.client else "desconhecido"
+
+
+def rate_limit(scope: str):
+    """
+    Dependência que limita a rota por IP e, com token válido, também por usuário.
+    O token é apenas decodificado, sem consulta ao banco.
+
+    A dependência é síncrona: o FastAPI a executa no threadpool, então o
+    backend postgres não bloqueia o event loop.
+    """
+    def dependency(request: Request) -> None:
+        identities = [f"ip:{client_ip(request)}"]
+
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            subject = decode_access_token(token)
+            if subject:
+                identities.append(f"user:{subject}")
+
+        check_rate_limit(scope, *identities)
+
+    return dependency
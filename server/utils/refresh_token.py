@@ -0,0 +1,132 @@
+"""
+Tokens de renovação de sessão (refresh tokens).
+
+O token entregue ao cliente é um valor aleatório opaco; o banco guarda apenas
+o HMAC-SHA256 dele com a SECRET_KEY. A renovação custa uma busca pelo índice
+único de `token_hash` e um HMAC, em vez do bcrypt do login.
+
+Cada renovação revoga o token usado e emite outro (rotação). Se um token já
+substituído for apresentado de novo, ele foi copiado: todas as sessões do
+usuário são encerradas.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from models import RefreshToken, User
+from utils.jwt import SECRET_KEY
+
+load_dotenv()
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+
+def hash_refresh_token(token: str) -> str:
+    """HMAC-SHA256 do token em hexadecimal (64 caracteres)."""
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_refresh_token(session: Session, user_id: int) -> tuple[str, RefreshToken]:
+    """
+    Emite um token de renovação para o usuário (o commit fica com o chamador).
+
+    Returns:
+        Tupla (token em texto, entregue uma única vez ao cliente; registro no banco)
+    """
+    token = secrets.token_urlsafe(32)
+    refresh_token = RefreshToken(
+        token_hash=hash_refresh_token(token),
+        user_id=user_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    session.add(refresh_token)
+    return token, refresh_token
+
+
+def revoke_user_tokens(session: Session, user_id: int) -> None:
+    """Revoga todos os tokens de renovação ativos do usuário (o commit fica com o chamador)."""
+    session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+def revoke_refresh_token(session: Session, token: str, user_id: int) -> None:
+    """Revoga um token de renovação do usuário (o commit fica com o chamador)."""
+    session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == hash_refresh_token(token),
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+def find_refresh_token(session: Session, token: str) -> tuple[RefreshToken, User] | None:
+    """Busca o token e o seu dono em uma única consulta."""
+    statement = (
+        select(RefreshToken, User)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    return session.exec(statement).first()
+
+
+def rotate_refresh_token(session: Session, token: str) -> tuple[User, str | None] | None:
+    """
+    Troca um token válido por um novo e faz o commit.
+
+    A revogação do token usado é um UPDATE condicional (WHERE revoked_at IS NULL):
+    de duas renovações simultâneas com o mesmo token, só uma o revoga; a outra
+    é tratada como reuso.
+
+    Returns:
+        None se o token for inválido, expirado, revogado ou reutilizado (nesse
+        caso as sessões do usuário são revogadas); (usuário, None) se o token
+        for válido mas o usuário estiver inativo (nada é emitido); ou
+        (usuário, novo token)
+    """
+    found = find_refresh_token(session, token)
+    if found is None:
+        return None
+
+    refresh_token, user = found
+    user_id = user.id
+    now = datetime.now(timezone.utc)
+
+    if refresh_token.replaced_by_id is not None:
+        revoke_user_tokens(session, user_id)
+        session.commit()
+        return None
+
+    if refresh_token.revoked_at is not None or refresh_token.expires_at <= now:
+        return None
+
+    if not user.is_active:
+        return user, None
+
+    new_token, new_refresh_token = issue_refresh_token(session, user_id)
+    session.flush()
+    result = session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == refresh_token.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now, replaced_by_id=new_refresh_token.id)
+    )
+    if result.rowcount == 0:
+        # Outra renovação usou o token ao mesmo tempo: descarta o novo e encerra as sessões
+        session.rollback()
+        revoke_user_tokens(session, user_id)
+        session.commit()
+        return None
+
+    session.commit()
+    return user, new_token
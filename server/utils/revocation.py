@@ -0,0 +1,196 @@
+"""
+Revogação de tokens de acesso.
+
+Os tokens JWT carregam um identificador único (jti). O logout grava o jti na
+tabela `revoked_token`; a desativação de um usuário grava "sub:<e-mail>",
+que revoga todos os tokens dele emitidos até aquele instante.
+
+Para que a validação de cada requisição não consulte o banco, cada worker
+mantém um filtro de Bloom com as chaves revogadas:
+- "certamente não revogado" (o caso comum) dispensa a consulta;
+- "talvez revogado" (revogado ou falso positivo) confirma na tabela.
+O filtro é reconstruído periodicamente a partir da tabela (o que também
+descarta os registros vencidos) e recebe as novas revogações pelo canal de
+invalidação do cache (NOTIFY). Até a primeira carga, todas as validações
+consultam a tabela.
+"""
+import asyncio
+import hashlib
+import math
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from models import RevokedToken
+from utils.cache import cache, publish_invalidation
+from utils.jwt import ACCESS_TOKEN_EXPIRE_MINUTES
+
+load_dotenv()
+
+REVOCATION_REFRESH_SECONDS = int(os.getenv("REVOCATION_REFRESH_SECONDS", "60"))
+# Revogações ativas esperadas e taxa de falsos positivos do filtro
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
+# Namespace das mensagens de revogação no canal de invalidação
+REVOKED = "revoked"
+
+
+def subject_key(email: str) -> str:
+    """Chave que revoga todos os tokens de um usuário."""
+    return f"sub:{email}"
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre um bytearray (k posições por chave, hashing duplo)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+
+class RevocationFilter:
+    """Filtro de Bloom do worker com as chaves revogadas."""
+
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY, error_rate: float = REVOCATION_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = None
+        # Revogações recebidas durante uma recarga (podem não estar na consulta)
+        self.recent = None
+        self.lock = threading.Lock()
+
+    def might_contain(self, *keys: str) -> bool:
+        """False apenas se nenhuma chave foi revogada (antes da primeira carga, sempre True)."""
+        bloom = self.bloom
+        if bloom is None:
+            return True
+        return any(key in bloom for key in keys if key)
+
+    def add(self, key: str | None) -> None:
+        if key is None:
+            return
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(key)
+            if self.recent is not None:
+                self.recent.add(key)
+
+    def start_reload(self) -> None:
+        """Começa a registrar as revogações recebidas até o próximo `load`."""
+        with self.lock:
+            self.recent = set()
+
+    def load(self, keys: list[str]) -> None:
+        """Substitui o filtro por um novo com as chaves informadas."""
+        bloom = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        with self.lock:
+            for key in self.recent or ():
+                bloom.add(key)
+            self.bloom = bloom
+            self.recent = None
+
+    def reset(self) -> None:
+        """Volta ao estado inicial (todas as validações consultam o banco)."""
+        with self.lock:
+            self.bloom = None
+            self.recent = None
+
+
+revocation_filter = RevocationFilter()
+cache.subscribe(REVOKED, revocation_filter.add)
+
+
+def revoke(session: Session, key: str, expires_at: datetime) -> None:
+    """Grava a revogação e a publica para os workers (o commit fica com o chamador)."""
+    revoked = session.get(RevokedToken, key)
+    if revoked is None:
+        revoked = RevokedToken(key=key, expires_at=expires_at)
+    else:
+        revoked.revoked_at = datetime.now(timezone.utc)
+        revoked.expires_at = max(revoked.expires_at, expires_at)
+    session.add(revoked)
+    publish_invalidation(session, REVOKED, key)
+
+
+def revoke_access_token(session: Session, payload: dict) -> None:
+    """Revoga o token de acesso decodificado em `payload` até a sua expiração."""
+    jti = payload.get("jti")
+    if jti:
+        revoke(session, jti, datetime.fromtimestamp(payload["exp"], timezone.utc))
+
+
+def revoke_subject(session: Session, email: str) -> None:
+    """Revoga todos os tokens de acesso já emitidos para o usuário."""
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    revoke(session, subject_key(email), expires_at)
+
+
+def is_revoked(session: Session, payload: dict) -> bool:
+    """
+    Verifica se o token foi revogado.
+    Só consulta o banco se o filtro de Bloom indicar uma possível revogação.
+    """
+    jti = payload.get("jti")
+    subject = subject_key(payload.get("sub"))
+    if not revocation_filter.might_contain(jti, subject):
+        return False
+
+    keys = [subject] + ([jti] if jti else [])
+    rows = session.exec(select(RevokedToken).where(RevokedToken.key.in_(keys))).all()
+    for row in rows:
+        if row.key == jti:
+            return True
+        # Revogação do usuário: vale para tokens emitidos até aquele instante
+        if payload.get("iat", 0) <= row.revoked_at.timestamp():
+            return True
+    return False
+
+
+def reload_revocations(engine) -> int:
+    """
+    Remove as revogações vencidas e reconstrói o filtro a partir da tabela.
+
+    Returns:
+        Quantidade de revogações ativas
+    """
+    now = datetime.now(timezone.utc)
+    revocation_filter.start_reload()
+    with Session(engine) as session:
+        session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        session.commit()
+        keys = list(session.exec(select(RevokedToken.key)).all())
+    revocation_filter.load(keys)
+    return len(keys)
+
+
+async def revocation_loop(engine) -> None:
+    """Tarefa de fundo que mantém o filtro de revogações atualizado."""
+    while True:
+        try:
+            await asyncio.to_thread(reload_revocations, engine)
+        except Exception as e:
+            print(f"⚠️  Falha ao recarregar as revogações de tokens: {e}")
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
@@ -0,0 +1,271 @@
+"""
+Manutenção dos agregados de ocupação (`reservation_daily_stats`).
+
+Os agregados são atualizados de forma incremental sempre que uma reserva muda
+de status ou de horário, e uma reconciliação periódica recalcula uma janela de
+dias a partir das reservas, corrigindo qualquer divergência.
+Execute manualmente: python -m utils.stats
+"""
+import asyncio
+import os
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, insert, text
+from sqlmodel import Session, select
+
+from database import CONFLICT_INSERTS
+from models import (
+    Reservation, ReservationArchive, ReservationDailyStats, ReservationStatus
+)
+from utils.locks import scheduled_run
+
+load_dotenv()
+
+# Configurações da reconciliação
+STATS_RECONCILE_DAYS = int(os.getenv("STATS_RECONCILE_DAYS", "35"))
+STATS_RECONCILE_INTERVAL_SECONDS = int(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "86400"))
+
+# Contador incrementado na hora de início de cada reserva, por status
+STATUS_COUNTERS = {
+    ReservationStatus.approved: "approved_count",
+    ReservationStatus.rejected: "rejected_count",
+    ReservationStatus.cancelled: "cancelled_count",
+}
+
+BucketKey = tuple[date, int, int, int | None]
+
+# Valores iniciais dos contadores de um agregado (o INSERT em lote exige todas as chaves)
+STATS_DEFAULTS = {"booked_minutes": 0, **{counter: 0 for counter in STATUS_COUNTERS.values()}}
+
+# Colunas do índice único uq_reservation_daily_stats_bucket (alvo do ON CONFLICT)
+STATS_BUCKET_COLUMNS = [
+    ReservationDailyStats.day,
+    ReservationDailyStats.hour,
+    ReservationDailyStats.laboratory_id,
+    text("coalesce(computer_id, 0)"),
+]
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normaliza um datetime para UTC sem fuso (como é gravado no banco)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def hour_buckets(start_time: datetime, end_time: datetime):
+    """
+    Divide um intervalo em fatias de hora cheia.
+
+    Yields:
+        Tuplas (dia, hora, minutos ocupados naquela hora)
+    """
+    start_time = to_utc_naive(start_time)
+    end_time = to_utc_naive(end_time)
+
+    current = start_time.replace(minute=0, second=0, microsecond=0)
+    while current < end_time:
+        next_hour = current + timedelta(hours=1)
+        overlap = min(end_time, next_hour) - max(start_time, current)
+        minutes = round(overlap.total_seconds() / 60)
+        if minutes > 0:
+            yield current.date(), current.hour, minutes
+        current = next_hour
+
+
+def reservation_contributions(
+    laboratory_id: int,
+    computer_id: int | None,
+    status: ReservationStatus,
+    start_time: datetime,
+    end_time: datetime
+) -> dict[BucketKey, dict[str, int]]:
+    """
+    Calcula a contribuição de uma reserva para cada agregado.
+
+    Returns:
+        Mapa chave do agregado -> incrementos por coluna
+    """
+    contributions: dict[BucketKey, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    counter = STATUS_COUNTERS.get(status)
+    if counter:
+        start = to_utc_naive(start_time)
+        contributions[(start.date(), start.hour, laboratory_id, computer_id)][counter] += 1
+
+    if status == ReservationStatus.approved:
+        for day, hour, minutes in hour_buckets(start_time, end_time):
+            contributions[(day, hour, laboratory_id, computer_id)]["booked_minutes"] += minutes
+
+    return contributions
+
+
+def update_reservation_stats(
+    session: Session,
+    reservation: Reservation,
+    old_status: ReservationStatus | None = None,
+    old_start: datetime | None = None,
+    old_end: datetime | None = None
+) -> None:
+    """
+    Atualiza os agregados após uma mudança de status ou horário de uma reserva.
+
+    Remove a contribuição do estado anterior (status/horários antigos, ou os
+    atuais quando não informados) e soma a do estado atual. Não faz commit:
+    as alterações entram na mesma transação da rota que alterou a reserva.
+    """
+    delta: dict[BucketKey, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    previous = reservation_contributions(
+        reservation.laboratory_id,
+        reservation.computer_id,
+        old_status or reservation.status,
+        old_start or reservation.start_time,
+        old_end or reservation.end_time
+    )
+    current = reservation_contributions(
+        reservation.laboratory_id,
+        reservation.computer_id,
+        reservation.status,
+        reservation.start_time,
+        reservation.end_time
+    )
+
+    for key, values in previous.items():
+        for column, value in values.items():
+            delta[key][column] -= value
+    for key, values in current.items():
+        for column, value in values.items():
+            delta[key][column] += value
+
+    # Incremento atômico no banco: aprovações simultâneas no mesmo balde não
+    # perdem contagens nem criam agregados duplicados
+    upsert = CONFLICT_INSERTS[session.get_bind().dialect.name]
+
+    for (day, hour, laboratory_id, computer_id), values in delta.items():
+        values = {column: value for column, value in values.items() if value}
+        if not values:
+            continue
+
+        statement = upsert(ReservationDailyStats).values(
+            day=day,
+            hour=hour,
+            laboratory_id=laboratory_id,
+            computer_id=computer_id,
+            **values
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=STATS_BUCKET_COLUMNS,
+            set_={
+                column: getattr(ReservationDailyStats, column) + statement.excluded[column]
+                for column in values
+            }
+        )
+        session.execute(statement)
+
+
+def reconcile_daily_stats(session: Session, start_day: date, end_day: date) -> int:
+    """
+    Recalcula do zero os agregados dos dias entre `start_day` e `end_day` (inclusive).
+
+    Considera reservas ativas e arquivadas. Apenas colunas simples são lidas,
+    sem carregar objetos do ORM.
+
+    No PostgreSQL, a tabela de agregados é travada antes da leitura das
+    reservas (SHARE ROW EXCLUSIVE conflita com o ROW EXCLUSIVE dos upserts).
+    Uma transação que já gravou sua variação termina antes da leitura, que a
+    enxerga; as seguintes esperam o commit da reconstrução e aplicam a
+    variação sobre ela. Sem a trava, uma variação gravada entre a leitura e o
+    DELETE se perderia até a próxima reconciliação.
+
+    Returns:
+        Quantidade de agregados gravados
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text(
+            f"LOCK TABLE {ReservationDailyStats.__tablename__} IN SHARE ROW EXCLUSIVE MODE"
+        ))
+
+    range_start = datetime.combine(start_day, time.min, tzinfo=timezone.utc)
+    range_end = datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+    totals: dict[BucketKey, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    for model in (Reservation, ReservationArchive):
+        statement = select(
+            model.laboratory_id,
+            model.computer_id,
+            model.status,
+            model.start_time,
+            model.end_time
+        ).where(
+            model.start_time < range_end,
+            model.end_time > range_start,
+            model.status.in_(list(STATUS_COUNTERS))
+        )
+        for row in session.exec(statement):
+            contributions = reservation_contributions(*row)
+            for key, values in contributions.items():
+                if start_day <= key[0] <= end_day:
+                    for column, value in values.items():
+                        totals[key][column] += value
+
+    session.execute(
+        delete(ReservationDailyStats).where(
+            ReservationDailyStats.day >= start_day,
+            ReservationDailyStats.day <= end_day
+        )
+    )
+    # INSERT do Core: objetos do ORM já carregados na sessão (e removidos pelo
+    # DELETE acima) não interferem nas linhas reconstruídas
+    if totals:
+        session.execute(insert(ReservationDailyStats), [
+            {
+                "day": day,
+                "hour": hour,
+                "laboratory_id": laboratory_id,
+                "computer_id": computer_id,
+                **STATS_DEFAULTS,
+                **values
+            }
+            for (day, hour, laboratory_id, computer_id), values in totals.items()
+        ])
+    session.commit()
+
+    return len(totals)
+
+
+def run_reconcile_cycle(engine, days: int | None = None, force: bool = False) -> int:
+    """
+    Reconcilia a janela de dias em torno de hoje com uma sessão própria.
+    `force` ignora o intervalo desde a última execução (execução manual).
+    """
+    days = days or STATS_RECONCILE_DAYS
+    today = datetime.now(timezone.utc).date()
+    interval = 0 if force else STATS_RECONCILE_INTERVAL_SECONDS
+    # Só um processo reconcilia por vez, e no máximo uma vez por intervalo
+    with scheduled_run(engine, "stats_reconcile", interval) as due:
+        if not due:
+            return 0
+        with Session(engine) as session:
+            return reconcile_daily_stats(
+                session, today - timedelta(days=days), today + timedelta(days=days)
+            )
+
+
+async def stats_reconcile_loop(engine) -> None:
+    """Tarefa de fundo que reconcilia os agregados periodicamente (diariamente)."""
+    while True:
+        try:
+            await asyncio.to_thread(run_reconcile_cycle, engine)
+        except Exception as e:
+            print(f"⚠️  Falha na reconciliação das estatísticas: {e}")
+        await asyncio.sleep(STATS_RECONCILE_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    print(f"✓ {run_reconcile_cycle(engine, force=True)} agregados reconciliados")
@@ -0,0 +1,70 @@
+"""
+Aquecimento do worker na inicialização.
+
+Antes de aceitar requisições, o worker abre algumas conexões do pool em
+paralelo, para que as primeiras requisições não paguem o handshake TLS com o
+banco. Tarefas que não precisam bloquear a inicialização (verificação do schema
+e geração do OpenAPI) rodam em segundo plano logo depois.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# Conexões abertas antecipadamente (limitadas ao tamanho do pool)
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "2"))
+
+
+def warm_pool(engine, connections: int = WARMUP_POOL_CONNECTIONS) -> int:
+    """
+    Abre `connections` conexões em paralelo e as devolve ao pool.
+
+    Returns:
+        Quantidade de conexões abertas
+    """
+    pool_size = getattr(engine.pool, "size", lambda: connections)()
+    connections = min(connections, pool_size)
+    if connections <= 0:
+        return 0
+
+    opened = []
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        opened = list(executor.map(lambda _: engine.connect(), range(connections)))
+    for connection in opened:
+        connection.close()
+    return len(opened)
+
+
+def warm_app(app) -> None:
+    """Gera e guarda o schema OpenAPI (a primeira visita a /docs não espera)."""
+    app.openapi()
+
+
+async def warmup(engine) -> None:
+    """Etapa bloqueante do aquecimento, executada antes de servir requisições."""
+    if not WARMUP_ENABLED or engine is None:
+        return
+    try:
+        opened = await asyncio.to_thread(warm_pool, engine)
+        print(f"✓ {opened} conexões do pool abertas")
+    except Exception as e:
+        print(f"⚠️  Falha ao aquecer o pool de conexões: {e}")
+
+
+async def deferred_startup(app, *checks) -> None:
+    """
+    Etapa adiada: roda em segundo plano depois que o worker já está servindo.
+    Cada verificação é uma função síncrona executada em uma thread.
+    """
+    for check in checks:
+        try:
+            await asyncio.to_thread(check)
+        except Exception as e:
+            print(f"⚠️  Falha na verificação adiada {check.__name__}: {e}")
+
+    if WARMUP_ENABLED:
+        await asyncio.to_thread(warm_app, app)